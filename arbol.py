@@ -1,5 +1,15 @@
+from typing import Optional
 from nodo import Nodo
-import matplotlib.pyplot as plt
+from enlace import IndiceConsultas, TablaEnlace
+from persistencia import cargar_arreglos, guardar_arreglos
+import numpy as np
+
+
+def etiqueta_newick(etiqueta) -> str:
+    texto = str(etiqueta)
+    if any(caracter in texto for caracter in " ()[]',;:\t\n"):
+        return "'" + texto.replace("'", "''") + "'"
+    return texto
 
 
 class Arbol():
@@ -7,18 +17,119 @@ class Arbol():
     nodo: Nodo
     indices: list
     nombre : str
+    tabla: Optional[TablaEnlace]
+    calidad: Optional[dict]
+    metadata: Optional[dict]
     
-    def __init__(self,nombre: str, nodo: Nodo, indices: list, label_points: bool = False):
+    def __init__(self,nombre: str, nodo: Nodo, indices: list, label_points: bool = False, tabla: Optional[TablaEnlace] = None, calidad: Optional[dict] = None, metadata: Optional[dict] = None):
         self.nombre = nombre
         self.nodo = nodo
         self.indices = indices
         self.label_points = label_points
+        self.tabla = tabla
+        self.calidad = calidad
+        self.metadata = metadata
+        self._consultas = None
+    
+    @classmethod
+    def desde_tabla(cls, nombre: str, tabla: TablaEnlace, indices: list, label_points: bool = False, calidad: Optional[dict] = None, metadata: Optional[dict] = None) -> 'Arbol':
+        return cls(nombre, Nodo.de_tabla(tabla, tabla.raiz), indices, label_points, tabla, calidad, metadata)
+    
+    def guardar(self, ruta: str) -> None:
+        if self.tabla is None:
+            raise Exception("Solo se pueden guardar arboles construidos desde una tabla de enlace")
+        
+        etiquetas = np.asarray(self.indices)
+        if etiquetas.dtype.kind not in "biuf":
+            etiquetas = etiquetas.astype(str)
+        
+        atributos = {"version": 1, "nombre": self.nombre, "label_points": self.label_points, "calidad": self.calidad, "metadata": self.metadata}
+        guardar_arreglos(ruta, dict(self.tabla.arreglos(), etiquetas=etiquetas), atributos)
+    
+    @classmethod
+    def cargar(cls, ruta: str, mapear: bool = True) -> 'Arbol':
+        arreglos, atributos = cargar_arreglos(ruta, mapear)
+        etiquetas = arreglos.pop("etiquetas")
+        tabla = TablaEnlace.desde_arreglos(arreglos)
+        return cls.desde_tabla(atributos["nombre"], tabla, etiquetas, atributos["label_points"], atributos["calidad"], atributos["metadata"])
+    
+    def newick(self) -> str:
+        if self.tabla is None:
+            raise Exception("La exportacion a Newick requiere un arbol construido desde una tabla de enlace")
+        
+        tabla = self.tabla
+        partes = []
+        pendientes = [(tabla.raiz, None)]
+        while pendientes:
+            elemento = pendientes.pop()
+            if isinstance(elemento, str):
+                partes.append(elemento)
+                continue
+            
+            nodo, altura_padre = elemento
+            altura = tabla.altura_nodo(nodo)
+            largo = "" if altura_padre is None else f":{float(altura_padre - altura)!r}"
+            if nodo < tabla.n:
+                partes.append(etiqueta_newick(self.indices[nodo]) + largo)
+            else:
+                fila = nodo - tabla.n
+                soporte = tabla.soporte_nodo(nodo)
+                etiqueta = "" if soporte is None else f"{soporte:g}"
+                pendientes.extend([")" + etiqueta + largo, (int(tabla.derecho[fila]), altura), ",", (int(tabla.izquierdo[fila]), altura)])
+                partes.append("(")
+        
+        return "".join(partes) + ";"
+    
+    def guardar_newick(self, ruta: str) -> None:
+        with open(ruta, "w") as archivo:
+            archivo.write(self.newick())
+    
+    @property
+    def soporte(self) -> Optional[np.ndarray]:
+        return None if self.tabla is None else self.tabla.soporte
+    
+    @property
+    def consultas(self) -> IndiceConsultas:
+        if self._consultas is None:
+            if self.tabla is None:
+                raise Exception("Las consultas indexadas requieren un arbol construido desde una tabla de enlace")
+            self._consultas = IndiceConsultas(self.tabla)
+        return self._consultas
+    
+    def cortar(self, altura: float) -> np.ndarray:
+        return self.consultas.cortar([altura])[0]
+    
+    def cortar_varios(self, alturas) -> np.ndarray:
+        return self.consultas.cortar(alturas)
+    
+    def ancestro_comun(self, i: int, j: int) -> int:
+        return int(self.consultas.ancestros(i, j))
+    
+    def distancia_cofenetica(self, i: int, j: int) -> float:
+        return float(self.consultas.cofeneticas(i, j))
+    
+    def distancias_cofeneticas(self, i, j) -> np.ndarray:
+        return self.consultas.cofeneticas(i, j)
     
-    def plot(self):
-        plt.figure(figsize=(10, 10))
-        plt.title(f"Clasificacion de {self.nombre}")
-        plt.xlabel("Elementos")
-        plt.ylabel("Altura")
-        self.nodo.plot(self.indices, self.label_points)
-        plt.grid(True)
-        plt.show()
\ No newline at end of file
+    def plot(self, ruta: Optional[str] = None, niveles: Optional[int] = None, max_hojas: Optional[int] = None, figsize: tuple = (10, 10)):
+        from grafico import dibujar_arbol
+        
+        if ruta is None:
+            import matplotlib.pyplot as plt
+            figura = plt.figure(figsize=figsize)
+        else:
+            from matplotlib.figure import Figure
+            figura = Figure(figsize=figsize)
+        
+        ejes = figura.add_subplot()
+        ejes.set_title(f"Clasificacion de {self.nombre}")
+        ejes.set_xlabel("Elementos")
+        ejes.set_ylabel("Altura")
+        dibujar_arbol(ejes, self, niveles, max_hojas)
+        ejes.grid(True)
+        
+        if ruta is None:
+            plt.show()
+        else:
+            figura.savefig(ruta)
+        return figura
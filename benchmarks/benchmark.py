@@ -0,0 +1,242 @@
+from typing import Callable, Optional
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+import numpy as np
+import pandas as pd
+
+from relacion import Relacion, Dicotomica, Clasificatoria, Evaluativa
+from emparillado import Emparillador
+from arbol import Arbol
+from progreso import ObservadorMetricas, ObservadorNulo, medir_etapa
+
+
+FILAS_RAPIDO = [100, 1000, 5000]
+FILAS_COMPLETO = [100, 1000, 5000, 20000, 50000]
+COLUMNAS = [8, 32]
+RELACIONES = ["dicotomica", "clasificatoria", "evaluativa"]
+ETAPAS = ["procesar_relacion", "distancias", "aglomeracion", "arbol"]
+MAXIMO_EVALUATIVA = 5
+TOLERANCIA = 1.25
+IMPORTACION = "from emparillado import Emparillador"
+MODULOS_PESADOS = ["matplotlib", "tqdm"]
+
+
+def generar_datos(relacion: str, filas: int, columnas: int, semilla: int = 0) -> tuple[pd.DataFrame, Relacion]:
+    generador = np.random.default_rng(semilla)
+    nombres = [f"c{i}" for i in range(columnas)]
+
+    if relacion == "dicotomica":
+        valores = np.where(generador.integers(0, 2, size=(filas, columnas)) == 1, "si", "no")
+        return pd.DataFrame(valores, columns=nombres), Dicotomica()
+    if relacion == "clasificatoria":
+        valores = generador.integers(0, max(filas // 4, 2), size=(filas, columnas))
+        return pd.DataFrame(valores, columns=nombres), Clasificatoria(generar_ranking=True)
+    if relacion == "evaluativa":
+        valores = generador.integers(0, MAXIMO_EVALUATIVA + 1, size=(filas, columnas))
+        return pd.DataFrame(valores, columns=nombres), Evaluativa(max_value=MAXIMO_EVALUATIVA)
+
+    raise Exception(f"Relacion desconocida: {relacion}")
+
+
+def recorrer_arbol(arbol: Arbol) -> int:
+    nodos = 0
+    pendientes = [arbol.nodo]
+    while pendientes:
+        nodo = pendientes.pop()
+        nodo.valor
+        pendientes.extend(nodo.hijos)
+        nodos += 1
+    return nodos
+
+
+def medir(funcion: Callable, repeticiones: int, memoria: bool) -> tuple[object, dict]:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    medicion = {"segundos": min(tiempos), "tiempos": tiempos}
+    if memoria:
+        del resultado
+        observador = ObservadorMetricas()
+        tracemalloc.start()
+        with medir_etapa(observador, "benchmark"):
+            resultado = funcion()
+        tracemalloc.stop()
+        medicion["memoria_pico"] = observador.registros[0]["memoria_pico"]
+    return resultado, medicion
+
+
+def medir_caso(relacion: str, filas: int, columnas: int, repeticiones: int = 1, memoria: bool = True, semilla: int = 0) -> dict:
+    datos, tipo_relacion = generar_datos(relacion, filas, columnas, semilla)
+
+    (procesados, metadata), procesar = medir(lambda: tipo_relacion.procesar_relacion(datos), repeticiones, memoria)
+    emparillador = Emparillador.__new__(Emparillador)
+    emparillador._inicializar(procesados.to_numpy(), procesados.index, procesados.columns, metadata, tipo_relacion, observador=ObservadorNulo())
+
+    distancias, matriz = medir(emparillador._distancias_elementos, repeticiones, memoria)
+    tabla, aglomeracion = medir(lambda: emparillador._generar_tabla(distancias), repeticiones, memoria)
+    nodos, arbol = medir(lambda: recorrer_arbol(Arbol.desde_tabla("Elementos", tabla, procesados.index)), repeticiones, memoria)
+
+    return {
+        "relacion": relacion,
+        "filas": filas,
+        "columnas": columnas,
+        "nodos": nodos,
+        "etapas": {"procesar_relacion": procesar, "distancias": matriz, "aglomeracion": aglomeracion, "arbol": arbol},
+    }
+
+
+def medir_importacion(repeticiones: int = 1, sentencia: str = IMPORTACION) -> dict:
+    codigo = "\n".join([
+        "import json, sys, time",
+        "inicio = time.perf_counter()",
+        sentencia,
+        "segundos = time.perf_counter() - inicio",
+        "from progreso import memoria_proceso",
+        "print(json.dumps({'segundos': segundos, 'memoria_pico': memoria_proceso(), 'modulos': sorted(sys.modules)}))",
+    ])
+
+    mediciones = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+        mediciones.append(json.loads(salida.stdout))
+
+    modulos = mediciones[-1]["modulos"]
+    return {
+        "sentencia": sentencia,
+        "segundos": min(m["segundos"] for m in mediciones),
+        "tiempos": [m["segundos"] for m in mediciones],
+        "memoria_pico": mediciones[-1]["memoria_pico"],
+        "modulos": len(modulos),
+        "pesados": [m for m in MODULOS_PESADOS if m in modulos],
+    }
+
+
+def comparar_importacion(importacion: dict, base: dict, tolerancia: float = TOLERANCIA) -> dict:
+    comparacion = {"etapa": "importacion", "pesados": importacion["pesados"]}
+    if base is not None:
+        comparacion["razon_tiempo"] = importacion["segundos"] / max(base["segundos"], 1e-9)
+        if importacion.get("memoria_pico") and base.get("memoria_pico"):
+            comparacion["razon_memoria"] = importacion["memoria_pico"] / base["memoria_pico"]
+    comparacion["regresion"] = bool(importacion["pesados"]) or comparacion.get("razon_tiempo", 0) > tolerancia or comparacion.get("razon_memoria", 0) > tolerancia
+    return comparacion
+
+
+def clave_caso(caso: dict) -> tuple:
+    return (caso["relacion"], caso["filas"], caso["columnas"])
+
+
+def comparar(resultados: dict, base: dict, tolerancia: float = TOLERANCIA) -> list[dict]:
+    casos_base = {clave_caso(caso): caso for caso in base["casos"]}
+    comparaciones = []
+
+    for caso in resultados["casos"]:
+        anterior = casos_base.get(clave_caso(caso))
+        if anterior is None:
+            continue
+        for etapa, medicion in caso["etapas"].items():
+            if etapa not in anterior["etapas"]:
+                continue
+            previa = anterior["etapas"][etapa]
+            comparacion = {
+                "relacion": caso["relacion"],
+                "filas": caso["filas"],
+                "columnas": caso["columnas"],
+                "etapa": etapa,
+                "razon_tiempo": medicion["segundos"] / max(previa["segundos"], 1e-9),
+            }
+            if "memoria_pico" in medicion and "memoria_pico" in previa:
+                comparacion["razon_memoria"] = medicion["memoria_pico"] / max(previa["memoria_pico"], 1)
+            comparacion["regresion"] = comparacion["razon_tiempo"] > tolerancia or comparacion.get("razon_memoria", 0) > tolerancia
+            comparaciones.append(comparacion)
+
+    return comparaciones
+
+
+def ejecutar(relaciones: list[str], filas: list[int], columnas: list[int], repeticiones: int = 1, memoria: bool = True, avance: Optional[Callable[[dict], None]] = None) -> dict:
+    casos = []
+    for relacion in relaciones:
+        for n in filas:
+            for m in columnas:
+                caso = medir_caso(relacion, n, m, repeticiones, memoria)
+                casos.append(caso)
+                if avance is not None:
+                    avance(caso)
+
+    return {
+        "version": 1,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "entorno": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "plataforma": platform.platform(),
+            "procesadores": os.cpu_count(),
+        },
+        "repeticiones": repeticiones,
+        "casos": casos,
+    }
+
+
+def imprimir_caso(caso: dict) -> None:
+    partes = [f"{etapa}={medicion['segundos']:.3f}s" for etapa, medicion in caso["etapas"].items()]
+    print(f"{caso['relacion']:>14} {caso['filas']:>6}x{caso['columnas']:<3} " + " ".join(partes), file=sys.stderr)
+
+
+def main(argumentos: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mide tiempo y memoria de cada etapa del emparillado")
+    parser.add_argument("--relaciones", nargs="+", choices=RELACIONES, default=RELACIONES)
+    parser.add_argument("--filas", nargs="+", type=int, default=None)
+    parser.add_argument("--columnas", nargs="+", type=int, default=COLUMNAS)
+    parser.add_argument("--completo", action="store_true", help="Incluir tamanos hasta 50k filas")
+    parser.add_argument("--repeticiones", type=int, default=1)
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir memoria pico con tracemalloc")
+    parser.add_argument("--salida", default=None, help="Archivo JSON de resultados (por defecto stdout)")
+    parser.add_argument("--base", default=None, help="Resultados JSON anteriores con los que comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    opciones = parser.parse_args(argumentos)
+
+    filas = opciones.filas or (FILAS_COMPLETO if opciones.completo else FILAS_RAPIDO)
+    resultados = ejecutar(opciones.relaciones, filas, opciones.columnas, opciones.repeticiones, not opciones.sin_memoria, imprimir_caso)
+    resultados["importacion"] = medir_importacion(opciones.repeticiones)
+
+    base = None
+    regresiones = []
+    if opciones.base is not None:
+        with open(opciones.base) as archivo:
+            base = json.load(archivo)
+        resultados["comparacion"] = comparar(resultados, base, opciones.tolerancia)
+        regresiones = [c for c in resultados["comparacion"] if c["regresion"]]
+        for c in regresiones:
+            print(f"Regresion: {c['relacion']} {c['filas']}x{c['columnas']} {c['etapa']} tiempo x{c['razon_tiempo']:.2f}", file=sys.stderr)
+
+    importacion = comparar_importacion(resultados["importacion"], base.get("importacion") if base is not None else None, opciones.tolerancia)
+    resultados["comparacion_importacion"] = importacion
+    if importacion["regresion"]:
+        regresiones.append(importacion)
+        print(f"Regresion: {IMPORTACION} carga {importacion['pesados']} tiempo x{importacion.get('razon_tiempo', 1):.2f}", file=sys.stderr)
+
+    texto = json.dumps(resultados, indent=2)
+    if opciones.salida is None:
+        print(texto)
+    else:
+        with open(opciones.salida, "w") as archivo:
+            archivo.write(texto)
+
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Optional
+import os
+import tempfile
+import numpy as np
+
+from distancias import ELEMENTOS_POR_BLOQUE, MatrizDistancias, abrir_memoria, archivo_temporal, distancias_l1, memoria_compartida, numero_procesos, tipo_acumulador
+from enlace import TablaEnlace, aglomerar_lance_williams, arbol_expansion_minima, tabla_desde_arbol_minimo
+
+
+ITERACIONES = 100
+EXACTO_FLOAT32 = 1 << 24
+
+
+def tipo_contribuciones(valores: np.ndarray) -> np.dtype:
+    if valores.size == 0 or tipo_acumulador(valores.dtype) != np.int64:
+        return np.dtype(np.float64)
+    cota = int(valores.shape[1]) * (int(valores.max()) - int(valores.min()))
+    return np.dtype(np.float32) if cota < EXACTO_FLOAT32 else np.dtype(np.float64)
+
+
+def contribuciones_columnas(valores: np.ndarray, directorio: Optional[str] = None) -> np.ndarray:
+    n, m = valores.shape
+    forma = (m, n * (n - 1) // 2)
+    tipo = tipo_contribuciones(valores)
+    if directorio is None:
+        contribuciones = np.empty(forma, dtype=tipo)
+    else:
+        descriptor, ruta = tempfile.mkstemp(suffix=".contrib", dir=directorio)
+        os.close(descriptor)
+        contribuciones = archivo_temporal(ruta, tipo, max(forma[0] * forma[1], 1))[:forma[0] * forma[1]].reshape(forma)
+    for columna in range(m):
+        contribuciones[columna] = distancias_l1(valores[:, columna:columna + 1]).valores
+    return contribuciones
+
+
+def pesos_bootstrap(m: int, iteraciones: int, semilla: int = 0) -> np.ndarray:
+    generador = np.random.default_rng(semilla)
+    return generador.multinomial(m, np.full(m, 1 / m), size=iteraciones)
+
+
+def iteraciones_por_lote(pares: int, tamano_lote: Optional[int] = None) -> int:
+    if tamano_lote is not None:
+        if tamano_lote < 1:
+            raise Exception("El tamaño de lote debe ser positivo")
+        return tamano_lote
+    return max(1, ELEMENTOS_POR_BLOQUE // max(pares, 1))
+
+
+def claves_hojas(n: int, semilla: int = 0) -> np.ndarray:
+    return np.random.default_rng(semilla).integers(0, np.iinfo(np.uint64).max, size=n, dtype=np.uint64, endpoint=True)
+
+
+def clados(tabla: TablaEnlace, claves: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    n = tabla.n
+    if n < 2:
+        vacio = np.empty(0, dtype=np.int64)
+        return vacio, np.empty(0, dtype=np.uint64)
+
+    acumulado = np.zeros(n + 1, dtype=np.uint64)
+    np.cumsum(claves[tabla.orden_hojas], out=acumulado[1:])
+
+    internos = np.arange(n, 2 * n - 1)
+    padre = np.full(2 * n - 1, -1, dtype=np.int64)
+    padre[tabla.izquierdo] = internos
+    padre[tabla.derecho] = internos
+    visibles = internos[(padre[internos] < 0) | (tabla.altura[np.maximum(padre[internos], n) - n] != tabla.altura)]
+
+    inicio = tabla.inicio[visibles].astype(np.int64)
+    return visibles, acumulado[inicio + tabla.tamano[visibles - n]] - acumulado[inicio]
+
+
+def aglomerar(distancias: MatrizDistancias, linkage: str = "single") -> TablaEnlace:
+    if linkage == "single":
+        return tabla_desde_arbol_minimo(distancias.n, *arbol_expansion_minima(distancias))
+    return aglomerar_lance_williams(distancias, linkage)
+
+
+def clados_lote(contribuciones: np.ndarray, pesos: np.ndarray, claves: np.ndarray, linkage: str) -> list[np.ndarray]:
+    matrices = pesos.astype(contribuciones.dtype) @ contribuciones
+    resultado = []
+    for valores in matrices:
+        tabla = aglomerar(MatrizDistancias.desde_valores(valores), linkage)
+        resultado.append(clados(tabla, claves)[1])
+    return resultado
+
+
+def _clados_lote_compartido(entrada: tuple, pesos: np.ndarray, claves: np.ndarray, linkage: str) -> list[np.ndarray]:
+    nombre, forma, tipo, en_archivo = entrada
+    if en_archivo:
+        return clados_lote(np.memmap(nombre, dtype=tipo, mode="r", shape=forma), pesos, claves, linkage)
+
+    memoria = abrir_memoria(nombre)
+    try:
+        contribuciones = np.ndarray(forma, dtype=tipo, buffer=memoria.buf)
+        resultado = clados_lote(contribuciones, pesos, claves, linkage)
+        del contribuciones
+    finally:
+        memoria.close()
+    return resultado
+
+
+def soporte_bootstrap(valores: np.ndarray, tabla: TablaEnlace, iteraciones: int = ITERACIONES, linkage: str = "single", semilla: int = 0, tamano_lote: Optional[int] = None, n_jobs: Optional[int] = 1, avance: Optional[Callable[[int], None]] = None, directorio: Optional[str] = None) -> np.ndarray:
+
+    n, m = valores.shape
+    if iteraciones < 1:
+        raise Exception("La cantidad de iteraciones debe ser al menos 1")
+    if tabla.n != n:
+        raise Exception("La tabla de enlace no corresponde a la grilla")
+
+    claves = claves_hojas(n, semilla)
+    nodos, referencia = clados(tabla, claves)
+    soporte = np.full(max(n - 1, 0), np.nan)
+    if len(nodos) == 0 or m == 0:
+        return soporte
+
+    contribuciones = contribuciones_columnas(valores, directorio)
+    pesos = pesos_bootstrap(m, iteraciones, semilla)
+    paso = iteraciones_por_lote(contribuciones.shape[1], tamano_lote)
+    lotes = [pesos[inicio:inicio + paso] for inicio in range(0, iteraciones, paso)]
+    apariciones = np.zeros(len(nodos), dtype=np.int64)
+
+    def contar(resultado: list[np.ndarray]) -> None:
+        for hallados in resultado:
+            apariciones[:] += np.isin(referencia, hallados)
+        if avance is not None:
+            avance(len(resultado))
+
+    procesos = numero_procesos(n_jobs)
+    if procesos > 1 and len(lotes) > 1:
+        memoria = None
+        if directorio is None:
+            memoria, compartidas = memoria_compartida(contribuciones)
+            entrada = (memoria.name, compartidas.shape, compartidas.dtype.str, False)
+            del compartidas
+        else:
+            contribuciones.flush()
+            entrada = (contribuciones.filename, contribuciones.shape, contribuciones.dtype.str, True)
+        try:
+            with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+                tareas = [ejecutor.submit(_clados_lote_compartido, entrada, lote, claves, linkage) for lote in lotes]
+                for tarea in as_completed(tareas):
+                    contar(tarea.result())
+        finally:
+            if memoria is not None:
+                memoria.close()
+                memoria.unlink()
+    else:
+        for lote in lotes:
+            contar(clados_lote(contribuciones, lote, claves, linkage))
+
+    soporte[nodos - n] = apariciones / iteraciones
+    return soporte
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import os
+import threading
+import numpy as np
+
+from relacion import Relacion
+from distancias import MatrizDistancias
+from enlace import TablaEnlace
+
+
+TAMANO_MEMORIA = 256 << 20
+TAMANO_DISCO = 4 << 30
+
+SUFIJO_DISTANCIAS = ".dist.npy"
+SUFIJO_TABLA = ".tabla.npz"
+
+
+def huella_grilla(grilla: np.ndarray) -> str:
+    resumen = hashlib.sha256()
+    resumen.update(str((grilla.shape, grilla.dtype.str)).encode())
+    resumen.update(np.ascontiguousarray(grilla).data)
+    return resumen.hexdigest()
+
+
+def clave_resultado(huella: str, relacion: Relacion, eje: str, **parametros) -> str:
+    partes = [huella, type(relacion).__name__, repr(sorted(vars(relacion).items())), eje, repr(sorted(parametros.items()))]
+    return hashlib.sha256("|".join(partes).encode()).hexdigest()
+
+
+class CacheResultados():
+
+    directorio: Optional[str]
+    tamano_memoria: int
+    tamano_disco: int
+
+    def __init__(self, directorio: Optional[str] = None, tamano_memoria: int = TAMANO_MEMORIA, tamano_disco: int = TAMANO_DISCO):
+        self.directorio = directorio
+        self.tamano_memoria = tamano_memoria
+        self.tamano_disco = tamano_disco
+        self._memoria = OrderedDict()
+        self._ocupado = 0
+        self._candado = threading.Lock()
+
+        if directorio is not None:
+            os.makedirs(directorio, exist_ok=True)
+
+    def obtener_distancias(self, clave: str) -> Optional[MatrizDistancias]:
+        distancias = self._leer_memoria(clave + SUFIJO_DISTANCIAS)
+        if distancias is None:
+            ruta = self._ruta(clave + SUFIJO_DISTANCIAS)
+            if ruta is not None and os.path.exists(ruta):
+                os.utime(ruta)
+                distancias = MatrizDistancias.desde_valores(np.load(ruta, mmap_mode="r"))
+        return distancias
+
+    def guardar_distancias(self, clave: str, distancias: MatrizDistancias) -> None:
+        self._escribir_memoria(clave + SUFIJO_DISTANCIAS, distancias, distancias.valores.nbytes)
+        ruta = self._ruta(clave + SUFIJO_DISTANCIAS)
+        if ruta is not None:
+            self._escribir_disco(ruta, lambda archivo: np.save(archivo, distancias.valores))
+
+    def obtener_tabla(self, clave: str) -> Optional[TablaEnlace]:
+        tabla = self._leer_memoria(clave + SUFIJO_TABLA)
+        if tabla is None:
+            ruta = self._ruta(clave + SUFIJO_TABLA)
+            if ruta is not None and os.path.exists(ruta):
+                os.utime(ruta)
+                with np.load(ruta) as arreglos:
+                    tabla = TablaEnlace.desde_arreglos(dict(arreglos))
+                self._escribir_memoria(clave + SUFIJO_TABLA, tabla, tabla.nbytes)
+        return tabla
+
+    def guardar_tabla(self, clave: str, tabla: TablaEnlace) -> None:
+        self._escribir_memoria(clave + SUFIJO_TABLA, tabla, tabla.nbytes)
+        ruta = self._ruta(clave + SUFIJO_TABLA)
+        if ruta is not None:
+            self._escribir_disco(ruta, lambda archivo: np.savez(archivo, **tabla.arreglos()))
+
+    def limpiar(self) -> None:
+        with self._candado:
+            self._memoria.clear()
+            self._ocupado = 0
+
+    def _ruta(self, nombre: str) -> Optional[str]:
+        return None if self.directorio is None else os.path.join(self.directorio, nombre)
+
+    def _leer_memoria(self, clave: str):
+        with self._candado:
+            if clave not in self._memoria:
+                return None
+            self._memoria.move_to_end(clave)
+            return self._memoria[clave][0]
+
+    def _escribir_memoria(self, clave: str, objeto, tamano: int) -> None:
+        if tamano > self.tamano_memoria:
+            return
+        with self._candado:
+            if clave in self._memoria:
+                self._ocupado -= self._memoria.pop(clave)[1]
+            self._memoria[clave] = (objeto, tamano)
+            self._ocupado += tamano
+            while self._ocupado > self.tamano_memoria:
+                _, (_, liberado) = self._memoria.popitem(last=False)
+                self._ocupado -= liberado
+
+    def _escribir_disco(self, ruta: str, escribir) -> None:
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, "wb") as archivo:
+            escribir(archivo)
+        os.replace(temporal, ruta)
+        self._recortar_disco()
+
+    def _recortar_disco(self) -> None:
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith((SUFIJO_DISTANCIAS, SUFIJO_TABLA)):
+                estado = os.stat(os.path.join(self.directorio, nombre))
+                entradas.append((estado.st_mtime, estado.st_size, nombre))
+
+        ocupado = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, nombre in sorted(entradas):
+            if ocupado <= self.tamano_disco:
+                break
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+            except FileNotFoundError:
+                pass
+            ocupado -= tamano
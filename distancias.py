@@ -0,0 +1,338 @@
+from typing import Callable, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import os
+import sys
+import tempfile
+import weakref
+import numpy as np
+
+
+ELEMENTOS_POR_BLOQUE = 1 << 22
+
+
+class MatrizDistancias():
+
+    n: int
+    valores: np.ndarray
+    ruta: Optional[str]
+
+    def __init__(self, n: int, tipo: np.dtype, directorio: Optional[str] = None):
+        self.n = n
+        self.ruta = None
+        tamano = n * (n - 1) // 2
+
+        if directorio is None:
+            self.valores = np.zeros(tamano, dtype=tipo)
+        else:
+            descriptor, self.ruta = tempfile.mkstemp(suffix=".dist", dir=directorio)
+            os.close(descriptor)
+            self.valores = archivo_temporal(self.ruta, tipo, max(tamano, 1))[:tamano]
+
+    @classmethod
+    def desde_valores(cls, valores: np.ndarray) -> 'MatrizDistancias':
+        distancias = cls.__new__(cls)
+        distancias.n = int(round((1 + np.sqrt(1 + 8 * len(valores))) / 2)) if len(valores) > 0 else 1
+        distancias.ruta = None
+        distancias.valores = valores
+        return distancias
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (self.n, self.n)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.valores.dtype
+
+    @staticmethod
+    def inicio_fila(i):
+        return i * (i - 1) // 2
+
+    def indices(self, i: int, j: np.ndarray) -> np.ndarray:
+        mayor = np.maximum(i, j)
+        menor = np.minimum(i, j)
+        return self.inicio_fila(mayor) + menor
+
+    def __getitem__(self, clave):
+        if not isinstance(clave, tuple):
+            clave = (clave, slice(None))
+        i, j = clave
+        i = int(i)
+
+        if isinstance(j, (int, np.integer)):
+            return self.valores.dtype.type(0) if i == j else self.valores[self.indices(i, j)]
+
+        j = np.arange(self.n)[j] if isinstance(j, slice) else np.asarray(j)
+        fila = np.zeros(len(j), dtype=self.valores.dtype)
+        distintos = j != i
+        fila[distintos] = self.valores[self.indices(i, j[distintos])]
+        return fila
+
+    def filas(self, inicio: int, fin: int) -> np.ndarray:
+        return self.valores[self.inicio_fila(inicio):self.inicio_fila(fin)]
+
+    def ampliar(self, grilla: np.ndarray, tamano_bloque: Optional[int] = None) -> 'MatrizDistancias':
+
+        n = self.n
+        total = grilla.shape[0]
+        tipo = np.promote_types(self.dtype, tipo_distancias(grilla))
+        tamano = total * (total - 1) // 2
+
+        ampliada = MatrizDistancias.__new__(MatrizDistancias)
+        ampliada.n = total
+        ampliada.ruta = self.ruta
+        reserva = getattr(self, "_reserva", self.valores)
+
+        if getattr(self, "_reserva_libre", True) and tipo == self.dtype and reserva.flags.writeable and len(reserva) >= tamano:
+            ampliada._reserva = reserva
+        else:
+            capacidad = max(tamano, len(self.valores) + len(self.valores) // 2)
+            if self.ruta is None:
+                ampliada._reserva = np.empty(capacidad, dtype=tipo)
+            else:
+                descriptor, ampliada.ruta = tempfile.mkstemp(suffix=".dist", dir=os.path.dirname(self.ruta))
+                os.close(descriptor)
+                ampliada._reserva = archivo_temporal(ampliada.ruta, tipo, capacidad)
+            ampliada._reserva[:len(self.valores)] = self.valores
+
+        self._reserva_libre = False
+        ampliada.valores = ampliada._reserva[:tamano]
+
+        columnas = np.ascontiguousarray(grilla.T)
+        paso = filas_por_bloque(total, tamano_bloque)
+        for inicio in range(n, total, paso):
+            escribir_bloque(ampliada.valores, columnas, inicio, min(inicio + paso, total))
+
+        return ampliada
+
+    def cuadrada(self) -> np.ndarray:
+        matriz = np.zeros((self.n, self.n))
+        for i in range(1, self.n):
+            fila = self.valores[self.inicio_fila(i):self.inicio_fila(i + 1)]
+            matriz[i, :i] = fila
+            matriz[:i, i] = fila
+        return matriz
+
+
+def _borrar_archivo(ruta: str) -> None:
+    if os.path.exists(ruta):
+        os.remove(ruta)
+
+
+def archivo_temporal(ruta: str, tipo: np.dtype, tamano: int) -> np.memmap:
+    reserva = np.memmap(ruta, dtype=tipo, mode="w+", shape=(tamano,))
+    weakref.finalize(reserva, _borrar_archivo, ruta)
+    return reserva
+
+
+def filas_por_bloque(n: int, tamano_bloque: Optional[int] = None) -> int:
+    if tamano_bloque is not None:
+        if tamano_bloque < 1:
+            raise Exception("El tamaño de bloque debe ser positivo")
+        return tamano_bloque
+    return max(1, min(n, ELEMENTOS_POR_BLOQUE // max(n, 1)))
+
+
+def tipo_acumulador(tipo: np.dtype) -> np.dtype:
+    if np.issubdtype(tipo, np.integer) or np.issubdtype(tipo, np.bool_):
+        return np.dtype(np.int64)
+    return np.dtype(np.float64)
+
+
+def tipo_distancias(valores: np.ndarray) -> np.dtype:
+    if valores.size == 0:
+        return np.dtype(np.uint8)
+    if tipo_acumulador(valores.dtype) != np.int64:
+        return np.dtype(np.float64)
+    cota = int(valores.shape[1]) * (int(valores.max()) - int(valores.min()))
+    return np.min_scalar_type(cota)
+
+
+def bloque_l1(columnas: np.ndarray, inicio: int, fin: int, suma_inversion: Optional[float] = None) -> np.ndarray:
+    tipo = tipo_acumulador(columnas.dtype)
+    filas = fin - inicio
+    acumulado = np.zeros((filas, fin), dtype=tipo)
+    auxiliar = np.empty_like(acumulado)
+    invertido = None if suma_inversion is None else np.zeros_like(acumulado)
+    inversion = None if suma_inversion is None else tipo.type(suma_inversion)
+
+    for columna in columnas:
+        previas = columna[:fin].astype(tipo, copy=False)
+        np.subtract(previas[inicio:, None], previas[None, :], out=auxiliar)
+        np.abs(auxiliar, out=auxiliar)
+        acumulado += auxiliar
+        if invertido is not None:
+            np.add(previas[inicio:, None], previas[None, :], out=auxiliar)
+            auxiliar -= inversion
+            np.abs(auxiliar, out=auxiliar)
+            invertido += auxiliar
+
+    if invertido is not None:
+        np.minimum(acumulado, invertido, out=acumulado)
+    return acumulado
+
+
+if hasattr(np, "bitwise_count"):
+    def contar_bits(palabras: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(palabras)
+else:
+    BITS_POR_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def contar_bits(palabras: np.ndarray) -> np.ndarray:
+        return BITS_POR_BYTE[palabras.view(np.uint8)].reshape(*palabras.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+
+def empaquetar_bits(valores: np.ndarray) -> np.ndarray:
+    if valores.size and (valores.min() < 0 or valores.max() > 1):
+        raise Exception("El kernel de Hamming requiere datos binarios")
+    bytes_fila = np.packbits(valores.astype(bool, copy=False), axis=1)
+    bytes_fila = np.pad(bytes_fila, ((0, 0), (0, -bytes_fila.shape[1] % 8)))
+    return np.ascontiguousarray(np.ascontiguousarray(bytes_fila).view(np.uint64).T)
+
+
+def bloque_hamming(palabras: np.ndarray, inicio: int, fin: int, bits_inversion: Optional[int] = None) -> np.ndarray:
+    filas = fin - inicio
+    acumulado = np.zeros((filas, fin), dtype=np.int64)
+    auxiliar = np.empty((filas, fin), dtype=np.uint64)
+
+    for palabra in palabras:
+        previas = palabra[:fin]
+        np.bitwise_xor(previas[inicio:, None], previas[None, :], out=auxiliar)
+        acumulado += contar_bits(auxiliar)
+
+    if bits_inversion is not None:
+        np.minimum(acumulado, bits_inversion - acumulado, out=acumulado)
+    return acumulado
+
+
+def escribir_bloque(valores: np.ndarray, columnas: np.ndarray, inicio: int, fin: int, suma_inversion: Optional[float] = None, kernel: Callable = bloque_l1) -> None:
+    bloque = kernel(columnas, inicio, fin, suma_inversion)
+    triangulo = np.arange(fin)[None, :] < np.arange(inicio, fin)[:, None]
+    valores[MatrizDistancias.inicio_fila(inicio):MatrizDistancias.inicio_fila(fin)] = bloque[triangulo]
+
+
+def numero_procesos(n_jobs: Optional[int]) -> int:
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    if n_jobs == 0:
+        raise Exception("n_jobs no puede ser 0")
+    return n_jobs
+
+
+def abrir_memoria(nombre: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=nombre, track=False)
+    return shared_memory.SharedMemory(name=nombre)
+
+
+def memoria_compartida(valores: np.ndarray) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    memoria = shared_memory.SharedMemory(create=True, size=max(valores.nbytes, 1))
+    copia = np.ndarray(valores.shape, dtype=valores.dtype, buffer=memoria.buf)
+    copia[...] = valores
+    return memoria, copia
+
+
+def _calcular_bloque(entrada: tuple, salida: tuple, inicio: int, fin: int, suma_inversion: Optional[float], kernel: Callable) -> int:
+
+    nombre_entrada, forma, tipo_entrada = entrada
+    en_archivo, destino, tipo_salida, tamano = salida
+    memoria_entrada = abrir_memoria(nombre_entrada)
+    memoria_salida = None
+
+    try:
+        columnas = np.ndarray(forma, dtype=tipo_entrada, buffer=memoria_entrada.buf)
+        if en_archivo:
+            valores = np.memmap(destino, dtype=tipo_salida, mode="r+", shape=(max(tamano, 1),))
+        else:
+            memoria_salida = abrir_memoria(destino)
+            valores = np.ndarray((max(tamano, 1),), dtype=tipo_salida, buffer=memoria_salida.buf)
+
+        escribir_bloque(valores, columnas, inicio, fin, suma_inversion, kernel)
+
+        if en_archivo:
+            valores.flush()
+        del columnas, valores
+    finally:
+        memoria_entrada.close()
+        if memoria_salida is not None:
+            memoria_salida.close()
+
+    return fin - inicio
+
+
+def _distancias_paralelas(columnas: np.ndarray, distancias: MatrizDistancias, paso: int, procesos: int, avance: Optional[Callable[[int], None]], suma_inversion: Optional[float], kernel: Callable) -> None:
+
+    n = distancias.n
+    tamano = len(distancias.valores)
+    memoria_entrada, compartidas = memoria_compartida(columnas)
+    memoria_salida = None
+
+    try:
+        if distancias.ruta is not None:
+            distancias.valores.flush()
+            destino = os.path.abspath(distancias.ruta)
+        else:
+            memoria_salida = shared_memory.SharedMemory(create=True, size=max(distancias.valores.nbytes, 1))
+            destino = memoria_salida.name
+
+        entrada = (memoria_entrada.name, compartidas.shape, compartidas.dtype.str)
+        salida = (distancias.ruta is not None, destino, distancias.dtype.str, tamano)
+        bloques = [(inicio, min(inicio + paso, n)) for inicio in range(0, n, paso)]
+
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            tareas = [ejecutor.submit(_calcular_bloque, entrada, salida, inicio, fin, suma_inversion, kernel) for inicio, fin in reversed(bloques)]
+            for tarea in as_completed(tareas):
+                filas = tarea.result()
+                if avance is not None:
+                    avance(filas)
+
+        if memoria_salida is not None:
+            resultado = np.ndarray((tamano,), dtype=distancias.dtype, buffer=memoria_salida.buf)
+            distancias.valores[:] = resultado
+            del resultado
+    finally:
+        del compartidas
+        memoria_entrada.close()
+        memoria_entrada.unlink()
+        if memoria_salida is not None:
+            memoria_salida.close()
+            memoria_salida.unlink()
+
+
+def _llenar_distancias(columnas: np.ndarray, distancias: MatrizDistancias, tamano_bloque: Optional[int], avance: Optional[Callable[[int], None]], suma_inversion: Optional[float], n_jobs: Optional[int], kernel: Callable) -> MatrizDistancias:
+
+    n = distancias.n
+    paso = filas_por_bloque(n, tamano_bloque)
+    procesos = numero_procesos(n_jobs)
+
+    if procesos > 1 and n > paso:
+        _distancias_paralelas(columnas, distancias, paso, procesos, avance, suma_inversion, kernel)
+        return distancias
+
+    for inicio in range(0, n, paso):
+        fin = min(inicio + paso, n)
+        escribir_bloque(distancias.valores, columnas, inicio, fin, suma_inversion, kernel)
+        if avance is not None:
+            avance(fin - inicio)
+
+    return distancias
+
+
+def distancias_l1(valores: np.ndarray, tamano_bloque: Optional[int] = None, avance: Optional[Callable[[int], None]] = None, suma_inversion: Optional[float] = None, directorio: Optional[str] = None, n_jobs: Optional[int] = 1) -> MatrizDistancias:
+
+    distancias = MatrizDistancias(valores.shape[0], tipo_distancias(valores), directorio)
+    return _llenar_distancias(np.ascontiguousarray(valores.T), distancias, tamano_bloque, avance, suma_inversion, n_jobs, bloque_l1)
+
+
+def distancias_hamming(valores: np.ndarray, tamano_bloque: Optional[int] = None, avance: Optional[Callable[[int], None]] = None, invertir: bool = False, directorio: Optional[str] = None, n_jobs: Optional[int] = 1) -> MatrizDistancias:
+
+    distancias = MatrizDistancias(valores.shape[0], tipo_distancias(valores), directorio)
+    bits_inversion = valores.shape[1] if invertir else None
+    return _llenar_distancias(empaquetar_bits(valores), distancias, tamano_bloque, avance, bits_inversion, n_jobs, bloque_hamming)
+
+
+def matriz_l1(valores: np.ndarray, tamano_bloque: Optional[int] = None, avance: Optional[Callable[[int], None]] = None, suma_inversion: Optional[float] = None) -> np.ndarray:
+    return distancias_l1(valores, tamano_bloque, avance, suma_inversion).cuadrada()
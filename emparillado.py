@@ -1,99 +1,329 @@
-from typing import Type
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence, Type, Union
 import numpy as np
 import pandas as pd
 
-from relacion import Relacion
+from relacion import Relacion, Dicotomica
 from nodo import Nodo
 from arbol import Arbol
-from tqdm import tqdm
+from distancias import MatrizDistancias, distancias_hamming, distancias_l1
+from cache import CacheResultados, clave_resultado, huella_grilla
+from ingesta import TAMANO_CHUNK, Fuente, construir_grilla
+from enlace import TablaEnlace, aglomerar_lance_williams, ampliar_arbol_minimo, coeficientes_lance_williams, arbol_expansion_minima, arbol_minimo_desde_tabla, tabla_desde_arbol_minimo
+from vecinos import MUESTRA, PROYECCIONES, REFINAMIENTOS, VECINOS, calidad_aproximada, tabla_aproximada
+from progreso import Observador, ObservadorNulo, ObservadorTqdm, medir_etapa
+from bootstrap import ITERACIONES, soporte_bootstrap
+from verificacion import MAXIMO_DIFERENCIAS, MUESTRA_VERIFICACION, arbol_desde_mezclas, diferencias_arboles, diferencias_mezclas, matriz_referencia, muestra_indices, tabla_desde_nodo, validar_enlace_motor, validar_motor
+
+
+ELEMENTOS = "elementos"
+CARACTERISTICAS = "caracteristicas"
 
 
 class Emparillador():
     
-    datos: pd.DataFrame
+    grilla: np.ndarray
+    indice: pd.Index
+    columnas: pd.Index
     metadata: dict
     relacion: Relacion
+    tamano_bloque: Optional[int]
+    directorio_distancias: Optional[str]
+    n_jobs: Optional[int]
+    cache: CacheResultados
+    observador: Observador
+    engine: str
+    muestra_verificacion: int
     
-    def __init__(self, datos: pd.DataFrame, tipo_relacion: Relacion, label_points: bool = False) -> None:
+    def __init__(self, datos: Union[pd.DataFrame, np.ndarray], tipo_relacion: Relacion, label_points: bool = False, tamano_bloque: Optional[int] = None, directorio_distancias: Optional[str] = None, n_jobs: Optional[int] = 1, cache: Union[None, str, CacheResultados] = None, observador: Optional[Observador] = None, etiquetas_filas: Optional[Sequence] = None, etiquetas_columnas: Optional[Sequence] = None, engine: str = "rapido", muestra_verificacion: int = MUESTRA_VERIFICACION) -> None:
         
-        if datos.index.name in datos.columns:
+        if isinstance(datos, np.ndarray):
+            if datos.ndim != 2:
+                raise Exception("La grilla de datos debe ser bidimensional")
+            datos = pd.DataFrame(datos, index=etiquetas_filas, columns=etiquetas_columnas, copy=False)
+        elif datos.index.name in datos.columns:
             datos = datos.drop(columns=[datos.index.name])
         
         if not tipo_relacion.es_relacion_valida(datos):
             raise Exception("La relacion no es valida para el conjunto de datos propuesto")
         
-        self.datos, self.metadata = tipo_relacion.procesar_relacion(datos)
+        observador = ObservadorTqdm() if observador is None else observador
+        with medir_etapa(observador, "procesar_relacion") as avance:
+            procesados, metadata = tipo_relacion.procesar_relacion(datos)
+            avance(procesados.shape[0])
+        self._inicializar(procesados.to_numpy(), procesados.index, procesados.columns, metadata, tipo_relacion, label_points, tamano_bloque, directorio_distancias, n_jobs, cache, observador, engine, muestra_verificacion)
+    
+    def _inicializar(self, grilla: np.ndarray, indice: Sequence, columnas: Sequence, metadata: dict, tipo_relacion: Relacion, label_points: bool = False, tamano_bloque: Optional[int] = None, directorio_distancias: Optional[str] = None, n_jobs: Optional[int] = 1, cache: Union[None, str, CacheResultados] = None, observador: Optional[Observador] = None, engine: str = "rapido", muestra_verificacion: int = MUESTRA_VERIFICACION) -> None:
+        self.grilla = np.ascontiguousarray(grilla)
+        self.indice = pd.Index(indice)
+        self.columnas = pd.Index(columnas)
+        self.metadata = metadata
         self.relacion = tipo_relacion
         self.label_points = label_points
+        self.tamano_bloque = tamano_bloque
+        self.directorio_distancias = directorio_distancias
+        self.n_jobs = n_jobs
+        self.cache = cache if isinstance(cache, CacheResultados) else CacheResultados(cache)
+        self.observador = ObservadorTqdm() if observador is None else observador
+        self.engine = validar_motor(engine)
+        self.muestra_verificacion = muestra_verificacion
+        self._huella = None
+        self._matriz_elementos = None
+        self._tabla_elementos = None
+    
+    @classmethod
+    def desde_fuente(cls, fuente: Fuente, tipo_relacion: Relacion, tamano_chunk: int = TAMANO_CHUNK, ruta_grilla: Optional[str] = None, opciones_lectura: Optional[dict] = None, **opciones) -> 'Emparillador':
         
-    def clasificar_elementos(self) -> Arbol:
+        observador = opciones.get("observador") or ObservadorTqdm()
+        opciones["observador"] = observador
+        with medir_etapa(observador, "ingesta") as avance:
+            grilla, indice, columnas, metadata = construir_grilla(fuente, tipo_relacion, tamano_chunk, ruta_grilla, opciones_lectura)
+            avance(grilla.shape[0])
         
-        arbol = [Nodo([x], 0, []) for x in range(self.datos.shape[0])]
-        matriz = self._matriz_diferencias_elementos()
-        arbol = self._generar_arbol(arbol, matriz)
+        emparillador = cls.__new__(cls)
+        emparillador._inicializar(grilla, indice, columnas, metadata, tipo_relacion, **opciones)
+        return emparillador
+    
+    @property
+    def datos(self) -> pd.DataFrame:
+        return pd.DataFrame(self.grilla, index=self.indice, columns=self.columnas, copy=False)
+        
+    def clasificar_elementos(self, aproximado: bool = False, vecinos: int = VECINOS, muestra: int = MUESTRA, linkage: str = "single") -> Arbol:
         
-        return Arbol("Elementos",arbol[0], self.datos.index, self.label_points)
+        if aproximado:
+            if linkage != "single":
+                raise Exception("El modo aproximado solo admite enlace simple")
+            return self._clasificar_aproximado(vecinos, muestra)
+        
+        return self._clasificar(ELEMENTOS, linkage)
+    
+    def _clasificar_aproximado(self, vecinos: int, muestra: int) -> Arbol:
+        
+        valores = self.grilla
+        clave = self._clave(ELEMENTOS, aproximado=True, vecinos=vecinos)
+        tabla = self.cache.obtener_tabla(clave)
+        if tabla is None:
+            with medir_etapa(self.observador, "vecinos", PROYECCIONES + REFINAMIENTOS) as avance:
+                tabla = tabla_aproximada(valores, vecinos, avance=avance)
+            self.cache.guardar_tabla(clave, tabla)
+        
+        return self._arbol("Elementos", tabla, self.indice, calidad_aproximada(valores, tabla, muestra))
 
 
-    def clasificar_caracteristicas(self) -> Arbol:
+    def bootstrap(self, n_iter: int = ITERACIONES, linkage: str = "single", semilla: int = 0, tamano_lote: Optional[int] = None) -> Arbol:
         
-        arbol = [Nodo([x], 0, []) for x in range(self.datos.shape[1])]
-        matriz = self._matriz_diferencias_elementos()
-        arbol = self._generar_arbol(arbol, matriz)
+        tabla = self._tabla(ELEMENTOS, linkage=linkage)
+        with medir_etapa(self.observador, "bootstrap", n_iter) as avance:
+            soporte = soporte_bootstrap(self.grilla, tabla, n_iter, linkage, semilla, tamano_lote, self.n_jobs, avance, self.directorio_distancias)
         
-        return Arbol("Caracteristicas",arbol[0], self.datos.columns, self.label_points)
+        arbol = self._arbol("Elementos", tabla.con_soporte(soporte), self.indice, linkage=linkage)
+        arbol.metadata["bootstrap"] = {"iteraciones": n_iter, "semilla": semilla}
+        return arbol
+    
+    def clasificar_caracteristicas(self, linkage: str = "single") -> Arbol:
         
-    def _generar_arbol(self, arbol, matriz):
-        from tqdm import tqdm
+        return self._clasificar(CARACTERISTICAS, linkage)
+    
+    def clasificar_todo(self, concurrente: bool = True, linkage: str = "single") -> tuple[Arbol, Arbol]:
+        
+        if self.engine != "rapido":
+            return self._clasificar(ELEMENTOS, linkage), self._clasificar(CARACTERISTICAS, linkage)
         
-        for _ in tqdm(range(len(arbol)-1), desc="Reduciendo arbol"):
-            arbol = self._reducir_arbol(arbol, matriz)
+        valores = self.grilla
+        self._clave(ELEMENTOS)
+        
+        if concurrente:
+            with ThreadPoolExecutor(max_workers=2) as ejecutor:
+                futuros = [ejecutor.submit(self._tabla, eje, valores, linkage) for eje in (ELEMENTOS, CARACTERISTICAS)]
+                elementos, caracteristicas = [futuro.result() for futuro in futuros]
+        else:
+            elementos, caracteristicas = [self._tabla(eje, valores, linkage) for eje in (ELEMENTOS, CARACTERISTICAS)]
+        
+        return (
+            self._arbol("Elementos", elementos, self.indice, linkage=linkage),
+            self._arbol("Caracteristicas", caracteristicas, self.columnas, linkage=linkage),
+        )
+        
+    def agregar_elementos(self, nuevas_filas: pd.DataFrame) -> Arbol:
+        
+        if nuevas_filas.index.name in nuevas_filas.columns:
+            nuevas_filas = nuevas_filas.drop(columns=[nuevas_filas.index.name])
+        if set(nuevas_filas.columns) != set(self.columnas):
+            raise Exception("Las nuevas filas deben tener las mismas columnas que los datos originales")
+        
+        nuevas = self.relacion.transformar_con_metadata(nuevas_filas[self.columnas], self.metadata)
+        distancias = self._distancias(ELEMENTOS)
+        tabla = self._tabla(ELEMENTOS)
+        
+        n = self.grilla.shape[0]
+        k = nuevas.shape[0]
+        valores = self.grilla
+        grilla = np.concatenate([valores, nuevas.astype(np.promote_types(valores.dtype, nuevas.dtype))])
+        
+        with medir_etapa(self.observador, "agregar_elementos", k) as avance:
+            distancias = distancias.ampliar(grilla, self.tamano_bloque)
+            origen, destino, peso = arbol_minimo_desde_tabla(tabla)
+            origen, destino, peso = ampliar_arbol_minimo(origen, destino, peso, distancias, n, k)
+            tabla = tabla_desde_arbol_minimo(n + k, origen, destino, peso)
+            avance(k)
+        
+        self.grilla = grilla
+        self.indice = self.indice.append(nuevas_filas.index)
+        self._huella = None
+        self._matriz_elementos = distancias
+        self._tabla_elementos = tabla
+        self.cache.guardar_distancias(self._clave(ELEMENTOS), distancias)
+        self.cache.guardar_tabla(self._clave(ELEMENTOS), tabla)
+        
+        return self._arbol("Elementos", tabla, self.indice)
+    
+    def _clasificar(self, eje: str, linkage: str = "single") -> Arbol:
+        
+        validar_enlace_motor(self.engine, linkage)
+        if self.engine == "referencia":
+            return self._arbol_referencia(eje, linkage)
+        
+        nombre, etiquetas = ("Elementos", self.indice) if eje == ELEMENTOS else ("Caracteristicas", self.columnas)
+        arbol = self._arbol(nombre, self._tabla(eje, linkage=linkage), etiquetas, linkage=linkage)
+        if self.engine == "verificar":
+            self._verificar(eje, linkage, arbol)
         return arbol
-
-    def _matriz_diferencias_elementos(self) -> np.ndarray:
+    
+    def _arbol_referencia(self, eje: str, linkage: str = "single") -> Arbol:
         
-        n = self.datos.shape[0]
-        matriz = np.zeros((n, n))
+        nombre, etiquetas = ("Elementos", self.indice) if eje == ELEMENTOS else ("Caracteristicas", self.columnas)
+        matriz = self._matriz_referencia(eje)
         
-        for i in tqdm(range(n), desc="Generando matriz"):
-            for j in range(i+1, n):
-                matriz[i][j] = np.sum(np.abs(self.datos.iloc[i] - self.datos.iloc[j]))
-                matriz[j][i] = matriz[i][j]
-                
-        return matriz
+        n = matriz.shape[0]
+        arbol = [Nodo([i], 0, []) for i in range(n)]
+        with medir_etapa(self.observador, "aglomeracion", n - 1) as avance:
+            while len(arbol) > 1:
+                arbol = self._reducir_arbol(arbol, matriz, linkage)
+                avance(1)
+        
+        return self._arbol(nombre, tabla_desde_nodo(arbol[0], n), etiquetas, linkage=linkage)
     
-    def _matriz_diferencias_caracteristicas(self) -> np.ndarray:
+    def _matriz_referencia(self, eje: str) -> np.ndarray:
         
-        n = self.datos.shape[1]
-        matriz_aux = np.zeros((n, n))
-        matriz = np.zeros((n, n))
-        
-        inverted_datos = self.datos.max().max() - self.datos + self.datos.min().min()
-         
-        for i in range(n):
-            for j in range(i+1, n):
-                matriz_aux[i][j] = np.sum(np.abs(self.datos.iloc[i] - self.datos.iloc[j]))
-                matriz_aux[j][i] = np.sum(np.abs(inverted_datos.iloc[i] - self.datos.iloc[j]))
-                
-        for i in range(n):
-            for j in range(i+1, n):
-                matriz[i][j] = min(matriz_aux[i][j], matriz_aux[j][i])
-                matriz[j][i] = matriz[i][j]
-                        
+        if eje == ELEMENTOS:
+            valores, suma_inversion = self.grilla, None
+        else:
+            valores, suma_inversion = self.grilla.T, int(self.grilla.max()) + int(self.grilla.min())
+        
+        with medir_etapa(self.observador, "distancias", valores.shape[0]) as avance:
+            matriz = matriz_referencia(valores, suma_inversion)
+            avance(valores.shape[0])
         return matriz
     
-    def _comparar_nodos(self, nodo1, nodo2, matriz: np.ndarray):
+    def _verificar(self, eje: str, linkage: str, arbol: Arbol) -> None:
+        
+        total = self.grilla.shape[0] if eje == ELEMENTOS else self.grilla.shape[1]
+        elegidos = muestra_indices(total, self.muestra_verificacion)
+        
+        muestra = Emparillador.__new__(Emparillador)
+        grilla = self.grilla[elegidos] if eje == ELEMENTOS else self.grilla[:, elegidos]
+        muestra._inicializar(grilla, np.arange(grilla.shape[0]), np.arange(grilla.shape[1]), self.metadata, self.relacion, tamano_bloque=self.tamano_bloque, observador=ObservadorNulo())
+        rapido = arbol if len(elegidos) == total else muestra._clasificar(eje, linkage)
+        
+        diferencias = diferencias_mezclas(muestra._matriz_referencia(eje), rapido.tabla, linkage)
+        diferencias += diferencias_arboles(arbol_desde_mezclas(rapido.tabla), rapido.nodo)
+        if diferencias:
+            raise Exception("El motor rapido difiere de la referencia: " + "; ".join(diferencias[:MAXIMO_DIFERENCIAS]))
+    
+    def _metadata(self, linkage: str = "single") -> dict:
+        return {"relacion": type(self.relacion).__name__, "parametros": vars(self.relacion), "metadata": self.metadata, "linkage": linkage}
+    
+    def _arbol(self, nombre: str, tabla: TablaEnlace, etiquetas: pd.Index, calidad: Optional[dict] = None, linkage: str = "single") -> Arbol:
+        return Arbol.desde_tabla(nombre, tabla, etiquetas, self.label_points, calidad, self._metadata(linkage))
+    
+    def _clave(self, eje: str, **parametros) -> str:
+        if self._huella is None:
+            self._huella = huella_grilla(self.grilla)
+        return clave_resultado(self._huella, self.relacion, eje, **parametros)
+    
+    def _tabla(self, eje: str, valores: Optional[np.ndarray] = None, linkage: str = "single") -> TablaEnlace:
+        coeficientes_lance_williams(linkage, 1, 1)
+        residente = eje == ELEMENTOS and linkage == "single"
+        if residente and self._tabla_elementos is not None:
+            return self._tabla_elementos
+        clave = self._clave(eje) if linkage == "single" else self._clave(eje, linkage=linkage)
+        tabla = self.cache.obtener_tabla(clave)
+        if tabla is None:
+            tabla = self._generar_tabla(self._distancias(eje, valores), linkage)
+            self.cache.guardar_tabla(clave, tabla)
+        if residente:
+            self._tabla_elementos = tabla
+        return tabla
+    
+    def _distancias(self, eje: str, valores: Optional[np.ndarray] = None) -> MatrizDistancias:
+        if eje == ELEMENTOS and self._matriz_elementos is not None:
+            return self._matriz_elementos
+        clave = self._clave(eje)
+        distancias = self.cache.obtener_distancias(clave)
+        if distancias is None:
+            distancias = self._distancias_elementos(valores) if eje == ELEMENTOS else self._distancias_caracteristicas(valores)
+            self.cache.guardar_distancias(clave, distancias)
+        if eje == ELEMENTOS:
+            self._matriz_elementos = distancias
+        return distancias
+        
+    def _generar_tabla(self, matriz, linkage: str = "single") -> TablaEnlace:
+        
+        with medir_etapa(self.observador, "aglomeracion", matriz.shape[0] - 1) as avance:
+            if linkage != "single":
+                return aglomerar_lance_williams(matriz, linkage, avance, self.directorio_distancias)
+            origen, destino, peso = arbol_expansion_minima(matriz, avance)
+        return tabla_desde_arbol_minimo(matriz.shape[0], origen, destino, peso)
+    
+    def _generar_arbol(self, arbol, matriz):
+        tabla = self._generar_tabla(matriz)
+        return [Nodo.de_tabla(tabla, tabla.raiz)]
+
+    def _binaria(self) -> bool:
+        return isinstance(self.relacion, Dicotomica)
+    
+    def _distancias_elementos(self, valores: Optional[np.ndarray] = None) -> MatrizDistancias:
+        
+        valores = self.grilla if valores is None else valores
+        with medir_etapa(self.observador, "distancias", self.grilla.shape[0]) as avance:
+            if self._binaria():
+                return distancias_hamming(valores, self.tamano_bloque, avance, directorio=self.directorio_distancias, n_jobs=self.n_jobs)
+            return distancias_l1(valores, self.tamano_bloque, avance, directorio=self.directorio_distancias, n_jobs=self.n_jobs)
+    
+    def _distancias_caracteristicas(self, valores: Optional[np.ndarray] = None) -> MatrizDistancias:
+        
+        valores = self.grilla if valores is None else valores
+        suma_inversion = int(valores.max()) + int(valores.min())
+        
+        with medir_etapa(self.observador, "distancias", self.grilla.shape[1]) as avance:
+            if self._binaria():
+                return distancias_hamming(valores.T, self.tamano_bloque, avance, True, self.directorio_distancias, self.n_jobs)
+            return distancias_l1(valores.T, self.tamano_bloque, avance, suma_inversion, self.directorio_distancias, self.n_jobs)
+
+    def _matriz_diferencias_elementos(self) -> np.ndarray:
+        return self._distancias(ELEMENTOS).cuadrada()
+    
+    def _matriz_diferencias_caracteristicas(self) -> np.ndarray:
+        return self._distancias(CARACTERISTICAS).cuadrada()
+    
+    def _comparar_nodos(self, nodo1, nodo2, matriz: np.ndarray, linkage: str = "single"):
     
         
         nodo_pairs = [(v1, v2, matriz[v1][v2]) for v1 in nodo1.elementos for v2 in nodo2.elementos]
         nodo_pairs.sort(key=lambda x: x[2])
 
+        if linkage == "complete":
+            return nodo_pairs[-1][2]
+        if linkage == "average":
+            return sum(pair[2] for pair in nodo_pairs) / len(nodo_pairs)
+        if linkage != "single":
+            raise Exception(f"El motor de referencia no implementa el enlace {linkage}")
         return nodo_pairs[0][2]
         
 
-    def _reducir_arbol(self, arbol: list[Nodo], matriz: np.ndarray) -> list[Nodo]:
+    def _reducir_arbol(self, arbol: list[Nodo], matriz: np.ndarray, linkage: str = "single") -> list[Nodo]:
         
-        nodos_pairs = [(arbol[i], arbol[j], self._comparar_nodos(arbol[i], arbol[j], matriz)) for i in range(len(arbol)) for j in range(1, len(arbol)) if i < j]
+        nodos_pairs = [(arbol[i], arbol[j], self._comparar_nodos(arbol[i], arbol[j], matriz, linkage)) for i in range(len(arbol)) for j in range(1, len(arbol)) if i < j]
         nodos_pairs.sort(key=lambda x: x[2])
         
         nodo1 = nodos_pairs[0][0]
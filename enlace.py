@@ -0,0 +1,374 @@
+from typing import Callable, Optional
+import numpy as np
+
+from distancias import MatrizDistancias
+
+
+ENLACES = ("single", "complete", "average", "weighted")
+
+
+def arbol_expansion_minima(matriz: np.ndarray, avance: Optional[Callable[[int], None]] = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    n = matriz.shape[0]
+    origen = np.empty(max(n - 1, 0), dtype=np.int64)
+    destino = np.empty(max(n - 1, 0), dtype=np.int64)
+    peso = np.empty(max(n - 1, 0), dtype=np.float64)
+
+    pendientes = np.arange(1, n)
+    distancia = np.asarray(matriz[0, 1:], dtype=np.float64).copy()
+    padre = np.zeros(n - 1, dtype=np.int64)
+
+    for k in range(n - 1):
+        posicion = int(np.argmin(distancia))
+        nuevo = pendientes[posicion]
+        origen[k] = padre[posicion]
+        destino[k] = nuevo
+        peso[k] = distancia[posicion]
+
+        pendientes = np.delete(pendientes, posicion)
+        distancia = np.delete(distancia, posicion)
+        padre = np.delete(padre, posicion)
+
+        fila = matriz[nuevo, pendientes]
+        mejora = fila < distancia
+        distancia[mejora] = fila[mejora]
+        padre[mejora] = nuevo
+
+        if avance is not None:
+            avance(1)
+
+    return origen, destino, peso
+
+
+class TablaEnlace():
+
+    n: int
+    izquierdo: np.ndarray
+    derecho: np.ndarray
+    altura: np.ndarray
+    tamano: np.ndarray
+    orden_hojas: np.ndarray
+    inicio: np.ndarray
+    soporte: Optional[np.ndarray]
+
+    def __init__(self, n: int, izquierdo: np.ndarray, derecho: np.ndarray, altura: np.ndarray, tamano: Optional[np.ndarray] = None, orden_hojas: Optional[np.ndarray] = None, inicio: Optional[np.ndarray] = None, soporte: Optional[np.ndarray] = None):
+        tipo = tipo_indices(n)
+        self.n = n
+        self.izquierdo = np.asarray(izquierdo, dtype=tipo)
+        self.derecho = np.asarray(derecho, dtype=tipo)
+        self.altura = np.asarray(altura, dtype=np.float64)
+        self.tamano = self._calcular_tamano() if tamano is None else np.asarray(tamano, dtype=tipo)
+
+        if orden_hojas is None or inicio is None:
+            self.orden_hojas, self.inicio = self._calcular_orden()
+        else:
+            self.orden_hojas = np.asarray(orden_hojas, dtype=tipo)
+            self.inicio = np.asarray(inicio, dtype=tipo)
+        self.soporte = None if soporte is None else np.asarray(soporte, dtype=np.float64)
+
+    @classmethod
+    def desde_arreglos(cls, arreglos: dict) -> 'TablaEnlace':
+        return cls(int(arreglos["n"]), arreglos["izquierdo"], arreglos["derecho"], arreglos["altura"], arreglos["tamano"], arreglos["orden_hojas"], arreglos["inicio"], arreglos.get("soporte"))
+
+    def con_soporte(self, soporte: np.ndarray) -> 'TablaEnlace':
+        return TablaEnlace(self.n, self.izquierdo, self.derecho, self.altura, self.tamano, self.orden_hojas, self.inicio, soporte)
+
+    def arreglos(self) -> dict:
+        arreglos = {
+            "n": np.int64(self.n),
+            "izquierdo": self.izquierdo,
+            "derecho": self.derecho,
+            "altura": self.altura,
+            "tamano": self.tamano,
+            "orden_hojas": self.orden_hojas,
+            "inicio": self.inicio,
+        }
+        if self.soporte is not None:
+            arreglos["soporte"] = self.soporte
+        return arreglos
+
+    @property
+    def raiz(self) -> int:
+        return 2 * self.n - 2 if self.n > 1 else 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in [self.izquierdo, self.derecho, self.altura, self.tamano, self.orden_hojas, self.inicio])
+
+    def es_hoja(self, nodo: int) -> bool:
+        return nodo < self.n
+
+    def altura_nodo(self, nodo: int) -> float:
+        return 0 if nodo < self.n else self.altura[nodo - self.n]
+
+    def tamano_nodo(self, nodo: int) -> int:
+        return 1 if nodo < self.n else int(self.tamano[nodo - self.n])
+
+    def soporte_nodo(self, nodo: int) -> Optional[float]:
+        if self.soporte is None or nodo < self.n or np.isnan(self.soporte[nodo - self.n]):
+            return None
+        return float(self.soporte[nodo - self.n])
+
+    def hojas(self, nodo: int) -> np.ndarray:
+        inicio = int(self.inicio[nodo])
+        return self.orden_hojas[inicio:inicio + self.tamano_nodo(nodo)]
+
+    def hijos(self, nodo: int) -> list[int]:
+        if nodo < self.n:
+            return []
+
+        altura = self.altura[nodo - self.n]
+        hijos = []
+        pendientes = [int(self.derecho[nodo - self.n]), int(self.izquierdo[nodo - self.n])]
+        while pendientes:
+            hijo = pendientes.pop()
+            if hijo >= self.n and self.altura[hijo - self.n] == altura:
+                pendientes.append(int(self.derecho[hijo - self.n]))
+                pendientes.append(int(self.izquierdo[hijo - self.n]))
+            else:
+                hijos.append(hijo)
+        return hijos
+
+    def _calcular_tamano(self) -> np.ndarray:
+        tamano = np.empty(self.n - 1 if self.n > 0 else 0, dtype=self.izquierdo.dtype)
+        for fila in range(len(tamano)):
+            tamano[fila] = self.tamano_nodo(int(self.izquierdo[fila])) + self.tamano_nodo(int(self.derecho[fila]))
+        return tamano
+
+    def _calcular_orden(self) -> tuple[np.ndarray, np.ndarray]:
+        inicio = np.zeros(2 * self.n - 1 if self.n > 0 else 0, dtype=self.izquierdo.dtype)
+        izquierdo = self.izquierdo.tolist()
+        derecho = self.derecho.tolist()
+        tamano = self.tamano.tolist()
+        comienzo = inicio.tolist()
+
+        for fila in range(self.n - 2, -1, -1):
+            base = comienzo[self.n + fila]
+            hijo = izquierdo[fila]
+            comienzo[hijo] = base
+            comienzo[derecho[fila]] = base + (1 if hijo < self.n else tamano[hijo - self.n])
+
+        inicio[:] = comienzo
+        orden_hojas = np.empty(self.n, dtype=self.izquierdo.dtype)
+        orden_hojas[inicio[:self.n]] = np.arange(self.n)
+        return orden_hojas, inicio
+
+
+class IndiceConsultas():
+
+    tabla: TablaEnlace
+    posicion: np.ndarray
+    separadores: np.ndarray
+    altura_separadores: np.ndarray
+    dispersa: np.ndarray
+
+    def __init__(self, tabla: TablaEnlace):
+        n = tabla.n
+        self.tabla = tabla
+        self.posicion = np.empty(n, dtype=np.int64)
+        self.posicion[tabla.orden_hojas] = np.arange(n)
+
+        self.separadores = np.empty(max(n - 1, 0), dtype=tabla.izquierdo.dtype)
+        self.separadores[tabla.inicio[tabla.derecho] - 1] = np.arange(n, 2 * n - 1)
+        self.altura_separadores = tabla.altura[self.separadores - n]
+
+        largo = len(self.separadores)
+        self.dispersa = np.zeros((max(largo.bit_length(), 1), largo), dtype=self.separadores.dtype)
+        self.dispersa[0] = self.separadores
+        for nivel in range(1, len(self.dispersa)):
+            paso = 1 << (nivel - 1)
+            validos = largo - (1 << nivel) + 1
+            np.maximum(self.dispersa[nivel - 1, :validos], self.dispersa[nivel - 1, paso:paso + validos], out=self.dispersa[nivel, :validos])
+
+    def ancestros(self, i, j) -> np.ndarray:
+        i = np.asarray(i, dtype=np.int64)
+        j = np.asarray(j, dtype=np.int64)
+        a = np.minimum(self.posicion[i], self.posicion[j])
+        b = np.maximum(self.posicion[i], self.posicion[j])
+        if len(self.separadores) == 0:
+            return i.copy()
+
+        largo = np.maximum(b - a, 1)
+        nivel = np.frexp(largo)[1] - 1
+        a = np.minimum(a, len(self.separadores) - 1)
+        nodos = np.maximum(self.dispersa[nivel, a], self.dispersa[nivel, np.maximum(b - (1 << nivel), 0)])
+        return np.where(i == j, i, nodos)
+
+    def cofeneticas(self, i, j) -> np.ndarray:
+        nodos = self.ancestros(i, j)
+        alturas = np.zeros(nodos.shape)
+        internos = nodos >= self.tabla.n
+        alturas[internos] = self.tabla.altura[nodos[internos] - self.tabla.n]
+        return alturas
+
+    def cortar(self, alturas) -> np.ndarray:
+        alturas = np.asarray(alturas, dtype=np.float64).reshape(-1, 1)
+        etiquetas = np.zeros((len(alturas), self.tabla.n), dtype=np.int64)
+        if self.tabla.n > 1:
+            en_orden = np.cumsum(self.altura_separadores[None, :] > alturas, axis=1)
+            etiquetas[:, self.tabla.orden_hojas[1:]] = en_orden
+        return etiquetas
+
+
+def tipo_indices(n: int) -> np.dtype:
+    return np.dtype(np.int32) if 2 * n < np.iinfo(np.int32).max else np.dtype(np.int64)
+
+
+def _buscar(raiz: list, x: int) -> int:
+    while raiz[x] != x:
+        raiz[x] = raiz[raiz[x]]
+        x = raiz[x]
+    return x
+
+
+def tabla_desde_arbol_minimo(n: int, origen: np.ndarray, destino: np.ndarray, peso: np.ndarray) -> TablaEnlace:
+
+    raiz = list(range(n))
+    grupo = list(range(n))
+    tamano_grupo = [1] * n
+    orden = np.argsort(peso, kind="stable")
+
+    izquierdo = np.empty(len(orden), dtype=tipo_indices(n))
+    derecho = np.empty_like(izquierdo)
+    tamano = np.empty_like(izquierdo)
+
+    for paso, k in enumerate(orden.tolist()):
+        a = _buscar(raiz, int(origen[k]))
+        b = _buscar(raiz, int(destino[k]))
+        if tamano_grupo[a] < tamano_grupo[b]:
+            a, b = b, a
+
+        izquierdo[paso] = min(grupo[a], grupo[b])
+        derecho[paso] = max(grupo[a], grupo[b])
+        tamano_grupo[a] += tamano_grupo[b]
+        tamano[paso] = tamano_grupo[a]
+
+        raiz[b] = a
+        grupo[a] = n + paso
+
+    return TablaEnlace(n, izquierdo, derecho, peso[orden], tamano)
+
+
+def arbol_minimo_desde_tabla(tabla: TablaEnlace) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    representante = tabla.orden_hojas[tabla.inicio]
+    return representante[tabla.izquierdo].astype(np.int64), representante[tabla.derecho].astype(np.int64), tabla.altura.copy()
+
+
+def kruskal(n: int, origen: np.ndarray, destino: np.ndarray, peso: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    raiz = list(range(n))
+    elegidas = []
+    orden = np.argsort(peso, kind="stable")
+    extremos = zip(origen[orden].tolist(), destino[orden].tolist())
+
+    for k, (a, b) in zip(orden.tolist(), extremos):
+        a = _buscar(raiz, a)
+        b = _buscar(raiz, b)
+        if a != b:
+            raiz[b] = a
+            elegidas.append(k)
+            if len(elegidas) == n - 1:
+                break
+
+    elegidas = np.array(elegidas, dtype=np.int64)
+    return origen[elegidas], destino[elegidas], peso[elegidas]
+
+
+def ampliar_arbol_minimo(origen: np.ndarray, destino: np.ndarray, peso: np.ndarray, matriz, n: int, nuevos: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    origenes = [origen]
+    destinos = [destino]
+    pesos = [np.asarray(peso, dtype=np.float64)]
+
+    for i in range(n, n + nuevos):
+        origenes.append(np.full(i, i, dtype=np.int64))
+        destinos.append(np.arange(i, dtype=np.int64))
+        pesos.append(np.asarray(matriz[i, :i], dtype=np.float64))
+
+    return kruskal(n + nuevos, np.concatenate(origenes), np.concatenate(destinos), np.concatenate(pesos))
+
+
+def coeficientes_lance_williams(linkage: str, tamano_a: int, tamano_b: int) -> tuple[float, float, float]:
+    if linkage == "single":
+        return 0.5, 0.5, -0.5
+    if linkage == "complete":
+        return 0.5, 0.5, 0.5
+    if linkage == "average":
+        return tamano_a / (tamano_a + tamano_b), tamano_b / (tamano_a + tamano_b), 0.0
+    if linkage == "weighted":
+        return 0.5, 0.5, 0.0
+    raise Exception(f"Criterio de enlace desconocido: {linkage}. Opciones: {', '.join(ENLACES)}")
+
+
+def _vecino_mas_cercano(distancias: MatrizDistancias, i: int, activos: np.ndarray) -> tuple[int, float]:
+    candidatos = activos[activos > i]
+    if len(candidatos) == 0:
+        return -1, np.inf
+    fila = distancias.valores[distancias.indices(i, candidatos)]
+    posicion = int(np.argmin(fila))
+    return int(candidatos[posicion]), float(fila[posicion])
+
+
+def aglomerar_lance_williams(matriz, linkage: str = "average", avance: Optional[Callable[[int], None]] = None, directorio: Optional[str] = None) -> TablaEnlace:
+
+    coeficientes_lance_williams(linkage, 1, 1)
+    n = matriz.shape[0]
+    distancias = MatrizDistancias(n, np.float64, directorio)
+    if isinstance(matriz, MatrizDistancias):
+        distancias.valores[:] = matriz.valores
+    else:
+        distancias.valores[:] = np.asarray(matriz, dtype=np.float64)[np.tril_indices(n, -1)]
+
+    activo = np.ones(n, dtype=bool)
+    tamano = np.ones(n, dtype=np.int64)
+    grupo = np.arange(n, dtype=np.int64)
+    vecino = np.full(n, -1, dtype=np.int64)
+    minimo = np.full(n, np.inf)
+    todos = np.arange(n)
+    for i in range(n - 1):
+        vecino[i], minimo[i] = _vecino_mas_cercano(distancias, i, todos)
+
+    izquierdo = np.empty(max(n - 1, 0), dtype=tipo_indices(n))
+    derecho = np.empty_like(izquierdo)
+    altura = np.empty(max(n - 1, 0), dtype=np.float64)
+    tamanos = np.empty_like(izquierdo)
+
+    for paso in range(n - 1):
+        activos = np.flatnonzero(activo)
+        while True:
+            a = int(np.argmin(minimo))
+            b = int(vecino[a])
+            if b >= 0 and activo[b] and distancias.valores[distancias.indices(a, b)] == minimo[a]:
+                break
+            vecino[a], minimo[a] = _vecino_mas_cercano(distancias, a, activos)
+
+        izquierdo[paso] = min(grupo[a], grupo[b])
+        derecho[paso] = max(grupo[a], grupo[b])
+        altura[paso] = minimo[a]
+
+        alfa_a, alfa_b, gamma = coeficientes_lance_williams(linkage, int(tamano[a]), int(tamano[b]))
+        otros = activos[(activos != a) & (activos != b)]
+        posiciones_b = distancias.indices(b, otros)
+        hacia_a = distancias.valores[distancias.indices(a, otros)]
+        hacia_b = distancias.valores[posiciones_b]
+        distancias.valores[posiciones_b] = alfa_a * hacia_a + alfa_b * hacia_b + gamma * np.abs(hacia_a - hacia_b)
+
+        activo[a] = False
+        minimo[a] = np.inf
+        tamano[b] += tamano[a]
+        tamanos[paso] = tamano[b]
+        grupo[b] = n + paso
+
+        anteriores = otros[otros < a]
+        vecino[anteriores[vecino[anteriores] == a]] = b
+        anteriores = otros[otros < b]
+        nuevas = distancias.valores[distancias.indices(b, anteriores)]
+        mejora = nuevas < minimo[anteriores]
+        vecino[anteriores[mejora]] = b
+        minimo[anteriores[mejora]] = nuevas[mejora]
+        vecino[b], minimo[b] = _vecino_mas_cercano(distancias, b, otros)
+
+        if avance is not None:
+            avance(1)
+
+    return TablaEnlace(n, izquierdo, derecho, altura, tamanos)
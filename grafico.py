@@ -0,0 +1,159 @@
+from typing import Optional
+import numpy as np
+
+from enlace import TablaEnlace
+from nodo import Nodo
+
+
+def umbral_truncado(tabla: TablaEnlace, niveles: Optional[int] = None, max_hojas: Optional[int] = None) -> float:
+    umbral = -np.inf
+    distintas = np.unique(tabla.altura)
+
+    if niveles is not None:
+        if niveles < 1:
+            raise Exception("La cantidad de niveles debe ser al menos 1")
+        if len(distintas) > niveles:
+            umbral = max(umbral, distintas[-niveles])
+
+    if max_hojas is not None:
+        if max_hojas < 1:
+            raise Exception("La cantidad maxima de hojas debe ser al menos 1")
+        expandidos = len(tabla.altura) - np.searchsorted(np.sort(tabla.altura), distintas, side="left")
+        permitidas = distintas[expandidos <= max_hojas - 1]
+        umbral = max(umbral, permitidas.min() if len(permitidas) else np.inf)
+
+    return umbral
+
+
+def coordenadas_tabla(tabla: TablaEnlace, umbral: float = -np.inf) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    n = tabla.n
+    total = 2 * n - 1 if n > 0 else 0
+    nodos = np.arange(total)
+    altura = np.concatenate([np.zeros(n), tabla.altura])
+    x = tabla.orden_hojas[tabla.inicio].astype(np.int64)
+
+    padre = np.full(total, -1, dtype=np.int64)
+    padre[tabla.izquierdo] = np.arange(n, total)
+    padre[tabla.derecho] = np.arange(n, total)
+    tiene_padre = padre >= 0
+    padre_seguro = np.where(tiene_padre, padre, 0)
+
+    expandido = (nodos >= n) & (altura >= umbral)
+    visible = ~tiene_padre | expandido[padre_seguro]
+    disuelto = visible & expandido & tiene_padre & (altura[padre_seguro] == altura)
+
+    representante = np.where(disuelto, padre, nodos)
+    while True:
+        siguiente = representante[representante]
+        if np.array_equal(siguiente, representante):
+            break
+        representante = siguiente
+
+    mostrados = np.flatnonzero(visible & ~disuelto)
+    hijos = mostrados[tiene_padre[mostrados]]
+    padres = representante[padre[hijos]]
+    segmentos = np.stack([np.column_stack([x[padres], altura[padres]]), np.column_stack([x[hijos], altura[hijos]])], axis=1)
+    frontera = mostrados[(mostrados >= n) & ~expandido[mostrados]]
+    return mostrados, x[mostrados], altura[mostrados], segmentos, frontera
+
+
+def etiquetas_tabla(tabla: TablaEnlace, indices: list, nodos: np.ndarray) -> list[str]:
+    n = tabla.n
+    total = 2 * n - 1 if n > 0 else 0
+    altura = np.concatenate([np.zeros(n), tabla.altura])
+    tamano = np.concatenate([np.ones(n, dtype=np.int64), np.asarray(tabla.tamano, dtype=np.int64)])
+    inicio = np.asarray(tabla.inicio, dtype=np.int64)
+
+    padre = np.full(total, -1, dtype=np.int64)
+    padre[tabla.izquierdo] = np.arange(n, total)
+    padre[tabla.derecho] = np.arange(n, total)
+    altura_padre = np.where(padre >= 0, altura[np.maximum(padre, 0)], np.inf)
+
+    visible = np.zeros(n, dtype=bool)
+    visible[inicio[(altura == 0) & (altura_padre > 0)]] = True
+    unidad = np.cumsum(visible) - 1
+    textos = [str(indices[hoja]) for hoja in tabla.orden_hojas[visible].tolist()]
+
+    corchetes = np.flatnonzero((altura > 0) & (altura_padre != altura))
+    abre = unidad[inicio[corchetes]]
+    cierra = unidad[inicio[corchetes] + tamano[corchetes] - 1]
+    aperturas = np.bincount(abre, minlength=len(textos))
+    cierres = np.bincount(cierra, minlength=len(textos))
+
+    piezas = ["[" * a + texto + "]" * c for a, texto, c in zip(aperturas.tolist(), textos, cierres.tolist())]
+    completo = ", ".join(piezas)
+    largo = np.array([len(pieza) + 2 for pieza in piezas], dtype=np.int64)
+    comienzo = np.cumsum(largo) - largo
+
+    orden = np.lexsort((-tamano[corchetes], abre))
+    externos = np.empty(len(corchetes), dtype=np.int64)
+    externos[orden] = np.arange(len(orden)) - np.searchsorted(abre[orden], abre[orden])
+    orden = np.lexsort((tamano[corchetes], cierra))
+    internos = np.empty(len(corchetes), dtype=np.int64)
+    internos[orden] = np.arange(len(orden)) - np.searchsorted(cierra[orden], cierra[orden])
+
+    posicion = np.full(total, -1, dtype=np.int64)
+    posicion[corchetes] = np.arange(len(corchetes))
+    desde = comienzo[abre] + externos
+    hasta = comienzo[cierra] + largo[cierra] - 2 - cierres[cierra] + internos + 1
+
+    etiquetas = []
+    for nodo in nodos.tolist():
+        if posicion[nodo] >= 0:
+            etiquetas.append(completo[desde[posicion[nodo]]:hasta[posicion[nodo]]])
+        elif altura[nodo] == 0:
+            etiquetas.append(str(indices[tabla.orden_hojas[inicio[nodo]]]))
+        else:
+            etiquetas.append(Nodo.de_tabla(tabla, nodo).label_name(indices))
+    return etiquetas
+
+
+def coordenadas_nodo(raiz) -> tuple[list, np.ndarray, np.ndarray, np.ndarray]:
+    nodos = []
+    x = []
+    y = []
+    segmentos = []
+    pendientes = [raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        posicion = nodo.get_position()
+        nodos.append(nodo)
+        x.append(posicion[0])
+        y.append(posicion[1])
+        for hijo in nodo.hijos:
+            segmentos.append([posicion, hijo.get_position()])
+        pendientes.extend(reversed(nodo.hijos))
+    return nodos, np.array(x), np.array(y), np.array(segmentos, dtype=np.float64).reshape(-1, 2, 2)
+
+
+def dibujar(ejes, x: np.ndarray, y: np.ndarray, segmentos: np.ndarray, etiquetas: Optional[list] = None) -> None:
+    from matplotlib.collections import LineCollection
+
+    ejes.add_collection(LineCollection(segmentos, colors='b', linewidths=0.5))
+    ejes.scatter(x, y)
+    if etiquetas is not None:
+        for etiqueta, posicion_x, posicion_y in zip(etiquetas, x.tolist(), y.tolist()):
+            ejes.annotate(etiqueta, (posicion_x, posicion_y), xytext=(5, 5), textcoords='offset points')
+    ejes.autoscale_view()
+
+
+def dibujar_nodo(ejes, raiz, indices: list, label_points: bool = False) -> None:
+    nodos, x, y, segmentos = coordenadas_nodo(raiz)
+    dibujar(ejes, x, y, segmentos, [nodo.label_name(indices) for nodo in nodos] if label_points else None)
+
+
+def dibujar_arbol(ejes, arbol, niveles: Optional[int] = None, max_hojas: Optional[int] = None) -> None:
+    if arbol.tabla is None:
+        if niveles is not None or max_hojas is not None:
+            raise Exception("El truncado requiere un arbol construido desde una tabla de enlace")
+        dibujar_nodo(ejes, arbol.nodo, arbol.indices, arbol.label_points)
+        return
+
+    tabla = arbol.tabla
+    mostrados, x, y, segmentos, frontera = coordenadas_tabla(tabla, umbral_truncado(tabla, niveles, max_hojas))
+    etiquetas = None
+    if arbol.label_points:
+        truncados = set(frontera.tolist())
+        nombres = etiquetas_tabla(tabla, arbol.indices, mostrados)
+        etiquetas = [f"({tabla.tamano_nodo(nodo)})" if nodo in truncados else nombre for nodo, nombre in zip(mostrados.tolist(), nombres)]
+    dibujar(ejes, x, y, segmentos, etiquetas)
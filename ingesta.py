@@ -0,0 +1,80 @@
+from typing import Callable, Iterable, Iterator, Optional, Union
+import os
+import numpy as np
+import pandas as pd
+
+from relacion import Relacion
+
+
+TAMANO_CHUNK = 100_000
+
+Fuente = Union[str, os.PathLike, Callable[[], Iterable[pd.DataFrame]], Iterable[pd.DataFrame]]
+
+
+def _chunks_parquet(ruta: str, tamano_chunk: int) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise Exception("Leer archivos Parquet requiere pyarrow (pip install pyarrow)")
+
+    archivo = pq.ParquetFile(ruta)
+    for lote in archivo.iter_batches(batch_size=tamano_chunk):
+        yield lote.to_pandas()
+
+
+def leer_chunks(fuente: Fuente, tamano_chunk: int = TAMANO_CHUNK, opciones_lectura: Optional[dict] = None) -> Callable[[], Iterable[pd.DataFrame]]:
+
+    opciones_lectura = opciones_lectura or {}
+
+    if isinstance(fuente, (str, os.PathLike)):
+        ruta = os.fspath(fuente)
+        if ruta.endswith((".parquet", ".pq")):
+            return lambda: _chunks_parquet(ruta, tamano_chunk)
+        return lambda: pd.read_csv(ruta, chunksize=tamano_chunk, **opciones_lectura)
+
+    if callable(fuente):
+        return fuente
+
+    if iter(fuente) is fuente:
+        raise Exception("La ingesta recorre los datos dos veces: pasar una ruta, una lista de bloques o una funcion que devuelva un iterador nuevo")
+
+    return lambda: iter(fuente)
+
+
+def construir_grilla(fuente: Fuente, relacion: Relacion, tamano_chunk: int = TAMANO_CHUNK, ruta_grilla: Optional[str] = None, opciones_lectura: Optional[dict] = None) -> tuple[np.ndarray, pd.Index, pd.Index, dict]:
+
+    chunks = leer_chunks(fuente, tamano_chunk, opciones_lectura)
+
+    estado = relacion.iniciar_flujo()
+    for datos in chunks():
+        if datos.index.name in datos.columns:
+            datos = datos.drop(columns=[datos.index.name])
+        relacion.acumular_flujo(estado, datos)
+    metadata = relacion.cerrar_flujo(estado)
+
+    if estado["columnas"] is None:
+        raise Exception("La fuente de datos esta vacia")
+
+    forma = (estado["filas"], len(estado["columnas"]))
+    tipo = relacion.tipo_flujo(estado)
+    if ruta_grilla is None:
+        grilla = np.empty(forma, dtype=tipo)
+    else:
+        grilla = np.lib.format.open_memmap(ruta_grilla, mode="w+", dtype=tipo, shape=forma)
+
+    fila = 0
+    partes = []
+    for datos in chunks():
+        if datos.index.name in datos.columns:
+            datos = datos.drop(columns=[datos.index.name])
+        if fila + len(datos) > forma[0]:
+            raise Exception("La fuente de datos cambio entre las dos pasadas")
+        grilla[fila:fila + len(datos)] = relacion.transformar_flujo(estado, datos)
+        partes.append(datos.index)
+        fila += len(datos)
+
+    if fila != forma[0]:
+        raise Exception("La fuente de datos cambio entre las dos pasadas")
+
+    indice = partes[0].append(partes[1:]) if partes else pd.RangeIndex(0)
+    return grilla, indice, estado["columnas"], metadata
@@ -0,0 +1,216 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Optional
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from relacion import Relacion, Dicotomica, Clasificatoria, Evaluativa
+from emparillado import CARACTERISTICAS, ELEMENTOS, Emparillador
+from distancias import numero_procesos
+from enlace import ENLACES
+from ingesta import TAMANO_CHUNK
+from progreso import ObservadorMetricas
+from verificacion import MOTORES, validar_enlace_motor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+EXTENSIONES = (".csv", ".parquet", ".pq")
+EJES = [ELEMENTOS, CARACTERISTICAS]
+TIEMPOS = "tiempos.json"
+RESUMEN = "resumen.json"
+
+
+def listar_entradas(entrada: str) -> list[str]:
+    if os.path.isdir(entrada):
+        rutas = [os.path.join(entrada, nombre) for nombre in sorted(os.listdir(entrada)) if nombre.endswith(EXTENSIONES)]
+    else:
+        base = os.path.dirname(os.path.abspath(entrada))
+        with open(entrada) as archivo:
+            lineas = [linea.strip() for linea in archivo]
+        rutas = [os.path.join(base, linea) for linea in lineas if linea and not linea.startswith("#")]
+
+    if not rutas:
+        raise Exception(f"No se encontraron conjuntos de datos en {entrada}")
+    return rutas
+
+
+def nombre_dataset(ruta: str) -> str:
+    nombre = os.path.basename(ruta)
+    for extension in EXTENSIONES:
+        if nombre.endswith(extension):
+            return nombre[:-len(extension)]
+    return nombre
+
+
+def escribir_json(ruta: str, contenido: dict) -> None:
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w") as archivo:
+        json.dump(contenido, archivo, indent=2)
+    os.replace(temporal, ruta)
+
+
+def construir_relacion(opciones: argparse.Namespace) -> Relacion:
+    if opciones.relacion == "dicotomica":
+        return Dicotomica()
+    if opciones.relacion == "clasificatoria":
+        return Clasificatoria(generar_ranking=opciones.generar_ranking)
+    return Evaluativa(max_value=opciones.max_value)
+
+
+def limitar_memoria(megabytes: Optional[int]) -> None:
+    if megabytes is None or resource is None:
+        return
+    limite = megabytes * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+
+
+def procesar_dataset(ruta: str, destino: str, relacion: Relacion, ejes: list[str], tamano_chunk: int = TAMANO_CHUNK, tamano_bloque: Optional[int] = None, distancias_en_disco: bool = False, aproximado: bool = False, linkage: str = "single", engine: str = "rapido") -> dict:
+
+    inicio = time.perf_counter()
+    metricas = ObservadorMetricas()
+    os.makedirs(destino, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=destino) as temporal:
+        directorio_distancias = temporal if distancias_en_disco else None
+        emparillador = Emparillador.desde_fuente(ruta, relacion, tamano_chunk, tamano_bloque=tamano_bloque, directorio_distancias=directorio_distancias, observador=metricas, engine=engine)
+
+        for eje in ejes:
+            if eje == ELEMENTOS:
+                arbol = emparillador.clasificar_elementos(aproximado=aproximado, linkage=linkage)
+            else:
+                arbol = emparillador.clasificar_caracteristicas(linkage=linkage)
+            arbol.guardar(os.path.join(destino, f"{eje}.npz"))
+            del arbol
+
+        filas, columnas = emparillador.grilla.shape
+        del emparillador
+
+    tiempos = {
+        "entrada": os.path.abspath(ruta),
+        "filas": filas,
+        "columnas": columnas,
+        "ejes": ejes,
+        "segundos": time.perf_counter() - inicio,
+        "etapas": metricas.resumen(),
+    }
+    escribir_json(os.path.join(destino, TIEMPOS), tiempos)
+    return tiempos
+
+
+def _procesar_seguro(nombre: str, ruta: str, destino: str, relacion: Relacion, ejes: list[str], **opciones) -> tuple[str, dict]:
+    try:
+        return nombre, procesar_dataset(ruta, destino, relacion, ejes, **opciones)
+    except MemoryError:
+        return nombre, {"entrada": os.path.abspath(ruta), "error": "Memoria insuficiente para el limite por proceso"}
+    except Exception as error:
+        return nombre, {"entrada": os.path.abspath(ruta), "error": f"{type(error).__name__}: {error}"}
+
+
+def ejecutar_lote(rutas: list[str], salida: str, relacion: Relacion, ejes: list[str], procesos: Optional[int] = -1, memoria_maxima: Optional[int] = None, reanudar: bool = True, avance: Optional[Callable[[str, dict], None]] = None, **opciones) -> dict:
+
+    nombres = [nombre_dataset(ruta) for ruta in rutas]
+    repetidos = sorted({nombre for nombre in nombres if nombres.count(nombre) > 1})
+    if repetidos:
+        raise Exception(f"Hay conjuntos de datos con el mismo nombre: {', '.join(repetidos)}")
+
+    os.makedirs(salida, exist_ok=True)
+    resultados = {}
+    pendientes = []
+    for nombre, ruta in zip(nombres, rutas):
+        tiempos = os.path.join(salida, nombre, TIEMPOS)
+        if reanudar and os.path.exists(tiempos):
+            with open(tiempos) as archivo:
+                resultados[nombre] = dict(json.load(archivo), omitido=True)
+        else:
+            pendientes.append((nombre, ruta, os.path.join(salida, nombre)))
+
+    procesos = min(numero_procesos(procesos), max(len(pendientes), 1))
+    if procesos == 1 and memoria_maxima is None:
+        terminados = (_procesar_seguro(nombre, ruta, destino, relacion, ejes, **opciones) for nombre, ruta, destino in pendientes)
+        for nombre, resultado in terminados:
+            resultados[nombre] = resultado
+            if avance is not None:
+                avance(nombre, resultado)
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, max_tasks_per_child=1, initializer=limitar_memoria, initargs=(memoria_maxima,)) as ejecutor:
+            futuros = [ejecutor.submit(_procesar_seguro, nombre, ruta, destino, relacion, ejes, **opciones) for nombre, ruta, destino in pendientes]
+            for futuro in as_completed(futuros):
+                nombre, resultado = futuro.result()
+                resultados[nombre] = resultado
+                if avance is not None:
+                    avance(nombre, resultado)
+
+    resumen = {
+        "relacion": type(relacion).__name__,
+        "parametros": vars(relacion),
+        "ejes": ejes,
+        "procesos": procesos,
+        "datasets": {nombre: resultados[nombre] for nombre in nombres},
+    }
+    escribir_json(os.path.join(salida, RESUMEN), resumen)
+    return resumen
+
+
+def imprimir_resultado(nombre: str, resultado: dict) -> None:
+    if "error" in resultado:
+        print(f"{nombre}: error {resultado['error']}", file=sys.stderr)
+    else:
+        print(f"{nombre}: {resultado['filas']}x{resultado['columnas']} {resultado['segundos']:.3f}s", file=sys.stderr)
+
+
+def main(argumentos: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Clasifica muchos conjuntos de datos en paralelo y guarda los arboles")
+    parser.add_argument("entrada", help="Directorio con archivos CSV / Parquet o manifiesto con una ruta por linea")
+    parser.add_argument("salida", help="Directorio donde se escriben los arboles y los tiempos de cada conjunto")
+    parser.add_argument("--eje", dest="ejes", action="append", choices=EJES, default=None, help="Eje a clasificar; repetir para ambos (por defecto los dos)")
+    parser.add_argument("--procesos", type=int, default=-1, help="Cantidad de procesos (por defecto uno por CPU)")
+    parser.add_argument("--memoria-maxima", type=int, default=None, help="Limite de memoria por proceso en MB")
+    parser.add_argument("--tamano-chunk", type=int, default=TAMANO_CHUNK)
+    parser.add_argument("--tamano-bloque", type=int, default=None)
+    parser.add_argument("--distancias-en-disco", action="store_true", help="Mapear las matrices de distancias a disco")
+    parser.add_argument("--aproximado", action="store_true", help="Usar enlace simple aproximado para los elementos")
+    parser.add_argument("--linkage", choices=ENLACES, default="single", help="Criterio de enlace entre grupos")
+    parser.add_argument("--engine", choices=MOTORES, default="rapido", help="Motor de calculo; verificar compara contra la referencia sobre una muestra")
+    parser.add_argument("--rehacer", action="store_true", help="Procesar tambien los conjuntos ya terminados")
+
+    relaciones = parser.add_subparsers(dest="relacion", required=True)
+    relaciones.add_parser("dicotomica")
+    clasificatoria = relaciones.add_parser("clasificatoria")
+    clasificatoria.add_argument("--generar-ranking", action="store_true")
+    evaluativa = relaciones.add_parser("evaluativa")
+    evaluativa.add_argument("--max-value", type=int, required=True)
+    opciones = parser.parse_args(argumentos)
+    try:
+        validar_enlace_motor(opciones.engine, opciones.linkage)
+    except Exception as error:
+        parser.error(str(error))
+
+    resumen = ejecutar_lote(
+        listar_entradas(opciones.entrada),
+        opciones.salida,
+        construir_relacion(opciones),
+        opciones.ejes or EJES,
+        opciones.procesos,
+        opciones.memoria_maxima,
+        not opciones.rehacer,
+        imprimir_resultado,
+        tamano_chunk=opciones.tamano_chunk,
+        tamano_bloque=opciones.tamano_bloque,
+        distancias_en_disco=opciones.distancias_en_disco,
+        aproximado=opciones.aproximado,
+        linkage=opciones.linkage,
+        engine=opciones.engine,
+    )
+
+    return 1 if any("error" in resultado for resultado in resumen["datasets"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,67 @@
+from typing import Optional
 import random
-import matplotlib.pyplot as plt
 
 
 class Nodo:
     
-    elementos: list
-    valor: float
-    hijos: list['Nodo']
+    __slots__ = ("_elementos", "_valor", "_hijos", "_tabla", "_id")
     
-    def __init__(self, elementos: list, valor: float, hijos: list['Nodo'] = []):
-        self.elementos = elementos
-        self.valor = valor
-        self.hijos = hijos
+    def __init__(self, elementos: list, valor: float, hijos: Optional[list['Nodo']] = None):
+        self._elementos = elementos
+        self._valor = valor
+        self._hijos = [] if hijos is None else hijos
+        self._tabla = None
+        self._id = None
+    
+    @classmethod
+    def de_tabla(cls, tabla, id: int) -> 'Nodo':
+        nodo = cls.__new__(cls)
+        nodo._elementos = None
+        nodo._valor = None
+        nodo._hijos = None
+        nodo._tabla = tabla
+        nodo._id = id
+        return nodo
+    
+    @property
+    def elementos(self) -> list:
+        if self._elementos is None:
+            self._elementos = self._tabla.hojas(self._id).tolist()
+        return self._elementos
+    
+    @property
+    def valor(self) -> float:
+        if self._valor is None:
+            self._valor = self._tabla.altura_nodo(self._id)
+        return self._valor
+    
+    @property
+    def soporte(self) -> Optional[float]:
+        return None if self._tabla is None else self._tabla.soporte_nodo(self._id)
+    
+    @property
+    def hijos(self) -> list['Nodo']:
+        if self._hijos is None:
+            self._hijos = [Nodo.de_tabla(self._tabla, hijo) for hijo in self._tabla.hijos(self._id)]
+        return self._hijos
         
     def label_name(self, indices : list):
-        if self.valor == 0:
-            return str(indices[self.elementos[0]])
-        else:
-            s = "["
-            for h in self.hijos:
-                s = s + h.label_name(indices) + ", "
-            s = s[:-2] + "]"
-            return s
+        partes = []
+        pendientes = [self]
+        while pendientes:
+            nodo = pendientes.pop()
+            if isinstance(nodo, str):
+                partes.append(nodo)
+            elif nodo.valor == 0:
+                partes.append(str(indices[nodo.elementos[0]]))
+            else:
+                pendientes.append("]")
+                for i, hijo in enumerate(reversed(nodo.hijos)):
+                    pendientes.append(hijo)
+                    if i < len(nodo.hijos) - 1:
+                        pendientes.append(", ")
+                partes.append("[")
+        return "".join(partes)
         
     def get_position(self):
         if self.hijos == []:
@@ -31,12 +71,7 @@ class Nodo:
     
         
     def plot(self, indices: list, label_points: bool = False):
-        plt.scatter(self.get_position()[0], self.get_position()[1])
-        if (label_points):
-            plt.annotate(self.label_name(indices), (self.get_position()[0], self.get_position()[1]), xytext=(5, 5), textcoords='offset points')
+        import matplotlib.pyplot as plt
+        from grafico import dibujar_nodo
         
-        for hijo in self.hijos:
-            hijo.plot(indices, label_points)
-            
-        for j, hijo in enumerate(self.hijos):
-            plt.plot([self.get_position()[0], hijo.get_position()[0]], [self.get_position()[1], hijo.get_position()[1]], color='b', linewidth=0.5)
+        dibujar_nodo(plt.gca(), self, indices, label_points)
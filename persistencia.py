@@ -0,0 +1,59 @@
+import json
+import os
+import struct
+import zipfile
+import numpy as np
+
+
+CABECERA_LOCAL = 30
+
+
+def a_json(objeto):
+    if isinstance(objeto, dict):
+        return {str(a_json(clave)): a_json(valor) for clave, valor in objeto.items()}
+    if isinstance(objeto, (list, tuple)):
+        return [a_json(valor) for valor in objeto]
+    if isinstance(objeto, np.generic):
+        return objeto.item()
+    if objeto is None or isinstance(objeto, (str, int, float, bool)):
+        return objeto
+    return str(objeto)
+
+
+def guardar_arreglos(ruta: str, arreglos: dict, atributos: dict) -> None:
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as archivo:
+        np.savez(archivo, atributos=np.array(json.dumps(a_json(atributos))), **arreglos)
+    os.replace(temporal, ruta)
+
+
+def _mapear_miembro(archivo, ruta: str, info: zipfile.ZipInfo):
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+
+    archivo.seek(info.header_offset)
+    cabecera = archivo.read(CABECERA_LOCAL)
+    largo_nombre, largo_extra = struct.unpack("<HH", cabecera[26:30])
+    archivo.seek(info.header_offset + CABECERA_LOCAL + largo_nombre + largo_extra)
+
+    version = np.lib.format.read_magic(archivo)
+    if version == (1, 0):
+        forma, fortran, tipo = np.lib.format.read_array_header_1_0(archivo)
+    else:
+        forma, fortran, tipo = np.lib.format.read_array_header_2_0(archivo)
+
+    if tipo.hasobject or int(np.prod(forma)) == 0:
+        return None
+    return np.memmap(ruta, dtype=tipo, mode="r", offset=archivo.tell(), shape=forma, order="F" if fortran else "C")
+
+
+def cargar_arreglos(ruta: str, mapear: bool = True) -> tuple[dict, dict]:
+    arreglos = {}
+    with np.load(ruta) as contenido, zipfile.ZipFile(ruta) as comprimido, open(ruta, "rb") as archivo:
+        for info in comprimido.infolist():
+            nombre = info.filename[:-len(".npy")]
+            arreglo = _mapear_miembro(archivo, ruta, info) if mapear and nombre != "atributos" else None
+            arreglos[nombre] = contenido[nombre] if arreglo is None else arreglo
+
+    atributos = json.loads(str(arreglos.pop("atributos")[()]))
+    return arreglos, atributos
@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+DESCRIPCIONES = {
+    "procesar_relacion": "Procesando relacion",
+    "ingesta": "Leyendo datos",
+    "distancias": "Generando matriz",
+    "aglomeracion": "Reduciendo arbol",
+    "vecinos": "Buscando vecinos",
+    "agregar_elementos": "Agregando elementos",
+    "bootstrap": "Remuestreando columnas",
+}
+
+
+_ETAPAS_ABIERTAS: list[dict] = []
+_CANDADO_MEMORIA = threading.Lock()
+
+
+def memoria_proceso() -> Optional[int]:
+    if resource is None:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo if sys.platform == "darwin" else maximo * 1024
+
+
+def _acumular_pico() -> int:
+    actual, pico = tracemalloc.get_traced_memory()
+    for abierta in _ETAPAS_ABIERTAS:
+        abierta["pico"] = max(abierta["pico"], pico)
+    tracemalloc.reset_peak()
+    return actual
+
+
+def _abrir_memoria() -> Optional[dict]:
+    if not tracemalloc.is_tracing():
+        return None
+    with _CANDADO_MEMORIA:
+        actual = _acumular_pico()
+        registro = {"base": actual, "pico": actual}
+        _ETAPAS_ABIERTAS.append(registro)
+    return registro
+
+
+def _cerrar_memoria(registro: Optional[dict]) -> Optional[int]:
+    if registro is None:
+        return None
+    with _CANDADO_MEMORIA:
+        _acumular_pico()
+        _ETAPAS_ABIERTAS.remove(registro)
+    return max(registro["pico"] - registro["base"], 0)
+
+
+class Observador():
+
+    def inicio(self, etapa: str, total: Optional[int]) -> None:
+        pass
+
+    def avance(self, etapa: str, cantidad: int) -> None:
+        pass
+
+    def fin(self, etapa: str, procesados: int, segundos: float, memoria: Optional[int]) -> None:
+        pass
+
+
+class ObservadorNulo(Observador):
+    pass
+
+
+class ObservadorTqdm(Observador):
+
+    def __init__(self, **opciones):
+        self.opciones = opciones
+        self._barras = {}
+
+    def inicio(self, etapa: str, total: Optional[int]) -> None:
+        from tqdm import tqdm
+        self._barras[(etapa, threading.get_ident())] = tqdm(total=total, desc=DESCRIPCIONES.get(etapa, etapa), **self.opciones)
+
+    def avance(self, etapa: str, cantidad: int) -> None:
+        self._barras[(etapa, threading.get_ident())].update(cantidad)
+
+    def fin(self, etapa: str, procesados: int, segundos: float, memoria: Optional[int]) -> None:
+        self._barras.pop((etapa, threading.get_ident())).close()
+
+
+class ObservadorMetricas(Observador):
+
+    registros: list[dict]
+
+    def __init__(self):
+        self.registros = []
+        self._candado = threading.Lock()
+
+    def fin(self, etapa: str, procesados: int, segundos: float, memoria: Optional[int]) -> None:
+        with self._candado:
+            self.registros.append({"etapa": etapa, "procesados": procesados, "segundos": segundos, "memoria_pico": memoria, "memoria_proceso": memoria_proceso()})
+
+    def resumen(self) -> dict[str, dict]:
+        resumen = {}
+        with self._candado:
+            for registro in self.registros:
+                etapa = resumen.setdefault(registro["etapa"], {"llamadas": 0, "procesados": 0, "segundos": 0.0, "memoria_pico": None, "memoria_proceso": None})
+                etapa["llamadas"] += 1
+                etapa["procesados"] += registro["procesados"]
+                etapa["segundos"] += registro["segundos"]
+                for clave in ("memoria_pico", "memoria_proceso"):
+                    if registro[clave] is not None:
+                        etapa[clave] = max(etapa[clave] or 0, registro[clave])
+        return resumen
+
+
+@contextmanager
+def medir_etapa(observador: Observador, etapa: str, total: Optional[int] = None) -> Iterator[Callable[[int], None]]:
+
+    procesados = 0
+
+    def avance(cantidad: int = 1) -> None:
+        nonlocal procesados
+        procesados += cantidad
+        observador.avance(etapa, cantidad)
+
+    observador.inicio(etapa, total)
+    memoria = _abrir_memoria()
+    inicio = time.perf_counter()
+    try:
+        yield avance
+    finally:
+        segundos = time.perf_counter() - inicio
+        observador.fin(etapa, procesados, segundos, _cerrar_memoria(memoria))
@@ -3,6 +3,9 @@ import numpy as np
 import pandas as pd
 
 
+def tipo_compacto(maximo: int) -> np.dtype:
+    return np.min_scalar_type(max(int(maximo), 0))
+
 
 class Relacion():
 
@@ -15,6 +18,32 @@ class Relacion():
         pass
         
     
+    def iniciar_flujo(self) -> dict:
+        return {"filas": 0, "columnas": None}
+    
+    def acumular_flujo(self, estado: dict, datos: pd.DataFrame) -> None:
+        if estado["columnas"] is None:
+            estado["columnas"] = datos.columns
+        elif not estado["columnas"].equals(datos.columns):
+            raise Exception("Todos los bloques deben tener las mismas columnas")
+        estado["filas"] += len(datos)
+    
+    @abstractmethod
+    def cerrar_flujo(self, estado: dict) -> dict:
+        pass
+    
+    @abstractmethod
+    def tipo_flujo(self, estado: dict) -> np.dtype:
+        pass
+    
+    @abstractmethod
+    def transformar_flujo(self, estado: dict, datos: pd.DataFrame) -> np.ndarray:
+        pass
+    
+    @abstractmethod
+    def transformar_con_metadata(self, datos: pd.DataFrame, metadata: dict) -> np.ndarray:
+        pass
+    
     def es_numerico(self, datos: pd.DataFrame) -> bool:
         for col in datos.columns:
             if not pd.api.types.is_numeric_dtype(datos[col]):
@@ -25,27 +54,62 @@ class Relacion():
     
 class Dicotomica(Relacion):
     
+    def _valores_unicos(self, valores: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        codigos, unicos = pd.factorize(valores.ravel(), use_na_sentinel=False)
+        unicos = np.asarray(unicos)
+        try:
+            orden = np.argsort(unicos, kind="stable")
+        except TypeError:
+            return unicos, codigos
+        
+        posiciones = np.empty(len(orden), dtype=codigos.dtype)
+        posiciones[orden] = np.arange(len(orden))
+        return unicos[orden], posiciones[codigos]
+    
     def _get_unique_set(self, datos: pd.DataFrame) -> list:
-        unique_set = set()
-        for col in datos.columns:
-            unique_set = unique_set.union(set(datos[col].unique()))
-        return list(unique_set)
+        return self._valores_unicos(datos.to_numpy())[0].tolist()
     
     def es_relacion_valida(self, datos: pd.DataFrame) -> bool:  
         return len(self._get_unique_set(datos)) == 2
     
     def procesar_relacion(self, datos: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
-        values_set = self._get_unique_set(datos)
-        
-        
-        if (values_set != [0, 1]):
-            values_dict = dict()
-            for i in range(len(values_set)):
-                values_dict[values_set[i]] = i
-        else:
-            values_dict = {0: 0, 1: 1}
+        unicos, codigos = self._valores_unicos(datos.to_numpy())
+        values_dict = {valor: i for i, valor in enumerate(unicos.tolist())}
         
-        return datos.map(lambda x: values_dict[x]), values_dict
+        codigos = codigos.reshape(datos.shape).astype(tipo_compacto(len(unicos) - 1))
+        return pd.DataFrame(codigos, index=datos.index, columns=datos.columns, copy=False), values_dict
+    
+    def acumular_flujo(self, estado: dict, datos: pd.DataFrame) -> None:
+        super().acumular_flujo(estado, datos)
+        unicos = estado.setdefault("unicos", [])
+        for valor in pd.unique(datos.to_numpy().ravel()).tolist():
+            if valor not in unicos:
+                unicos.append(valor)
+        if len(unicos) > 2:
+            raise Exception("La relacion no es valida para el conjunto de datos propuesto")
+    
+    def cerrar_flujo(self, estado: dict) -> dict:
+        unicos = estado.get("unicos", [])
+        if len(unicos) != 2:
+            raise Exception("La relacion no es valida para el conjunto de datos propuesto")
+        try:
+            unicos = sorted(unicos)
+        except TypeError:
+            pass
+        estado["metadata"] = {valor: i for i, valor in enumerate(unicos)}
+        return estado["metadata"]
+    
+    def tipo_flujo(self, estado: dict) -> np.dtype:
+        return np.dtype(np.uint8)
+    
+    def transformar_flujo(self, estado: dict, datos: pd.DataFrame) -> np.ndarray:
+        codigos = pd.Index(list(estado["metadata"])).get_indexer(datos.to_numpy().ravel())
+        if (codigos < 0).any():
+            raise Exception("Hay valores que no pertenecen a la relacion dicotomica")
+        return codigos.reshape(datos.shape).astype(self.tipo_flujo(estado))
+    
+    def transformar_con_metadata(self, datos: pd.DataFrame, metadata: dict) -> np.ndarray:
+        return self.transformar_flujo({"metadata": metadata}, datos)
         
         
 class Clasificatoria(Relacion):
@@ -54,9 +118,17 @@ class Clasificatoria(Relacion):
     
     def __init__(self, generar_ranking: bool = True):
         self.generar_ranking = generar_ranking
+    
+    def _rankear(self, valores: np.ndarray) -> np.ndarray:
+        n = valores.shape[0]
+        orden = np.argsort(valores, axis=0, kind="stable")
+        ranking = np.empty(valores.shape, dtype=tipo_compacto(n))
+        np.put_along_axis(ranking, orden, np.arange(1, n + 1, dtype=ranking.dtype)[:, None], axis=0)
+        return ranking
         
     def turn_into_ranking(self, datos: pd.DataFrame) -> pd.DataFrame:
-        return datos.rank(axis=0, method='first', numeric_only=True, ascending=True).astype(int)
+        numericas = [col for col in datos.columns if pd.api.types.is_numeric_dtype(datos[col])]
+        return pd.DataFrame(self._rankear(datos[numericas].to_numpy()), index=datos.index, columns=numericas, copy=False)
            
     def _validar_es_ranking(self, datos: pd.DataFrame) -> bool:
         datos_rankeados = self.turn_into_ranking(datos)
@@ -69,6 +141,62 @@ class Clasificatoria(Relacion):
         datos = self.turn_into_ranking(datos)
         return datos, {}
     
+    def acumular_flujo(self, estado: dict, datos: pd.DataFrame) -> None:
+        super().acumular_flujo(estado, datos)
+        if not self.es_numerico(datos):
+            raise Exception("La relacion no es valida para el conjunto de datos propuesto")
+        
+        conteos = estado.setdefault("conteos", [None] * datos.shape[1])
+        for j in range(datos.shape[1]):
+            unicos, cantidades = np.unique(datos.iloc[:, j].to_numpy(), return_counts=True)
+            conteos[j] = (unicos, cantidades.astype(np.int64)) if conteos[j] is None else self._fusionar_conteos(*conteos[j], unicos, cantidades)
+    
+    def _fusionar_conteos(self, unicos: np.ndarray, cantidades: np.ndarray, nuevos: np.ndarray, nuevas: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        unicos = unicos.astype(np.promote_types(unicos.dtype, nuevos.dtype), copy=False)
+        posiciones = np.searchsorted(unicos, nuevos)
+        presentes = posiciones < len(unicos)
+        presentes[presentes] = unicos[posiciones[presentes]] == nuevos[presentes]
+        cantidades[posiciones[presentes]] += nuevas[presentes]
+        
+        faltan = ~presentes
+        if not faltan.any():
+            return unicos, cantidades
+        return np.insert(unicos, posiciones[faltan], nuevos[faltan]), np.insert(cantidades, posiciones[faltan], nuevas[faltan])
+    
+    def cerrar_flujo(self, estado: dict) -> dict:
+        conteos = estado.get("conteos", [])
+        for j, (unicos, cantidades) in enumerate(conteos):
+            conteos[j] = (unicos, np.cumsum(cantidades) - cantidades)
+        estado["metadata"] = {}
+        return estado["metadata"]
+    
+    def tipo_flujo(self, estado: dict) -> np.dtype:
+        return tipo_compacto(estado["filas"])
+    
+    def transformar_flujo(self, estado: dict, datos: pd.DataFrame) -> np.ndarray:
+        salida = np.empty(datos.shape, dtype=self.tipo_flujo(estado))
+        
+        for j in range(datos.shape[1]):
+            valores = datos.iloc[:, j].to_numpy()
+            unicos, siguiente = estado["conteos"][j]
+            posiciones = np.searchsorted(unicos, valores)
+            orden = np.argsort(posiciones, kind="stable")
+            ordenadas = posiciones[orden]
+            ocurrencia = np.empty(len(valores), dtype=np.int64)
+            ocurrencia[orden] = np.arange(len(valores)) - np.searchsorted(ordenadas, ordenadas)
+            
+            ranking = siguiente[posiciones] + ocurrencia + 1
+            distintas, cantidades = np.unique(ordenadas, return_counts=True)
+            siguiente[distintas] += cantidades
+            if not self.generar_ranking and (ranking != valores).any():
+                raise Exception("La relacion no es valida para el conjunto de datos propuesto")
+            salida[:, j] = ranking
+        
+        return salida
+    
+    def transformar_con_metadata(self, datos: pd.DataFrame, metadata: dict) -> np.ndarray:
+        raise Exception("Agregar filas a una relacion clasificatoria cambia el ranking de las filas existentes: hay que reconstruir el Emparillador")
+    
     
 class Evaluativa(Relacion):
     
@@ -77,11 +205,49 @@ class Evaluativa(Relacion):
     def __init__(self, max_value: int):
         self.interval_max = max_value
         
+    def _escalar(self, valores: np.ndarray, min_val, max_val) -> np.ndarray:
+        if max_val == min_val:
+            return np.ones(valores.shape, dtype=tipo_compacto(self.interval_max))
+        escalados = np.floor(1 + (valores - min_val) * (self.interval_max - 1) / (max_val - min_val))
+        return escalados.astype(tipo_compacto(self.interval_max), order="C")
+        
     def es_relacion_valida(self, datos: pd.DataFrame) -> bool:
         return self.es_numerico(datos)
     
     def procesar_relacion(self, datos: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
-        min_val = datos.min().min()
-        max_val = datos.max().max()
-        datos = datos.map(lambda x: np.floor(1 + (x - min_val) * (self.interval_max - 1) / (max_val - min_val)).astype(int))
-        return datos, {"interval_max": self.interval_max, "min_val": min_val, "max_val": max_val}
\ No newline at end of file
+        valores = datos.to_numpy()
+        min_val = valores.min()
+        max_val = valores.max()
+        escalados = self._escalar(valores, min_val, max_val)
+        return pd.DataFrame(escalados, index=datos.index, columns=datos.columns, copy=False), {"interval_max": self.interval_max, "min_val": min_val, "max_val": max_val}
+    
+    def acumular_flujo(self, estado: dict, datos: pd.DataFrame) -> None:
+        super().acumular_flujo(estado, datos)
+        if not self.es_numerico(datos):
+            raise Exception("La relacion no es valida para el conjunto de datos propuesto")
+        
+        valores = datos.to_numpy()
+        if valores.size > 0:
+            estado["min_val"] = valores.min() if "min_val" not in estado else min(estado["min_val"], valores.min())
+            estado["max_val"] = valores.max() if "max_val" not in estado else max(estado["max_val"], valores.max())
+    
+    def cerrar_flujo(self, estado: dict) -> dict:
+        estado["metadata"] = {"interval_max": self.interval_max, "min_val": estado.get("min_val"), "max_val": estado.get("max_val")}
+        return estado["metadata"]
+    
+    def tipo_flujo(self, estado: dict) -> np.dtype:
+        return tipo_compacto(self.interval_max)
+    
+    def transformar_flujo(self, estado: dict, datos: pd.DataFrame) -> np.ndarray:
+        return self._escalar(datos.to_numpy(), estado["metadata"]["min_val"], estado["metadata"]["max_val"])
+    
+    def transformar_con_metadata(self, datos: pd.DataFrame, metadata: dict) -> np.ndarray:
+        if not self.es_numerico(datos):
+            raise Exception("La relacion no es valida para el conjunto de datos propuesto")
+        
+        valores = datos.to_numpy()
+        min_val = metadata["min_val"]
+        max_val = metadata["max_val"]
+        if valores.size > 0 and (valores.min() < min_val or valores.max() > max_val):
+            raise Exception(f"Los nuevos valores quedan fuera del rango [{min_val}, {max_val}] con el que se escalaron los datos: hay que reconstruir el Emparillador")
+        return self._escalar(valores, min_val, max_val)
@@ -0,0 +1,257 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+
+import numpy as np
+import pandas as pd
+
+from relacion import Relacion, Dicotomica, Clasificatoria, Evaluativa
+from emparillado import CARACTERISTICAS, ELEMENTOS, Emparillador
+from arbol import Arbol
+from persistencia import a_json
+from progreso import ObservadorNulo
+
+
+LIMITE_LINEA = 1 << 26
+PUERTO = 8765
+
+
+def relacion_desde_spec(spec: dict) -> Relacion:
+    tipo = spec.get("tipo")
+    if tipo == "dicotomica":
+        return Dicotomica()
+    if tipo == "clasificatoria":
+        return Clasificatoria(generar_ranking=spec.get("generar_ranking", True))
+    if tipo == "evaluativa":
+        return Evaluativa(max_value=spec["max_value"])
+    raise Exception(f"Relacion desconocida: {tipo}")
+
+
+def resumen_nodo(arbol: Arbol, nodo, etiqueta: bool = False) -> dict:
+    resumen = {
+        "elementos": [arbol.indices[i] for i in nodo.elementos],
+        "valor": nodo.valor,
+        "hijos": [{"tamano": len(hijo.elementos), "valor": hijo.valor} for hijo in nodo.hijos],
+    }
+    if nodo.soporte is not None:
+        resumen["soporte"] = nodo.soporte
+    if etiqueta:
+        resumen["etiqueta"] = nodo.label_name(arbol.indices)
+    return resumen
+
+
+class Servicio():
+
+    datasets: dict[str, Emparillador]
+    arboles: dict[tuple, Arbol]
+
+    def __init__(self, hilos: Optional[int] = None, **opciones):
+        self.datasets = {}
+        self.arboles = {}
+        self.opciones = opciones
+        self._ejecutor = ThreadPoolExecutor(max_workers=hilos or os.cpu_count() or 1)
+        self._pendientes = {}
+        self._servidor = None
+
+    async def _en_ejecutor(self, funcion, *argumentos):
+        return await asyncio.get_running_loop().run_in_executor(self._ejecutor, funcion, *argumentos)
+
+    def _crear_emparillador(self, solicitud: dict) -> Emparillador:
+        relacion = relacion_desde_spec(solicitud["relacion"])
+        opciones = dict(self.opciones, observador=ObservadorNulo())
+        if "ruta" in solicitud:
+            return Emparillador.desde_fuente(solicitud["ruta"], relacion, **opciones)
+        datos = pd.DataFrame(solicitud["datos"], index=solicitud.get("filas"), columns=solicitud.get("columnas"))
+        return Emparillador(datos, relacion, **opciones)
+
+    def registrar(self, nombre: str, emparillador: Emparillador) -> None:
+        self.datasets[nombre] = emparillador
+        self._olvidar_arboles(nombre)
+
+    def eliminar(self, nombre: str) -> None:
+        self._emparillador(nombre)
+        del self.datasets[nombre]
+        self._olvidar_arboles(nombre)
+
+    def _olvidar_arboles(self, nombre: str) -> None:
+        for clave in [clave for clave in self.arboles if clave[0] == nombre]:
+            del self.arboles[clave]
+
+    def _emparillador(self, nombre: str) -> Emparillador:
+        if nombre not in self.datasets:
+            raise Exception(f"No hay un conjunto de datos registrado con el nombre {nombre}")
+        return self.datasets[nombre]
+
+    def _construir_arbol(self, emparillador: Emparillador, eje: str, linkage: str) -> Arbol:
+        if eje == ELEMENTOS:
+            return emparillador.clasificar_elementos(linkage=linkage)
+        if eje == CARACTERISTICAS:
+            return emparillador.clasificar_caracteristicas(linkage=linkage)
+        raise Exception(f"Eje desconocido: {eje}")
+
+    async def _construir(self, clave: tuple, emparillador: Emparillador) -> Arbol:
+        pendiente = (emparillador,) + clave[1:]
+        try:
+            arbol = await self._en_ejecutor(self._construir_arbol, emparillador, clave[1], clave[2])
+        finally:
+            del self._pendientes[pendiente]
+        if self.datasets.get(clave[0]) is emparillador:
+            self.arboles[clave] = arbol
+        return arbol
+
+    async def arbol(self, nombre: str, eje: str = ELEMENTOS, linkage: str = "single") -> Arbol:
+        clave = (nombre, eje, linkage)
+        if clave in self.arboles:
+            return self.arboles[clave]
+
+        emparillador = self._emparillador(nombre)
+        pendiente = self._pendientes.get((emparillador, eje, linkage))
+        if pendiente is None:
+            pendiente = asyncio.ensure_future(self._construir(clave, emparillador))
+            self._pendientes[(emparillador, eje, linkage)] = pendiente
+        return await asyncio.shield(pendiente)
+
+    def _nodo(self, arbol: Arbol, camino: list[int]):
+        nodo = arbol.nodo
+        for paso in camino:
+            if not 0 <= paso < len(nodo.hijos):
+                raise Exception(f"El camino {camino} no existe en el arbol")
+            nodo = nodo.hijos[paso]
+        return nodo
+
+    async def atender(self, solicitud: dict) -> dict:
+        operacion = solicitud.get("operacion")
+
+        if operacion == "registrar":
+            emparillador = await self._en_ejecutor(self._crear_emparillador, solicitud)
+            self.registrar(solicitud["nombre"], emparillador)
+            return {"filas": emparillador.grilla.shape[0], "columnas": emparillador.grilla.shape[1]}
+
+        if operacion == "eliminar":
+            self.eliminar(solicitud["nombre"])
+            return {}
+
+        if operacion == "listar":
+            return {nombre: list(emparillador.grilla.shape) for nombre, emparillador in self.datasets.items()}
+
+        eje = solicitud.get("eje", ELEMENTOS)
+        linkage = solicitud.get("linkage", "single")
+        arbol = await self.arbol(solicitud["nombre"], eje, linkage)
+
+        if operacion == "clasificar":
+            return {"hojas": len(arbol.nodo.elementos), "altura": arbol.nodo.valor, "hijos": len(arbol.nodo.hijos)}
+        if operacion == "subarbol":
+            return resumen_nodo(arbol, self._nodo(arbol, solicitud.get("camino", [])), solicitud.get("etiqueta", False))
+        if operacion == "etiqueta":
+            return {"etiqueta": self._nodo(arbol, solicitud.get("camino", [])).label_name(arbol.indices)}
+        if operacion == "cortar":
+            return {"grupos": arbol.cortar(solicitud["altura"]).tolist()}
+        if operacion == "cofenetica":
+            return {"distancias": np.atleast_1d(arbol.distancias_cofeneticas(solicitud["i"], solicitud["j"])).tolist()}
+
+        raise Exception(f"Operacion desconocida: {operacion}")
+
+    async def _responder(self, linea: bytes) -> dict:
+        solicitud = {}
+        try:
+            solicitud = json.loads(linea)
+            respuesta = {"ok": True, "resultado": await self.atender(solicitud)}
+        except Exception as error:
+            respuesta = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+        if isinstance(solicitud, dict) and "id" in solicitud:
+            respuesta["id"] = solicitud["id"]
+        return respuesta
+
+    async def _conexion(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        candado = asyncio.Lock()
+        tareas = set()
+
+        async def procesar(linea: bytes) -> None:
+            respuesta = await self._responder(linea)
+            async with candado:
+                escritor.write(json.dumps(a_json(respuesta)).encode() + b"\n")
+                await escritor.drain()
+
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                if linea.strip():
+                    tarea = asyncio.ensure_future(procesar(linea))
+                    tareas.add(tarea)
+                    tarea.add_done_callback(tareas.discard)
+            if tareas:
+                await asyncio.gather(*tareas, return_exceptions=True)
+        finally:
+            escritor.close()
+
+    async def iniciar(self, ruta_socket: Optional[str] = None, host: str = "127.0.0.1", puerto: int = PUERTO) -> asyncio.AbstractServer:
+        if ruta_socket is not None:
+            self._servidor = await asyncio.start_unix_server(self._conexion, path=ruta_socket, limit=LIMITE_LINEA)
+        else:
+            self._servidor = await asyncio.start_server(self._conexion, host, puerto, limit=LIMITE_LINEA)
+        return self._servidor
+
+    async def cerrar(self) -> None:
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        self._ejecutor.shutdown(wait=False)
+
+
+class Cliente():
+
+    def __init__(self, ruta_socket: Optional[str] = None, host: str = "127.0.0.1", puerto: int = PUERTO):
+        if ruta_socket is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(ruta_socket)
+        else:
+            self._socket = socket.create_connection((host, puerto))
+        self._archivo = self._socket.makefile("rwb")
+
+    def enviar(self, operacion: str, **parametros) -> dict:
+        self._archivo.write(json.dumps(a_json(dict(parametros, operacion=operacion))).encode() + b"\n")
+        self._archivo.flush()
+        respuesta = json.loads(self._archivo.readline())
+        if not respuesta["ok"]:
+            raise Exception(respuesta["error"])
+        return respuesta["resultado"]
+
+    def cerrar(self) -> None:
+        self._archivo.close()
+        self._socket.close()
+
+
+async def servir(ruta_socket: Optional[str], host: str, puerto: int, hilos: Optional[int]) -> None:
+    servicio = Servicio(hilos)
+    servidor = await servicio.iniciar(ruta_socket, host, puerto)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await servicio.cerrar()
+
+
+def main(argumentos: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Servicio local que mantiene conjuntos de datos y arboles en memoria")
+    parser.add_argument("--socket", default=None, help="Ruta del socket Unix (por defecto TCP en localhost)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--hilos", type=int, default=None, help="Hilos para las clasificaciones (por defecto uno por CPU)")
+    opciones = parser.parse_args(argumentos)
+
+    try:
+        asyncio.run(servir(opciones.socket, opciones.host, opciones.puerto, opciones.hilos))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import unittest
+import tempfile
+import time
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relacion import Evaluativa
+from emparillado import Emparillador
+from arbol import Arbol
+from enlace import tabla_desde_arbol_minimo
+
+
+class TestPersistenciaArbol(unittest.TestCase):
+
+    def setUp(self):
+
+        generador = np.random.default_rng(13)
+        datos = pd.DataFrame(generador.integers(0, 5, size=(40, 4)), index=[f"fila {i}" for i in range(40)], columns=list('ABCD'))
+        self.emparillador = Emparillador(datos, Evaluativa(max_value=4))
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'arbol.npz')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def _forma(self, nodo) -> list:
+        return sorted((nodo.valor, tuple(sorted(nodo.elementos)), self._forma_hijos(nodo)) for nodo in [nodo])
+
+    def _forma_hijos(self, nodo) -> tuple:
+        return tuple(sorted(str(self._forma(hijo)) for hijo in nodo.hijos))
+
+    def test_ida_y_vuelta(self):
+        arbol = self.emparillador.clasificar_elementos()
+        arbol.guardar(self.ruta)
+        cargado = Arbol.cargar(self.ruta)
+
+        self.assertEqual(cargado.nombre, "Elementos")
+        self.assertEqual(list(cargado.indices), list(arbol.indices))
+        self.assertFalse(cargado.tabla.orden_hojas.flags.writeable)
+        for nombre, arreglo in arbol.tabla.arreglos().items():
+            self.assertTrue(np.array_equal(cargado.tabla.arreglos()[nombre], arreglo))
+        self.assertEqual(self._forma(cargado.nodo), self._forma(arbol.nodo))
+        self.assertEqual(cargado.metadata["relacion"], "Evaluativa")
+        self.assertEqual(cargado.metadata["metadata"]["interval_max"], 4)
+        self.assertTrue(np.array_equal(cargado.cortar(2), arbol.cortar(2)))
+
+    def test_etiquetas_numericas_sin_mapear(self):
+        arbol = self.emparillador.clasificar_caracteristicas()
+        arbol.indices = pd.Index([10, 20, 30, 40])
+        arbol.guardar(self.ruta)
+        cargado = Arbol.cargar(self.ruta, mapear=False)
+
+        self.assertEqual(cargado.indices.tolist(), [10, 20, 30, 40])
+        self.assertTrue(cargado.tabla.izquierdo.flags.writeable)
+
+    def test_newick(self):
+        arbol = self.emparillador.clasificar_elementos()
+        texto = arbol.newick()
+
+        self.assertTrue(texto.endswith(";"))
+        self.assertEqual(texto.count("("), texto.count(")"))
+        self.assertEqual(texto.count("("), 39)
+        self.assertEqual(texto.count("'fila "), 40)
+
+    def test_arbol_profundo(self):
+        n = 100_000
+        tabla = tabla_desde_arbol_minimo(n, np.arange(n - 1), np.arange(1, n), np.arange(1, n, dtype=float))
+        Arbol.desde_tabla("Elementos", tabla, np.arange(n)).guardar(self.ruta)
+
+        inicio = time.perf_counter()
+        cargado = Arbol.cargar(self.ruta)
+        self.assertLess(time.perf_counter() - inicio, 0.5)
+
+        self.assertEqual(cargado.nodo.valor, n - 1)
+        self.assertEqual(cargado.newick().count("("), n - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import tempfile
+import json
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from benchmark import ETAPAS, RELACIONES, comparar, comparar_importacion, main
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.salida = os.path.join(self.directorio.name, 'resultados.json')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def _ejecutar(self, *argumentos) -> tuple[int, dict]:
+        codigo = main(['--filas', '30', '--columnas', '4', '--salida', self.salida, *argumentos])
+        with open(self.salida) as archivo:
+            return codigo, json.load(archivo)
+
+    def test_resultados_por_etapa(self):
+        codigo, resultados = self._ejecutar()
+
+        self.assertEqual(codigo, 0)
+        self.assertEqual(sorted(caso['relacion'] for caso in resultados['casos']), sorted(RELACIONES))
+        for caso in resultados['casos']:
+            self.assertEqual(list(caso['etapas']), ETAPAS)
+            self.assertTrue(all(etapa['memoria_pico'] > 0 for etapa in caso['etapas'].values()))
+        self.assertEqual(resultados['importacion']['pesados'], [])
+        self.assertGreater(resultados['importacion']['segundos'], 0)
+        self.assertFalse(resultados['comparacion_importacion']['regresion'])
+
+    def test_importacion_con_modulos_pesados(self):
+        importacion = {'segundos': 0.5, 'memoria_pico': 100, 'pesados': ['matplotlib']}
+        self.assertTrue(comparar_importacion(importacion, None)['regresion'])
+        self.assertTrue(comparar_importacion(dict(importacion, pesados=[]), dict(importacion, segundos=0.1))['regresion'])
+        self.assertFalse(comparar_importacion(dict(importacion, pesados=[]), importacion)['regresion'])
+
+    def test_comparacion_con_base(self):
+        _, base = self._ejecutar('--relaciones', 'evaluativa')
+        ruta_base = os.path.join(self.directorio.name, 'base.json')
+        for etapa in base['casos'][0]['etapas'].values():
+            etapa['segundos'] = 1e-12
+        with open(ruta_base, 'w') as archivo:
+            json.dump(base, archivo)
+
+        codigo, resultados = self._ejecutar('--relaciones', 'evaluativa', '--base', ruta_base)
+
+        self.assertEqual(codigo, 1)
+        self.assertEqual(len(resultados['comparacion']), len(ETAPAS))
+        self.assertTrue(all(c['regresion'] for c in resultados['comparacion']))
+        self.assertFalse(any(c['regresion'] for c in comparar(resultados, resultados)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arbol import Arbol
+from bootstrap import aglomerar, claves_hojas, clados, contribuciones_columnas, pesos_bootstrap, soporte_bootstrap
+from distancias import distancias_l1
+from emparillado import Emparillador
+from progreso import ObservadorNulo
+from relacion import Evaluativa
+
+
+class TestBootstrap(unittest.TestCase):
+
+    def setUp(self):
+        generador = np.random.default_rng(8)
+        grupos = [generador.integers(0, 2, size=(10, 6)), generador.integers(6, 8, size=(10, 6)), generador.integers(2, 6, size=(10, 6))]
+        self.valores = np.concatenate(grupos).astype(np.uint8)
+        self.tabla = aglomerar(distancias_l1(self.valores))
+
+    def tearDown(self):
+        pass
+
+    def _soporte_naive(self, iteraciones: int, linkage: str = "single") -> np.ndarray:
+        claves = claves_hojas(30)
+        nodos, referencia = clados(self.tabla, claves)
+        apariciones = np.zeros(len(nodos))
+        for pesos in pesos_bootstrap(6, iteraciones):
+            columnas = np.repeat(np.arange(6), pesos)
+            tabla = aglomerar(distancias_l1(self.valores[:, columnas]), linkage)
+            apariciones += np.isin(referencia, clados(tabla, claves)[1])
+        soporte = np.full(29, np.nan)
+        soporte[nodos - 30] = apariciones / iteraciones
+        return soporte
+
+    def test_suma_ponderada_igual_a_remuestreo(self):
+        contribuciones = contribuciones_columnas(self.valores)
+        for pesos in pesos_bootstrap(6, 5):
+            columnas = np.repeat(np.arange(6), pesos)
+            esperadas = distancias_l1(self.valores[:, columnas]).valores
+            self.assertTrue(np.array_equal(pesos.astype(contribuciones.dtype) @ contribuciones, esperadas))
+
+    def test_clados_independientes_del_orden(self):
+        permutacion = np.random.default_rng(2).permutation(30)
+        claves = claves_hojas(30)
+        otra = aglomerar(distancias_l1(self.valores[permutacion]))
+        nodos, referencia = clados(self.tabla, claves)
+        _, permutados = clados(otra, claves[permutacion])
+
+        self.assertEqual(sorted(referencia.tolist()), sorted(permutados.tolist()))
+        arbol = Arbol.desde_tabla("Elementos", self.tabla, list(range(30)))
+        internos = 0
+        pendientes = [arbol.nodo]
+        while pendientes:
+            nodo = pendientes.pop()
+            internos += len(nodo.hijos) > 0
+            pendientes.extend(nodo.hijos)
+        self.assertEqual(len(nodos), internos)
+
+    def test_igual_al_remuestreo_naive(self):
+        for linkage in ["single", "average"]:
+            self.tabla = aglomerar(distancias_l1(self.valores), linkage)
+            esperado = self._soporte_naive(20, linkage)
+            for tamano_lote, n_jobs in [(None, 1), (3, 1), (7, 2)]:
+                obtenido = soporte_bootstrap(self.valores, self.tabla, 20, linkage, tamano_lote=tamano_lote, n_jobs=n_jobs)
+                self.assertTrue(np.array_equal(obtenido, esperado, equal_nan=True))
+
+    def test_contribuciones_en_disco(self):
+        import gc
+
+        esperado = soporte_bootstrap(self.valores, self.tabla, 20, tamano_lote=3)
+        with tempfile.TemporaryDirectory() as directorio:
+            contribuciones = contribuciones_columnas(self.valores, directorio)
+            self.assertIsInstance(contribuciones, np.memmap)
+            self.assertTrue(np.array_equal(contribuciones, contribuciones_columnas(self.valores)))
+            del contribuciones
+
+            for n_jobs in [1, 2]:
+                obtenido = soporte_bootstrap(self.valores, self.tabla, 20, tamano_lote=3, n_jobs=n_jobs, directorio=directorio)
+                self.assertTrue(np.array_equal(obtenido, esperado, equal_nan=True))
+            gc.collect()
+            self.assertEqual(os.listdir(directorio), [])
+
+    def test_arbol_con_soporte(self):
+        emparillador = Emparillador(pd.DataFrame(self.valores), Evaluativa(max_value=8), observador=ObservadorNulo())
+        arbol = emparillador.bootstrap(30)
+        grupos = [h for h in arbol.nodo.hijos if len(h.elementos) >= 10]
+
+        self.assertEqual(arbol.metadata["bootstrap"]["iteraciones"], 30)
+        self.assertEqual(arbol.nodo.soporte, 1.0)
+        self.assertTrue(all(0 <= h.soporte <= 1 for h in grupos))
+        self.assertTrue(all(h.soporte is None for h in arbol.nodo.hijos if len(h.elementos) == 1))
+        self.assertTrue(np.all(np.isnan(arbol.soporte) | ((arbol.soporte >= 0) & (arbol.soporte <= 1))))
+        self.assertIsNone(emparillador.clasificar_elementos().soporte)
+
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "arbol.npz")
+            arbol.guardar(ruta)
+            cargado = Arbol.cargar(ruta)
+        self.assertTrue(np.array_equal(cargado.soporte, arbol.soporte, equal_nan=True))
+        self.assertIn(")1;", arbol.newick())
+
+    def test_iteraciones_invalidas(self):
+        with self.assertRaises(Exception):
+            soporte_bootstrap(self.valores, self.tabla, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
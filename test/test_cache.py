@@ -0,0 +1,98 @@
+import unittest
+import tempfile
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relacion import Clasificatoria, Evaluativa
+from emparillado import Emparillador
+from cache import CacheResultados, clave_resultado, huella_grilla
+from distancias import distancias_l1
+
+
+class TestCacheResultados(unittest.TestCase):
+
+    def setUp(self):
+
+        generador = np.random.default_rng(6)
+        self.datos = pd.DataFrame(generador.integers(0, 5, size=(30, 4)))
+        self.directorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def _contar_tablas(self, emparillador: Emparillador) -> list:
+        llamadas = []
+        original = emparillador._generar_tabla
+
+        def contar(matriz, *argumentos):
+            llamadas.append(matriz.shape[0])
+            return original(matriz, *argumentos)
+
+        emparillador._generar_tabla = contar
+        return llamadas
+
+    def test_memo_en_instancia(self):
+        emparillador = Emparillador(self.datos, Evaluativa(max_value=4))
+        llamadas = self._contar_tablas(emparillador)
+
+        primero = emparillador.clasificar_elementos()
+        segundo = emparillador.clasificar_elementos()
+        emparillador.clasificar_caracteristicas()
+
+        self.assertEqual(llamadas, [30, 4])
+        self.assertIs(primero.tabla, segundo.tabla)
+
+    def test_cache_en_disco_entre_instancias(self):
+        primero = Emparillador(self.datos, Evaluativa(max_value=4), cache=self.directorio.name).clasificar_elementos()
+
+        emparillador = Emparillador(self.datos, Evaluativa(max_value=4), cache=self.directorio.name)
+        llamadas = self._contar_tablas(emparillador)
+        segundo = emparillador.clasificar_elementos()
+
+        self.assertEqual(llamadas, [])
+        self.assertTrue(np.array_equal(primero.tabla.altura, segundo.tabla.altura))
+        self.assertTrue(np.array_equal(primero.tabla.orden_hojas, segundo.tabla.orden_hojas))
+        self.assertTrue(np.array_equal(emparillador._matriz_diferencias_elementos(), Emparillador(self.datos, Evaluativa(max_value=4))._matriz_diferencias_elementos()))
+
+    def test_clave_depende_de_parametros(self):
+        huella = huella_grilla(self.datos.to_numpy())
+        claves = {
+            clave_resultado(huella, Evaluativa(max_value=4), "elementos"),
+            clave_resultado(huella, Evaluativa(max_value=5), "elementos"),
+            clave_resultado(huella, Evaluativa(max_value=4), "caracteristicas"),
+            clave_resultado(huella, Clasificatoria(generar_ranking=True), "elementos"),
+            clave_resultado(huella_grilla(self.datos.to_numpy()[1:]), Evaluativa(max_value=4), "elementos"),
+        }
+        self.assertEqual(len(claves), 5)
+
+    def test_desalojo_lru_en_memoria(self):
+        distancias = distancias_l1(self.datos.to_numpy())
+        cache = CacheResultados(tamano_memoria=2 * distancias.valores.nbytes)
+
+        cache.guardar_distancias("a", distancias)
+        cache.guardar_distancias("b", distancias)
+        cache.obtener_distancias("a")
+        cache.guardar_distancias("c", distancias)
+
+        self.assertIsNotNone(cache.obtener_distancias("a"))
+        self.assertIsNone(cache.obtener_distancias("b"))
+        self.assertIsNotNone(cache.obtener_distancias("c"))
+
+    def test_limite_en_disco(self):
+        distancias = distancias_l1(self.datos.to_numpy())
+        cache = CacheResultados(self.directorio.name, tamano_memoria=0, tamano_disco=distancias.valores.nbytes + 256)
+
+        cache.guardar_distancias("a", distancias)
+        os.utime(os.path.join(self.directorio.name, "a.dist.npy"), (0, 0))
+        cache.guardar_distancias("b", distancias)
+
+        self.assertIsNone(cache.obtener_distancias("a"))
+        self.assertTrue(np.array_equal(cache.obtener_distancias("b").valores, distancias.valores))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+
+from distancias import MatrizDistancias, distancias_hamming, distancias_l1, matriz_l1, filas_por_bloque, contar_bits
+
+
+class TestMatrizL1(unittest.TestCase):
+
+    def setUp(self):
+
+        generador = np.random.default_rng(0)
+        self.datos = pd.DataFrame(generador.integers(1, 6, size=(37, 5)))
+
+    def tearDown(self):
+        pass
+
+    def _matriz_naive(self, datos: pd.DataFrame) -> np.ndarray:
+        n = datos.shape[0]
+        matriz = np.zeros((n, n))
+        for i in range(n):
+            for j in range(i+1, n):
+                matriz[i][j] = np.sum(np.abs(datos.iloc[i] - datos.iloc[j]))
+                matriz[j][i] = matriz[i][j]
+        return matriz
+
+    def test_identica_al_loop_naive(self):
+        esperada = self._matriz_naive(self.datos)
+        for tamano_bloque in [None, 1, 4, 36, 37, 100]:
+            matriz = matriz_l1(self.datos.to_numpy(), tamano_bloque)
+            self.assertEqual(matriz.dtype, esperada.dtype)
+            self.assertTrue(np.array_equal(matriz, esperada))
+
+    def _matriz_caracteristicas_naive(self, datos: pd.DataFrame) -> np.ndarray:
+        n = datos.shape[1]
+        invertidos = datos.max().max() - datos + datos.min().min()
+        matriz = np.zeros((n, n))
+        for i in range(n):
+            for j in range(i+1, n):
+                directa = np.sum(np.abs(datos.iloc[:, i] - datos.iloc[:, j]))
+                invertida = np.sum(np.abs(invertidos.iloc[:, i] - datos.iloc[:, j]))
+                matriz[i][j] = min(directa, invertida)
+                matriz[j][i] = matriz[i][j]
+        return matriz
+
+    def test_caracteristicas_con_inversion(self):
+        valores = self.datos.to_numpy()
+        esperada = self._matriz_caracteristicas_naive(self.datos)
+        for tamano_bloque in [None, 1, 2, 5]:
+            matriz = matriz_l1(valores.T, tamano_bloque, suma_inversion=int(valores.max()) + int(valores.min()))
+            self.assertTrue(np.array_equal(matriz, esperada))
+
+    def test_inversion_detecta_caracteristicas_opuestas(self):
+        valores = np.array([[1, 5], [2, 4], [3, 3], [4, 2], [5, 1]])
+        matriz = matriz_l1(valores.T, suma_inversion=6)
+        self.assertEqual(matriz[0][1], 0)
+
+    def test_avance_cubre_todas_las_filas(self):
+        avances = []
+        matriz_l1(self.datos.to_numpy(), 8, avances.append)
+        self.assertEqual(sum(avances), 37)
+        self.assertEqual(len(avances), 5)
+
+    def test_filas_por_bloque(self):
+        self.assertEqual(filas_por_bloque(10, 3), 3)
+        self.assertGreaterEqual(filas_por_bloque(10 ** 7), 1)
+        with self.assertRaises(Exception):
+            filas_por_bloque(10, 0)
+
+
+class TestMatrizDistancias(unittest.TestCase):
+
+    def setUp(self):
+
+        generador = np.random.default_rng(2)
+        self.valores = generador.integers(1, 6, size=(23, 4))
+        self.cuadrada = matriz_l1(self.valores)
+
+    def tearDown(self):
+        pass
+
+    def test_tipo_entero_compacto(self):
+        distancias = distancias_l1(self.valores)
+        self.assertEqual(distancias.dtype, np.uint8)
+        self.assertEqual(len(distancias.valores), 23 * 22 // 2)
+
+        anchas = distancias_l1(np.array([[0, 0], [300, 300]]))
+        self.assertEqual(anchas.dtype, np.uint16)
+        self.assertEqual(anchas[1, 0], 600)
+
+    def test_indexado_igual_a_cuadrada(self):
+        distancias = distancias_l1(self.valores, 5)
+        self.assertTrue(np.array_equal(distancias.cuadrada(), self.cuadrada))
+        for i in [0, 7, 22]:
+            self.assertTrue(np.array_equal(distancias[i], self.cuadrada[i]))
+            self.assertTrue(np.array_equal(distancias[i, [3, i, 1]], self.cuadrada[i, [3, i, 1]]))
+            self.assertEqual(distancias[i, 4], self.cuadrada[i, 4])
+            self.assertEqual(distancias[i][i], 0)
+
+    def test_memmap(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            distancias = distancias_l1(self.valores, 3, directorio=directorio)
+            ruta = distancias.ruta
+
+            self.assertIsInstance(distancias.valores, np.memmap)
+            self.assertTrue(os.path.exists(ruta))
+            self.assertTrue(np.array_equal(distancias.cuadrada(), self.cuadrada))
+
+            del distancias
+            self.assertFalse(os.path.exists(ruta))
+
+    def test_ampliar_en_memmap_conserva_el_archivo(self):
+        import gc
+
+        with tempfile.TemporaryDirectory() as directorio:
+            inicial = distancias_l1(self.valores[:15], directorio=directorio)
+            intermedia = inicial.ampliar(self.valores[:16])
+            ampliada = intermedia.ampliar(self.valores[:17])
+            ruta = ampliada.ruta
+
+            self.assertEqual(intermedia.ruta, ruta)
+            del inicial, intermedia
+            gc.collect()
+            self.assertTrue(os.path.exists(ruta))
+            self.assertTrue(np.array_equal(ampliada.cuadrada(), self.cuadrada[:17, :17]))
+
+            del ampliada
+            gc.collect()
+            self.assertFalse(os.path.exists(ruta))
+
+    def test_procesos_deterministas(self):
+        secuencial = distancias_l1(self.valores, 4)
+        for n_jobs in [2, 3, -1]:
+            paralela = distancias_l1(self.valores, 4, n_jobs=n_jobs)
+            self.assertEqual(paralela.dtype, secuencial.dtype)
+            self.assertTrue(np.array_equal(paralela.valores, secuencial.valores))
+
+        invertida = distancias_l1(self.valores.T, 1, suma_inversion=6)
+        self.assertTrue(np.array_equal(distancias_l1(self.valores.T, 1, suma_inversion=6, n_jobs=2).valores, invertida.valores))
+
+    def test_procesos_en_memmap(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            distancias = distancias_l1(self.valores, 5, directorio=directorio, n_jobs=2)
+            self.assertTrue(np.array_equal(distancias.cuadrada(), self.cuadrada))
+
+    def test_un_elemento(self):
+        distancias = MatrizDistancias(1, np.uint8)
+        self.assertEqual(distancias.shape, (1, 1))
+        self.assertEqual(len(distancias[0]), 1)
+
+
+class TestHamming(unittest.TestCase):
+
+    def setUp(self):
+
+        generador = np.random.default_rng(4)
+        self.grillas = [generador.integers(0, 2, size=(29, m)).astype(np.uint8) for m in (1, 7, 63, 64, 65, 130)]
+
+    def tearDown(self):
+        pass
+
+    def test_igual_a_l1(self):
+        for grilla in self.grillas:
+            for tamano_bloque in [None, 1, 8]:
+                hamming = distancias_hamming(grilla, tamano_bloque)
+                l1 = distancias_l1(grilla)
+                self.assertEqual(hamming.dtype, l1.dtype)
+                self.assertTrue(np.array_equal(hamming.valores, l1.valores))
+
+    def test_caracteristicas_con_inversion(self):
+        for grilla in self.grillas:
+            hamming = distancias_hamming(grilla.T, invertir=True)
+            l1 = distancias_l1(grilla.T, suma_inversion=1)
+            self.assertTrue(np.array_equal(hamming.valores, l1.valores))
+
+    def test_procesos(self):
+        grilla = self.grillas[-1]
+        self.assertTrue(np.array_equal(distancias_hamming(grilla, 4, n_jobs=2).valores, distancias_l1(grilla).valores))
+
+    def test_contar_bits(self):
+        palabras = np.array([0, 1, 2**64 - 1, 0x0F0F0F0F0F0F0F0F], dtype=np.uint64)
+        self.assertEqual(contar_bits(palabras).tolist(), [0, 1, 64, 32])
+
+    def test_datos_no_binarios(self):
+        with self.assertRaises(Exception):
+            distancias_hamming(np.array([[0, 2], [1, 1]]))
+
+
+if __name__ == '__main__':
+    unittest.main()
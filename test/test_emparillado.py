@@ -10,6 +10,9 @@ from relacion import Dicotomica, Clasificatoria, Evaluativa
 from emparillado import Emparillador
 from arbol import Arbol
 from nodo import Nodo
+from distancias import distancias_l1
+from cache import CacheResultados
+from progreso import ObservadorMetricas
 
 
 class TestEmparillador(unittest.TestCase):
@@ -231,5 +234,218 @@ class TestEmparilladorIntegracion(unittest.TestCase):
         self.assertEqual(len(arbol_caracteristicas.indices), 2)
 
 
+class TestAglomeracion(unittest.TestCase):
+    
+    def setUp(self):
+        self.generador = np.random.default_rng(1)
+        self.clasificatoria = Clasificatoria(generar_ranking=True)
+        self.evaluativa = Evaluativa(max_value=3)
+    
+    def tearDown(self):
+        pass
+    
+    def _forma(self, nodo: Nodo) -> set:
+        forma = set()
+        pendientes = [nodo]
+        while pendientes:
+            actual = pendientes.pop()
+            if len(actual.hijos) > 0:
+                forma.add((frozenset(actual.elementos), float(actual.valor), len(actual.hijos)))
+                pendientes.extend(actual.hijos)
+        return forma
+    
+    def _arbol_referencia(self, emparillador: Emparillador, matriz: np.ndarray) -> Nodo:
+        arbol = [Nodo([i], 0, []) for i in range(matriz.shape[0])]
+        while len(arbol) > 1:
+            arbol = emparillador._reducir_arbol(arbol, matriz)
+        return arbol[0]
+    
+    def test_misma_forma_que_reducir_arbol(self):
+        for _ in range(10):
+            datos = pd.DataFrame({'A': self.generador.permutation(2 ** np.arange(12)), 'B': 1, 'C': 1})
+            emparillador = Emparillador(datos, Evaluativa(max_value=2 ** 11))
+            matriz = emparillador._matriz_diferencias_elementos()
+            
+            esperado = self._arbol_referencia(emparillador, matriz)
+            obtenido = emparillador._generar_arbol([Nodo([i], 0, []) for i in range(12)], matriz)[0]
+            
+            self.assertEqual(sorted(obtenido.elementos), list(range(12)))
+            self.assertEqual(self._forma(obtenido), self._forma(esperado))
+    
+    def test_reducir_arbol_colapso_original(self):
+        emparillador = Emparillador(pd.DataFrame({'A': [1, 2, 5, 8]}), Evaluativa(max_value=8))
+        raiz = self._arbol_referencia(emparillador, emparillador._matriz_diferencias_elementos())
+
+        self.assertEqual(raiz.valor, 3)
+        self.assertEqual(sorted(hijo.elementos for hijo in raiz.hijos), [[0], [1], [2], [3]])
+
+    def test_colapso_solo_a_igual_altura(self):
+        emparillador = Emparillador(pd.DataFrame({'A': [1, 2, 5, 8]}), Evaluativa(max_value=8))
+        raiz = emparillador.clasificar_elementos().nodo
+        hijos = sorted(raiz.hijos, key=lambda hijo: min(hijo.elementos))
+
+        self.assertEqual(raiz.valor, 3)
+        self.assertEqual([sorted(hijo.elementos) for hijo in hijos], [[0, 1], [2], [3]])
+        self.assertEqual(hijos[0].valor, 1)
+
+    def test_distancias_en_disco(self):
+        import tempfile
+        
+        datos = pd.DataFrame(self.generador.integers(0, 4, size=(15, 3)))
+        en_memoria = Emparillador(datos, self.evaluativa).clasificar_elementos()
+        with tempfile.TemporaryDirectory() as directorio:
+            en_disco = Emparillador(datos, self.evaluativa, directorio_distancias=directorio).clasificar_elementos()
+        
+        self.assertEqual(self._forma(en_disco.nodo), self._forma(en_memoria.nodo))
+    
+    def _formas_iguales(self, incremental: Emparillador, completo: Emparillador, arbol: Arbol):
+        self.assertTrue(np.array_equal(incremental.datos.to_numpy(), completo.datos.to_numpy()))
+        self.assertTrue(np.array_equal(incremental._matriz_diferencias_elementos(), completo._matriz_diferencias_elementos()))
+        self.assertEqual(self._forma(arbol.nodo), self._forma(completo.clasificar_elementos().nodo))
+        self.assertEqual(arbol.indices.tolist(), completo.datos.index.tolist())
+    
+    def test_agregar_elementos(self):
+        datos = pd.DataFrame(self.generador.integers(0, 4, size=(40, 3)), columns=list('ABC'))
+        datos.iloc[0, 0] = 0
+        datos.iloc[0, 1] = 3
+        
+        emparillador = Emparillador(datos.iloc[:25], self.evaluativa)
+        emparillador.clasificar_elementos()
+        emparillador.agregar_elementos(datos.iloc[25:31])
+        arbol = emparillador.agregar_elementos(datos.iloc[31:, ::-1])
+        
+        self._formas_iguales(emparillador, Emparillador(datos, self.evaluativa), arbol)
+    
+    def test_agregar_elementos_sin_memoria_de_cache(self):
+        datos = pd.DataFrame(self.generador.integers(0, 4, size=(40, 3)), columns=list('ABC'))
+        datos.iloc[0] = [0, 3, 0]
+        metricas = ObservadorMetricas()
+
+        emparillador = Emparillador(datos.iloc[:25], self.evaluativa, cache=CacheResultados(tamano_memoria=0), observador=metricas)
+        emparillador.clasificar_elementos()
+        emparillador.agregar_elementos(datos.iloc[25:31])
+        arbol = emparillador.agregar_elementos(datos.iloc[31:])
+
+        resumen = metricas.resumen()
+        self.assertEqual(resumen["distancias"]["llamadas"], 1)
+        self.assertEqual(resumen["aglomeracion"]["llamadas"], 1)
+        self.assertEqual(resumen["agregar_elementos"]["procesados"], 15)
+        self._formas_iguales(emparillador, Emparillador(datos, self.evaluativa), arbol)
+
+    def test_agregar_elementos_dicotomica(self):
+        datos = pd.DataFrame(np.where(self.generador.integers(0, 2, size=(30, 5)) == 1, 'si', 'no'))
+        emparillador = Emparillador(datos.iloc[:20], Dicotomica())
+        arbol = emparillador.agregar_elementos(datos.iloc[20:])
+        
+        self._formas_iguales(emparillador, Emparillador(datos, Dicotomica()), arbol)
+    
+    def test_agregar_elementos_en_disco(self):
+        import tempfile
+        
+        datos = pd.DataFrame(self.generador.integers(0, 4, size=(30, 3)))
+        datos.iloc[0] = [0, 3, 0]
+        with tempfile.TemporaryDirectory() as directorio:
+            emparillador = Emparillador(datos.iloc[:20], self.evaluativa, directorio_distancias=directorio)
+            arbol = emparillador.agregar_elementos(datos.iloc[20:])
+            self._formas_iguales(emparillador, Emparillador(datos, self.evaluativa), arbol)
+    
+    def test_agregar_elementos_invalidos(self):
+        datos = pd.DataFrame({'A': [1, 2, 3], 'B': [2, 3, 4]})
+        
+        with self.assertRaises(Exception):
+            Emparillador(datos, self.evaluativa).agregar_elementos(pd.DataFrame({'A': [9], 'B': [2]}))
+        with self.assertRaises(Exception):
+            Emparillador(datos, self.evaluativa).agregar_elementos(pd.DataFrame({'A': [1], 'C': [2]}))
+        with self.assertRaises(Exception):
+            Emparillador(datos, self.clasificatoria).agregar_elementos(pd.DataFrame({'A': [1], 'B': [2]}))
+        with self.assertRaises(Exception):
+            Emparillador(pd.DataFrame({'A': ['x', 'y']}), Dicotomica()).agregar_elementos(pd.DataFrame({'A': ['z']}))
+    
+    def test_dicotomica_usa_hamming(self):
+        datos = pd.DataFrame(np.where(self.generador.integers(0, 2, size=(40, 70)) == 1, 'si', 'no'))
+        emparillador = Emparillador(datos, Dicotomica())
+        valores = emparillador.datos.to_numpy()
+        
+        self.assertTrue(emparillador._binaria())
+        self.assertTrue(np.array_equal(emparillador._matriz_diferencias_elementos(), distancias_l1(valores).cuadrada()))
+        self.assertTrue(np.array_equal(emparillador._matriz_diferencias_caracteristicas(), distancias_l1(valores.T, suma_inversion=1).cuadrada()))
+
+    def test_inversion_en_limite_del_tipo(self):
+        evaluativa = pd.DataFrame(self.generador.integers(1, 256, size=(30, 6)))
+        evaluativa.iloc[0, 0], evaluativa.iloc[1, 1] = 1, 255
+        clasificatoria = pd.DataFrame(self.generador.random((255, 6)))
+
+        for emparillador in [Emparillador(evaluativa, Evaluativa(max_value=255)), Emparillador(clasificatoria, Clasificatoria(generar_ranking=True))]:
+            self.assertEqual(emparillador.grilla.dtype, np.uint8)
+            valores = emparillador.grilla.T.astype(np.int64)
+            suma = valores.max() + valores.min()
+            esperada = np.minimum(np.abs(valores[:, None] - valores[None]).sum(axis=2), np.abs(suma - valores[:, None] - valores[None]).sum(axis=2))
+            self.assertTrue(np.array_equal(emparillador._matriz_diferencias_caracteristicas(), esperada))
+
+    def test_grilla_numpy_con_etiquetas(self):
+        valores = self.generador.integers(0, 5, size=(30, 4))
+        filas = [f"e{i}" for i in range(30)]
+        desde_grilla = Emparillador(valores, self.evaluativa, etiquetas_filas=filas, etiquetas_columnas=list('ABCD'))
+        desde_tabla = Emparillador(pd.DataFrame(valores, index=filas, columns=list('ABCD')), self.evaluativa)
+        
+        self.assertTrue(desde_grilla.grilla.flags['C_CONTIGUOUS'])
+        self.assertTrue(np.array_equal(desde_grilla.grilla, desde_tabla.grilla))
+        self.assertTrue(np.shares_memory(desde_grilla.datos.to_numpy(), desde_grilla.grilla))
+        self.assertEqual(desde_grilla.clasificar_elementos().indices.tolist(), filas)
+        self.assertEqual(desde_grilla.clasificar_caracteristicas().indices.tolist(), list('ABCD'))
+        self.assertEqual(self._forma(desde_grilla.clasificar_elementos().nodo), self._forma(desde_tabla.clasificar_elementos().nodo))
+        
+        sin_etiquetas = Emparillador(valores, self.evaluativa)
+        self.assertEqual(sin_etiquetas.clasificar_elementos().indices.tolist(), list(range(30)))
+        
+        with self.assertRaises(Exception):
+            Emparillador(valores[0], self.evaluativa)
+    
+    def test_clasificar_todo(self):
+        datos = pd.DataFrame(self.generador.integers(0, 5, size=(60, 7)))
+        esperado = Emparillador(datos, self.clasificatoria)
+        
+        for concurrente in (True, False):
+            elementos, caracteristicas = Emparillador(datos, self.clasificatoria).clasificar_todo(concurrente)
+            self.assertEqual(self._forma(elementos.nodo), self._forma(esperado.clasificar_elementos().nodo))
+            self.assertEqual(self._forma(caracteristicas.nodo), self._forma(esperado.clasificar_caracteristicas().nodo))
+            self.assertEqual(caracteristicas.nombre, "Caracteristicas")
+    
+    def test_linkage(self):
+        datos = pd.DataFrame(self.generador.integers(0, 4, size=(30, 4)))
+        emparillador = Emparillador(datos, self.evaluativa)
+        simple = emparillador.clasificar_elementos()
+        
+        self.assertEqual(self._forma(emparillador.clasificar_elementos(linkage="single").nodo), self._forma(simple.nodo))
+        for linkage in ["complete", "average", "weighted"]:
+            arbol = emparillador.clasificar_elementos(linkage=linkage)
+            self.assertEqual(sorted(arbol.nodo.elementos), list(range(30)))
+            self.assertGreaterEqual(arbol.nodo.valor, simple.nodo.valor)
+            self.assertEqual(arbol.metadata["linkage"], linkage)
+        
+        completo = emparillador.clasificar_caracteristicas(linkage="complete")
+        self.assertEqual(sorted(completo.nodo.elementos), list(range(4)))
+        with self.assertRaises(Exception):
+            emparillador.clasificar_elementos(linkage="ward")
+        with self.assertRaises(Exception):
+            emparillador.clasificar_elementos(aproximado=True, linkage="complete")
+    
+    def test_linkage_colapsa_alturas_iguales(self):
+        datos = pd.DataFrame([[0, 0], [0, 1], [0, 2], [5, 5], [5, 6]])
+        arbol = Emparillador(datos, Evaluativa(max_value=7)).clasificar_elementos(linkage="complete")
+        pendientes = [arbol.nodo]
+        while pendientes:
+            nodo = pendientes.pop()
+            self.assertTrue(all(hijo.valor < nodo.valor for hijo in nodo.hijos))
+            pendientes.extend(nodo.hijos)
+        self.assertEqual(sorted(sorted(hijo.elementos) for hijo in arbol.nodo.hijos), [[0, 1, 2], [3, 4]])
+    
+    def test_un_solo_elemento(self):
+        emparillador = Emparillador(pd.DataFrame({'A': [1], 'B': [2]}), self.evaluativa)
+        arbol = emparillador.clasificar_elementos()
+        self.assertEqual(arbol.nodo.elementos, [0])
+        self.assertEqual(arbol.nodo.hijos, [])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,197 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enlace import ENLACES, IndiceConsultas, TablaEnlace, aglomerar_lance_williams, arbol_expansion_minima, tabla_desde_arbol_minimo
+from distancias import distancias_l1
+from arbol import Arbol
+from nodo import Nodo
+
+
+class TestTablaEnlace(unittest.TestCase):
+
+    def setUp(self):
+
+        # 0 y 1 a altura 1, 2 y 3 a altura 1, ambos grupos a altura 1 con 4, todo a altura 3
+        self.matriz = np.array([
+            [0, 1, 5, 5, 6],
+            [1, 0, 5, 5, 1],
+            [5, 5, 0, 1, 3],
+            [5, 5, 1, 0, 4],
+            [6, 1, 3, 4, 0],
+        ], dtype=float)
+        origen, destino, peso = arbol_expansion_minima(self.matriz)
+        self.tabla = tabla_desde_arbol_minimo(5, origen, destino, peso)
+
+    def tearDown(self):
+        pass
+
+    def test_filas_ordenadas_por_altura(self):
+        self.assertEqual(self.tabla.altura.tolist(), [1, 1, 1, 3])
+        self.assertEqual(self.tabla.tamano.tolist(), [2, 3, 2, 5])
+        self.assertEqual(self.tabla.raiz, 8)
+
+    def test_orden_hojas_contiguo(self):
+        self.assertEqual(sorted(self.tabla.orden_hojas.tolist()), list(range(5)))
+        for nodo in range(9):
+            hojas = self.tabla.hojas(nodo)
+            self.assertEqual(len(hojas), self.tabla.tamano_nodo(nodo))
+
+    def test_colapso_de_alturas_iguales(self):
+        raiz = Nodo.de_tabla(self.tabla, self.tabla.raiz)
+        self.assertEqual(raiz.valor, 3)
+        self.assertEqual(len(raiz.hijos), 2)
+
+        grupos = sorted(sorted(h.elementos) for h in raiz.hijos)
+        self.assertEqual(grupos, [[0, 1, 4], [2, 3]])
+
+        grupo = [h for h in raiz.hijos if len(h.elementos) == 3][0]
+        self.assertEqual(sorted(len(h.elementos) for h in grupo.hijos), [1, 1, 1])
+        self.assertTrue(all(h.hijos == [] and h.valor == 0 for h in grupo.hijos))
+
+    def test_tabla_vacia(self):
+        tabla = TablaEnlace(1, [], [], [])
+        self.assertEqual(tabla.raiz, 0)
+        self.assertEqual(Nodo.de_tabla(tabla, 0).elementos, [0])
+
+    def test_nodo_sin_hijos_no_comparte_lista(self):
+        a = Nodo([0], 0)
+        b = Nodo([1], 0)
+        a.hijos.append(b)
+        self.assertEqual(b.hijos, [])
+
+
+class TestIndiceConsultas(unittest.TestCase):
+
+    def setUp(self):
+
+        generador = np.random.default_rng(12)
+        valores = generador.integers(0, 6, size=(70, 4))
+        matriz = np.abs(valores[:, None, :] - valores[None, :, :]).sum(axis=2)
+        self.tabla = tabla_desde_arbol_minimo(70, *arbol_expansion_minima(matriz))
+        self.arbol = Arbol.desde_tabla("Elementos", self.tabla, list(range(70)))
+
+    def tearDown(self):
+        pass
+
+    def _cofeneticas_naive(self) -> np.ndarray:
+        n = self.tabla.n
+        matriz = np.zeros((n, n))
+        for fila in range(n - 1):
+            izquierdas = self.tabla.hojas(int(self.tabla.izquierdo[fila]))
+            derechas = self.tabla.hojas(int(self.tabla.derecho[fila]))
+            matriz[np.ix_(izquierdas, derechas)] = self.tabla.altura[fila]
+            matriz[np.ix_(derechas, izquierdas)] = self.tabla.altura[fila]
+        return matriz
+
+    def _particion(self, etiquetas: np.ndarray) -> set:
+        grupos = {}
+        for elemento, etiqueta in enumerate(etiquetas.tolist()):
+            grupos.setdefault(etiqueta, []).append(elemento)
+        return {tuple(grupo) for grupo in grupos.values()}
+
+    def test_cofeneticas_iguales_al_recorrido(self):
+        esperada = self._cofeneticas_naive()
+        i, j = np.meshgrid(np.arange(70), np.arange(70), indexing="ij")
+
+        self.assertTrue(np.array_equal(self.arbol.distancias_cofeneticas(i, j), esperada))
+        self.assertEqual(self.arbol.distancia_cofenetica(3, 40), esperada[3, 40])
+        self.assertEqual(self.arbol.distancia_cofenetica(5, 5), 0)
+
+    def test_ancestro_comun(self):
+        for i, j in [(0, 1), (10, 60), (7, 7)]:
+            nodo = self.arbol.ancestro_comun(i, j)
+            hojas = self.tabla.hojas(nodo).tolist()
+            self.assertIn(i, hojas)
+            self.assertIn(j, hojas)
+            if nodo >= 70:
+                fila = nodo - 70
+                lados = [self.tabla.hojas(int(self.tabla.izquierdo[fila])).tolist(), self.tabla.hojas(int(self.tabla.derecho[fila])).tolist()]
+                self.assertTrue(any(i in lado and j not in lado for lado in lados))
+
+    def test_cortar_igual_a_cofeneticas(self):
+        cofeneticas = self._cofeneticas_naive()
+        alturas = [0, 1, 2, 3, 100]
+        cortes = self.arbol.cortar_varios(alturas)
+
+        self.assertEqual(cortes.shape, (5, 70))
+        for altura, etiquetas in zip(alturas, cortes):
+            esperada = self._particion(np.array([min(np.flatnonzero(cofeneticas[e] <= altura)) for e in range(70)]))
+            self.assertEqual(self._particion(etiquetas), esperada)
+        self.assertTrue(np.array_equal(self.arbol.cortar(2), cortes[2]))
+        self.assertEqual(len(set(self.arbol.cortar(100).tolist())), 1)
+
+    def test_arbol_de_un_elemento(self):
+        arbol = Arbol.desde_tabla("Elementos", TablaEnlace(1, [], [], []), [0])
+        self.assertEqual(arbol.cortar(1).tolist(), [0])
+        self.assertEqual(arbol.distancia_cofenetica(0, 0), 0)
+
+    def test_arbol_sin_tabla(self):
+        with self.assertRaises(Exception):
+            Arbol("Elementos", Nodo([0], 0), [0]).cortar(1)
+
+
+class TestLanceWilliams(unittest.TestCase):
+
+    def setUp(self):
+        self.generador = np.random.default_rng(21)
+
+    def tearDown(self):
+        pass
+
+    def _aglomerar_naive(self, matriz: np.ndarray, linkage: str) -> np.ndarray:
+        n = matriz.shape[0]
+        grupos = {i: [i] for i in range(n)}
+        ponderadas = matriz.astype(float).copy()
+        cofeneticas = np.zeros((n, n))
+
+        while len(grupos) > 1:
+            claves = list(grupos)
+            mejor = None
+            for x in range(len(claves)):
+                for y in range(x + 1, len(claves)):
+                    a, b = claves[x], claves[y]
+                    pares = matriz[np.ix_(grupos[a], grupos[b])]
+                    distancia = {"single": pares.min(), "complete": pares.max(), "average": pares.mean(), "weighted": ponderadas[a, b]}[linkage]
+                    if mejor is None or distancia < mejor[0]:
+                        mejor = (distancia, a, b)
+
+            distancia, a, b = mejor
+            for k in grupos:
+                ponderadas[a, k] = ponderadas[k, a] = (ponderadas[a, k] + ponderadas[b, k]) / 2
+            cofeneticas[np.ix_(grupos[a], grupos[b])] = distancia
+            cofeneticas[np.ix_(grupos[b], grupos[a])] = distancia
+            grupos[a] = grupos[a] + grupos.pop(b)
+
+        return cofeneticas
+
+    def test_igual_a_la_definicion(self):
+        i, j = np.triu_indices(20, 1)
+        for linkage in ENLACES:
+            for _ in range(3):
+                valores = self.generador.random((20, 3))
+                matriz = np.abs(valores[:, None, :] - valores[None, :, :]).sum(axis=2)
+                tabla = aglomerar_lance_williams(matriz, linkage)
+
+                self.assertTrue(np.all(np.diff(tabla.altura) >= 0))
+                self.assertTrue(np.allclose(IndiceConsultas(tabla).cofeneticas(i, j), self._aglomerar_naive(matriz, linkage)[i, j]))
+
+    def test_simple_igual_a_prim(self):
+        valores = self.generador.integers(0, 5, size=(40, 3))
+        matriz = distancias_l1(valores)
+        tabla = aglomerar_lance_williams(matriz, "single")
+        esperada = tabla_desde_arbol_minimo(40, *arbol_expansion_minima(matriz))
+
+        i, j = np.triu_indices(40, 1)
+        self.assertTrue(np.array_equal(IndiceConsultas(tabla).cofeneticas(i, j), IndiceConsultas(esperada).cofeneticas(i, j)))
+
+    def test_enlace_desconocido(self):
+        with self.assertRaises(Exception):
+            aglomerar_lance_williams(np.zeros((3, 3)), "centroid")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import tempfile
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["MPLBACKEND"] = "Agg"
+
+from arbol import Arbol
+from nodo import Nodo
+from enlace import arbol_expansion_minima, tabla_desde_arbol_minimo
+from grafico import coordenadas_nodo, coordenadas_tabla, etiquetas_tabla, umbral_truncado
+
+
+class TestGrafico(unittest.TestCase):
+
+    def setUp(self):
+
+        generador = np.random.default_rng(14)
+        valores = generador.integers(0, 4, size=(60, 3))
+        matriz = np.abs(valores[:, None, :] - valores[None, :, :]).sum(axis=2)
+        self.tabla = tabla_desde_arbol_minimo(60, *arbol_expansion_minima(matriz))
+        self.arbol = Arbol.desde_tabla("Elementos", self.tabla, [f"e{i}" for i in range(60)], label_points=True)
+        self.directorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def _label_name_recursivo(self, nodo: Nodo, indices: list) -> str:
+        if nodo.valor == 0:
+            return str(indices[nodo.elementos[0]])
+        return "[" + ", ".join(self._label_name_recursivo(h, indices) for h in nodo.hijos) + "]"
+
+    def _puntos(self, x, y) -> list:
+        return sorted(zip(np.asarray(x, dtype=float).tolist(), np.asarray(y, dtype=float).tolist()))
+
+    def _segmentos(self, segmentos: np.ndarray) -> list:
+        return sorted(map(tuple, segmentos.reshape(-1, 4).tolist()))
+
+    def test_igual_al_recorrido_de_nodos(self):
+        _, x, y, segmentos, frontera = coordenadas_tabla(self.tabla)
+        _, x_nodo, y_nodo, segmentos_nodo = coordenadas_nodo(self.arbol.nodo)
+
+        self.assertEqual(self._puntos(x, y), self._puntos(x_nodo, y_nodo))
+        self.assertEqual(self._segmentos(segmentos), self._segmentos(segmentos_nodo))
+        self.assertEqual(len(frontera), 0)
+
+    def test_label_name_iterativo(self):
+        for nodo in [self.arbol.nodo] + self.arbol.nodo.hijos:
+            self.assertEqual(nodo.label_name(self.arbol.indices), self._label_name_recursivo(nodo, self.arbol.indices))
+
+    def test_etiquetas_tabla(self):
+        generador = np.random.default_rng(3)
+        valores = generador.integers(0, 3, size=(40, 2))
+        matriz = np.abs(valores[:, None, :] - valores[None, :, :]).sum(axis=2)
+        for tabla in [self.tabla, tabla_desde_arbol_minimo(40, *arbol_expansion_minima(matriz))]:
+            indices = [f"e{i}" for i in range(tabla.n)]
+            mostrados = coordenadas_tabla(tabla)[0]
+            esperadas = [Nodo.de_tabla(tabla, nodo).label_name(indices) for nodo in mostrados.tolist()]
+            self.assertEqual(etiquetas_tabla(tabla, indices, mostrados), esperadas)
+
+    def test_truncar_por_hojas(self):
+        for max_hojas in [1, 2, 5, 20]:
+            mostrados, _, _, segmentos, _ = coordenadas_tabla(self.tabla, umbral_truncado(self.tabla, max_hojas=max_hojas))
+            padres = set(map(tuple, segmentos[:, 0].tolist()))
+            hojas_visibles = len(mostrados) - len(padres)
+            self.assertLessEqual(hojas_visibles, max_hojas)
+            self.assertGreaterEqual(hojas_visibles, 1)
+
+    def test_truncar_por_niveles(self):
+        mostrados, _, y, _, frontera = coordenadas_tabla(self.tabla, umbral_truncado(self.tabla, niveles=1))
+        raiz = Nodo.de_tabla(self.tabla, self.tabla.raiz)
+
+        self.assertEqual(len(mostrados), 1 + len(raiz.hijos))
+        self.assertTrue(np.all(y[1:] < raiz.valor) or np.all(np.sort(y)[:-1] < raiz.valor))
+
+    def test_grafico_en_archivo(self):
+        ruta = os.path.join(self.directorio.name, 'arbol.png')
+        self.arbol.plot(ruta, max_hojas=10)
+        self.assertGreater(os.path.getsize(ruta), 0)
+
+    def test_grafico_interactivo(self):
+        import matplotlib.pyplot as plt
+
+        figura = self.arbol.plot(niveles=3)
+        self.assertEqual(len(figura.axes), 1)
+        plt.close(figura)
+
+    def test_arbol_profundo(self):
+        n = 5000
+        tabla = tabla_desde_arbol_minimo(n, np.arange(n - 1), np.arange(1, n), np.arange(1, n, dtype=float))
+        arbol = Arbol.desde_tabla("Elementos", tabla, list(range(n)))
+        ruta = os.path.join(self.directorio.name, 'profundo.png')
+
+        arbol.plot(ruta)
+        self.assertEqual(len(Nodo.de_tabla(tabla, tabla.raiz).label_name(arbol.indices)), len(arbol.nodo.label_name(arbol.indices)))
+
+    def test_truncado_sin_tabla(self):
+        arbol = Arbol("Elementos", Nodo([0, 1], 1, [Nodo([0], 0), Nodo([1], 0)]), [0, 1])
+        arbol.plot(os.path.join(self.directorio.name, 'nodos.png'))
+        with self.assertRaises(Exception):
+            arbol.plot(os.path.join(self.directorio.name, 'nodos.png'), niveles=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
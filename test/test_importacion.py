@@ -0,0 +1,55 @@
+import unittest
+import subprocess
+import json
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestImportacion(unittest.TestCase):
+
+    def setUp(self):
+        self.pesados = ["matplotlib", "tqdm"]
+
+    def tearDown(self):
+        pass
+
+    def _modulos(self, codigo: str) -> list:
+        codigo = f"import json, sys\n{codigo}\nprint(json.dumps(sorted(sys.modules)))"
+        salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+        return [m.split(".")[0] for m in json.loads(salida.stdout.splitlines()[-1])]
+
+    def test_importar_sin_dependencias_de_graficos(self):
+        modulos = self._modulos("from emparillado import Emparillador\nimport arbol, nodo, grafico, lote")
+        for pesado in self.pesados:
+            self.assertNotIn(pesado, modulos)
+
+    def test_clasificar_sin_progreso_ni_graficos(self):
+        modulos = self._modulos("\n".join([
+            "import numpy as np",
+            "from emparillado import Emparillador",
+            "from relacion import Evaluativa",
+            "from progreso import ObservadorNulo",
+            "arbol = Emparillador(np.arange(40).reshape(10, 4), Evaluativa(max_value=3), observador=ObservadorNulo()).clasificar_elementos()",
+            "arbol.cortar(1.0)",
+        ]))
+        for pesado in self.pesados:
+            self.assertNotIn(pesado, modulos)
+
+    def test_graficar_importa_matplotlib(self):
+        modulos = self._modulos("\n".join([
+            "import os, tempfile",
+            "from arbol import Arbol",
+            "from enlace import TablaEnlace",
+            "with tempfile.TemporaryDirectory() as directorio:",
+            "    Arbol.desde_tabla('Elementos', TablaEnlace(2, [0], [1], [1.0]), [0, 1]).plot(os.path.join(directorio, 'arbol.png'))",
+        ]))
+        self.assertIn("matplotlib", modulos)
+        self.assertNotIn("tqdm", modulos)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import tempfile
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relacion import Dicotomica, Clasificatoria, Evaluativa
+from ingesta import construir_grilla
+from emparillado import Emparillador
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class TestIngesta(unittest.TestCase):
+
+    def setUp(self):
+
+        generador = np.random.default_rng(5)
+        self.datos = pd.DataFrame(generador.integers(0, 6, size=(53, 4)), columns=list('ABCD'))
+        self.datos_dicotomica = pd.DataFrame(np.where(generador.integers(0, 2, size=(53, 3)) == 1, 'si', 'no'), columns=list('ABC'))
+        self.directorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def _bloques(self, datos: pd.DataFrame, tamano: int) -> list:
+        return [datos.iloc[i:i + tamano] for i in range(0, len(datos), tamano)]
+
+    def _comparar(self, datos: pd.DataFrame, relacion, tamano: int = 10):
+        esperado, metadata_esperada = relacion.procesar_relacion(datos)
+        grilla, indice, columnas, metadata = construir_grilla(self._bloques(datos, tamano), relacion)
+
+        self.assertTrue(np.array_equal(grilla, esperado.to_numpy()))
+        self.assertEqual(grilla.dtype, esperado.to_numpy().dtype)
+        self.assertEqual(indice.tolist(), datos.index.tolist())
+        self.assertEqual(columnas.tolist(), datos.columns.tolist())
+        self.assertEqual(metadata, metadata_esperada)
+
+    def test_igual_que_en_memoria(self):
+        self._comparar(self.datos, Evaluativa(max_value=3))
+        self._comparar(self.datos, Clasificatoria(generar_ranking=True))
+        self._comparar(self.datos, Clasificatoria(generar_ranking=True), tamano=1)
+        self._comparar(self.datos_dicotomica, Dicotomica())
+
+    def test_clasificatoria_continua(self):
+        generador = np.random.default_rng(6)
+        datos = pd.DataFrame(generador.normal(size=(200, 3)), columns=list('ABC'))
+        datos.iloc[::7, 0] = 0.5
+        self._comparar(datos, Clasificatoria(generar_ranking=True), tamano=13)
+
+        enteros = pd.DataFrame({'A': [3, 1, 2]})
+        reales = pd.DataFrame({'A': [1.5, 2.0, 0.5]}, index=[3, 4, 5])
+        grilla = construir_grilla([enteros, reales], Clasificatoria(generar_ranking=True))[0]
+        self.assertEqual(grilla[:, 0].tolist(), [6, 2, 4, 3, 5, 1])
+
+    def test_ranking_existente(self):
+        datos = pd.DataFrame({'A': [1, 2, 3, 4], 'B': [4, 3, 2, 1]})
+        self._comparar(datos, Clasificatoria(generar_ranking=False), tamano=3)
+
+        with self.assertRaises(Exception):
+            construir_grilla(self._bloques(self.datos, 10), Clasificatoria(generar_ranking=False))
+
+    def test_relacion_invalida(self):
+        with self.assertRaises(Exception):
+            construir_grilla(self._bloques(self.datos, 10), Dicotomica())
+
+    def test_csv_y_memmap(self):
+        ruta = os.path.join(self.directorio.name, 'datos.csv')
+        self.datos.to_csv(ruta, index=False)
+        ruta_grilla = os.path.join(self.directorio.name, 'grilla.npy')
+
+        emparillador = Emparillador.desde_fuente(ruta, Evaluativa(max_value=3), tamano_chunk=7, ruta_grilla=ruta_grilla)
+        esperado = Emparillador(self.datos, Evaluativa(max_value=3))
+
+        self.assertTrue(np.array_equal(emparillador.datos.to_numpy(), esperado.datos.to_numpy()))
+        self.assertTrue(np.array_equal(np.load(ruta_grilla), esperado.datos.to_numpy()))
+        self.assertEqual(emparillador.clasificar_elementos().nodo.valor, esperado.clasificar_elementos().nodo.valor)
+
+    def test_funcion_de_bloques(self):
+        grilla, _, _, _ = construir_grilla(lambda: iter(self._bloques(self.datos, 20)), Evaluativa(max_value=3))
+        self.assertEqual(grilla.shape, (53, 4))
+
+    def test_iterador_de_un_uso(self):
+        with self.assertRaises(Exception):
+            construir_grilla(iter(self._bloques(self.datos, 20)), Evaluativa(max_value=3))
+
+    @unittest.skipIf(pyarrow is None, "pyarrow no esta instalado")
+    def test_parquet(self):
+        ruta = os.path.join(self.directorio.name, 'datos.parquet')
+        self.datos.to_parquet(ruta)
+
+        emparillador = Emparillador.desde_fuente(ruta, Clasificatoria(), tamano_chunk=8)
+        esperado = Emparillador(self.datos, Clasificatoria())
+        self.assertTrue(np.array_equal(emparillador.datos.to_numpy(), esperado.datos.to_numpy()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+from unittest import mock
+import tempfile
+import json
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arbol import Arbol
+from lote import RESUMEN, TIEMPOS, listar_entradas, main
+
+
+class TestLote(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.entrada = os.path.join(self.directorio.name, 'entrada')
+        self.salida = os.path.join(self.directorio.name, 'salida')
+        os.makedirs(self.entrada)
+
+        generador = np.random.default_rng(3)
+        for i in range(3):
+            datos = pd.DataFrame(generador.integers(0, 10, size=(12 + i, 4)), columns=['a', 'b', 'c', 'd'])
+            datos.to_csv(os.path.join(self.entrada, f'grilla{i}.csv'), index=False)
+        with open(os.path.join(self.entrada, 'notas.txt'), 'w') as archivo:
+            archivo.write('no es un conjunto de datos')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def _resumen(self) -> dict:
+        with open(os.path.join(self.salida, RESUMEN)) as archivo:
+            return json.load(archivo)
+
+    def test_procesa_directorio(self):
+        codigo = main([self.entrada, self.salida, '--procesos', '1', 'evaluativa', '--max-value', '5'])
+        resumen = self._resumen()
+
+        self.assertEqual(codigo, 0)
+        self.assertEqual(sorted(resumen['datasets']), ['grilla0', 'grilla1', 'grilla2'])
+        for i in range(3):
+            destino = os.path.join(self.salida, f'grilla{i}')
+            elementos = Arbol.cargar(os.path.join(destino, 'elementos.npz'))
+            caracteristicas = Arbol.cargar(os.path.join(destino, 'caracteristicas.npz'))
+            self.assertEqual(len(elementos.indices), 12 + i)
+            self.assertEqual(list(caracteristicas.indices), ['a', 'b', 'c', 'd'])
+            with open(os.path.join(destino, TIEMPOS)) as archivo:
+                tiempos = json.load(archivo)
+            self.assertIn('distancias', tiempos['etapas'])
+            self.assertGreater(tiempos['segundos'], 0)
+
+    def test_reanudar_omite_terminados(self):
+        main([self.entrada, self.salida, '--procesos', '1', '--eje', 'elementos', 'evaluativa', '--max-value', '5'])
+        os.remove(os.path.join(self.salida, 'grilla1', TIEMPOS))
+
+        main([self.entrada, self.salida, '--procesos', '1', '--eje', 'elementos', 'evaluativa', '--max-value', '5'])
+        datasets = self._resumen()['datasets']
+
+        self.assertTrue(datasets['grilla0'].get('omitido'))
+        self.assertFalse(datasets['grilla1'].get('omitido', False))
+        self.assertFalse(os.path.exists(os.path.join(self.salida, 'grilla0', 'caracteristicas.npz')))
+
+        main([self.entrada, self.salida, '--procesos', '1', '--rehacer', '--eje', 'elementos', 'evaluativa', '--max-value', '5'])
+        self.assertFalse(any(d.get('omitido', False) for d in self._resumen()['datasets'].values()))
+
+    def test_manifiesto_y_errores(self):
+        manifiesto = os.path.join(self.directorio.name, 'manifiesto.txt')
+        with open(manifiesto, 'w') as archivo:
+            archivo.write('# conjuntos\nentrada/grilla0.csv\n\nentrada/faltante.csv\n')
+
+        self.assertEqual(len(listar_entradas(manifiesto)), 2)
+        codigo = main([manifiesto, self.salida, '--procesos', '1', 'clasificatoria', '--generar-ranking'])
+        datasets = self._resumen()['datasets']
+
+        self.assertEqual(codigo, 1)
+        self.assertIn('error', datasets['faltante'])
+        self.assertNotIn('error', datasets['grilla0'])
+        self.assertFalse(os.path.exists(os.path.join(self.salida, 'faltante', TIEMPOS)))
+
+    def test_pool_de_procesos(self):
+        codigo = main([self.entrada, self.salida, '--procesos', '2', '--memoria-maxima', '4096', '--distancias-en-disco', 'evaluativa', '--max-value', '5'])
+        resumen = self._resumen()
+
+        self.assertEqual(codigo, 0)
+        self.assertEqual(resumen['procesos'], 2)
+        self.assertTrue(all(os.path.exists(os.path.join(self.salida, nombre, TIEMPOS)) for nombre in resumen['datasets']))
+
+    def test_motor_referencia(self):
+        codigo = main([self.entrada, self.salida, '--procesos', '1', '--engine', 'referencia', 'evaluativa', '--max-value', '5'])
+
+        self.assertEqual(codigo, 0)
+        self.assertEqual(len(Arbol.cargar(os.path.join(self.salida, 'grilla0', 'elementos.npz')).indices), 12)
+
+    def test_verificar_rechaza_weighted(self):
+        with mock.patch('sys.stderr'):
+            with self.assertRaises(SystemExit):
+                main([self.entrada, self.salida, '--engine', 'verificar', '--linkage', 'weighted', 'evaluativa', '--max-value', '5'])
+        self.assertFalse(os.path.exists(self.salida))
+
+    def test_procesos_por_defecto_uno_por_cpu(self):
+        with mock.patch("os.cpu_count", return_value=2):
+            codigo = main([self.entrada, self.salida, '--eje', 'elementos', 'evaluativa', '--max-value', '5'])
+
+        self.assertEqual(codigo, 0)
+        self.assertEqual(self._resumen()['procesos'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
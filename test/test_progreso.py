@@ -0,0 +1,96 @@
+import unittest
+import io
+import contextlib
+import tracemalloc
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relacion import Evaluativa
+from emparillado import Emparillador
+from progreso import Observador, ObservadorMetricas, ObservadorNulo, ObservadorTqdm, medir_etapa
+
+
+class ObservadorEventos(Observador):
+
+    def __init__(self):
+        self.eventos = []
+
+    def inicio(self, etapa, total):
+        self.eventos.append(("inicio", etapa, total))
+
+    def fin(self, etapa, procesados, segundos, memoria):
+        self.eventos.append(("fin", etapa, procesados))
+
+
+class TestProgreso(unittest.TestCase):
+
+    def setUp(self):
+
+        generador = np.random.default_rng(9)
+        self.datos = pd.DataFrame(generador.integers(0, 4, size=(25, 3)))
+
+    def tearDown(self):
+        pass
+
+    def test_eventos_por_etapa(self):
+        observador = ObservadorEventos()
+        Emparillador(self.datos, Evaluativa(max_value=3), observador=observador).clasificar_elementos()
+
+        self.assertEqual(observador.eventos, [
+            ("inicio", "procesar_relacion", None), ("fin", "procesar_relacion", 25),
+            ("inicio", "distancias", 25), ("fin", "distancias", 25),
+            ("inicio", "aglomeracion", 24), ("fin", "aglomeracion", 24),
+        ])
+
+    def test_metricas(self):
+        observador = ObservadorMetricas()
+        emparillador = Emparillador(self.datos, Evaluativa(max_value=3), observador=observador)
+        emparillador.clasificar_elementos()
+        emparillador.clasificar_caracteristicas()
+
+        resumen = observador.resumen()
+        self.assertEqual(resumen["distancias"]["llamadas"], 2)
+        self.assertEqual(resumen["distancias"]["procesados"], 28)
+        self.assertTrue(all(etapa["segundos"] >= 0 for etapa in resumen.values()))
+        self.assertTrue(all(registro["memoria_pico"] is None for registro in observador.registros))
+        self.assertTrue(all(registro["memoria_proceso"] is None or registro["memoria_proceso"] > 0 for registro in observador.registros))
+
+    def test_memoria_pico_por_etapa(self):
+        observador = ObservadorMetricas()
+        tracemalloc.start()
+        try:
+            with medir_etapa(observador, "externa"):
+                with medir_etapa(observador, "grande"):
+                    grande = np.ones(1_000_000)
+                    del grande
+                with medir_etapa(observador, "chica"):
+                    chica = np.ones(10)
+                    del chica
+        finally:
+            tracemalloc.stop()
+
+        memoria = {registro["etapa"]: registro["memoria_pico"] for registro in observador.registros}
+        self.assertGreaterEqual(memoria["grande"], 8_000_000)
+        self.assertLess(memoria["chica"], 1_000_000)
+        self.assertGreaterEqual(memoria["externa"], memoria["grande"])
+
+    def test_observador_nulo_sin_salida(self):
+        salida = io.StringIO()
+        with contextlib.redirect_stderr(salida):
+            Emparillador(self.datos, Evaluativa(max_value=3), observador=ObservadorNulo()).clasificar_elementos()
+        self.assertEqual(salida.getvalue(), "")
+
+    def test_tqdm_por_defecto(self):
+        salida = io.StringIO()
+        emparillador = Emparillador(self.datos, Evaluativa(max_value=3), observador=ObservadorTqdm(file=salida))
+        emparillador.clasificar_elementos()
+        self.assertIn("Reduciendo arbol", salida.getvalue())
+        self.assertIsInstance(Emparillador(self.datos, Evaluativa(max_value=3)).observador, ObservadorTqdm)
+
+
+if __name__ == '__main__':
+    unittest.main()
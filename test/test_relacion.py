@@ -62,6 +62,18 @@ class TestDicotomica(unittest.TestCase):
             (datos['A'].tolist() == [1, 0, 1, 0] and dict_valores == {'yes': 1, 'no': 0}) or 
             (datos['A'].tolist() == [0, 1, 0, 1] and dict_valores == {'yes': 0, 'no': 1})
         )
+    
+    def test_procesar_relacion_compacta(self):
+        datos, _ = self.dicotomica.procesar_relacion(self.datos_dicotomica_texto)
+        self.assertEqual(datos.to_numpy().dtype, np.uint8)
+        self.assertEqual(datos.columns.tolist(), ['A', 'B', 'C'])
+    
+    def test_procesar_relacion_tipos_mezclados(self):
+        datos = pd.DataFrame({'A': [1, 'x', 1], 'B': ['x', 'x', 1]})
+        self.assertTrue(self.dicotomica.es_relacion_valida(datos))
+        procesados, dict_valores = self.dicotomica.procesar_relacion(datos)
+        self.assertEqual(sorted(dict_valores.values()), [0, 1])
+        self.assertEqual(procesados['A'].tolist(), [dict_valores[1], dict_valores['x'], dict_valores[1]])
         
         
 class TestClasificatoria(unittest.TestCase):
@@ -104,6 +116,15 @@ class TestClasificatoria(unittest.TestCase):
     def test_es_relacion_invalida(self):
         for datos in self.datos_clasificatoria_ranking_invalida:
             self.assertFalse(self.clasificatoria_without_ranking.es_relacion_valida(datos))
+    
+    def test_ranking_igual_a_pandas(self):
+        generador = np.random.default_rng(3)
+        datos = pd.DataFrame(generador.integers(0, 5, size=(50, 4)), columns=list('ABCD'))
+        esperado = datos.rank(axis=0, method='first', numeric_only=True, ascending=True).astype(int)
+        
+        procesados, _ = self.clasificatoria_with_ranking.procesar_relacion(datos)
+        self.assertTrue((procesados == esperado).all().all())
+        self.assertEqual(procesados.to_numpy().dtype, np.uint8)
             
 class TestEvaluativa(unittest.TestCase):
     
@@ -140,6 +161,21 @@ class TestEvaluativa(unittest.TestCase):
         datos, dict_valores = self.evaluativa.procesar_relacion(self.datos_evaluativa_numerico)
         self.assertEqual(datos['A'].tolist(), [1, 1, 2, 3])
         self.assertEqual(dict_valores, {"interval_max": 5, "min_val": 1, "max_val": 6})
+    
+    def test_procesar_relacion_igual_a_map(self):
+        generador = np.random.default_rng(4)
+        datos = pd.DataFrame(generador.normal(size=(40, 3)))
+        min_val = datos.min().min()
+        max_val = datos.max().max()
+        esperado = datos.map(lambda x: np.floor(1 + (x - min_val) * (5 - 1) / (max_val - min_val)).astype(int))
+        
+        procesados, _ = self.evaluativa.procesar_relacion(datos)
+        self.assertTrue((procesados == esperado).all().all())
+        self.assertEqual(procesados.to_numpy().dtype, np.uint8)
+    
+    def test_procesar_relacion_constante(self):
+        datos, _ = self.evaluativa.procesar_relacion(pd.DataFrame({'A': [2, 2], 'B': [2, 2]}))
+        self.assertEqual(datos.to_numpy().tolist(), [[1, 1], [1, 1]])
         
         
 if __name__ == '__main__':
@@ -0,0 +1,126 @@
+import unittest
+import tempfile
+import asyncio
+import threading
+import time
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servicio import Cliente, Servicio
+
+
+class TestServicio(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.servicio = Servicio(hilos=2)
+        self.datos = np.random.default_rng(25).integers(0, 5, size=(30, 4)).tolist()
+        self.filas = [f"f{i}" for i in range(30)]
+        await self.servicio.atender({"operacion": "registrar", "nombre": "grilla", "datos": self.datos, "filas": self.filas, "relacion": {"tipo": "evaluativa", "max_value": 4}})
+
+    async def asyncTearDown(self):
+        await self.servicio.cerrar()
+
+    def _contar_construcciones(self, demora: float = 0.0) -> list:
+        llamadas = []
+        original = self.servicio._construir_arbol
+
+        def contar(*argumentos):
+            llamadas.append(argumentos[1:])
+            time.sleep(demora)
+            return original(*argumentos)
+
+        self.servicio._construir_arbol = contar
+        return llamadas
+
+    async def test_consultas_desde_memoria(self):
+        resumen = await self.servicio.atender({"operacion": "clasificar", "nombre": "grilla"})
+        arbol = self.servicio.arboles[("grilla", "elementos", "single")]
+
+        self.assertEqual(resumen["hojas"], 30)
+        subarbol = await self.servicio.atender({"operacion": "subarbol", "nombre": "grilla", "camino": [0], "etiqueta": True})
+        nodo = arbol.nodo.hijos[0]
+        self.assertEqual(subarbol["etiqueta"], nodo.label_name(arbol.indices))
+        self.assertEqual(subarbol["elementos"], [self.filas[i] for i in nodo.elementos])
+        self.assertEqual(len(subarbol["hijos"]), len(nodo.hijos))
+
+        cortes = await self.servicio.atender({"operacion": "cortar", "nombre": "grilla", "altura": 1})
+        self.assertEqual(cortes["grupos"], arbol.cortar(1).tolist())
+        etiqueta = await self.servicio.atender({"operacion": "etiqueta", "nombre": "grilla"})
+        self.assertEqual(etiqueta["etiqueta"], arbol.nodo.label_name(arbol.indices))
+
+        caracteristicas = await self.servicio.atender({"operacion": "clasificar", "nombre": "grilla", "eje": "caracteristicas", "linkage": "complete"})
+        self.assertEqual(caracteristicas["hojas"], 4)
+
+    async def test_solicitudes_iguales_se_combinan(self):
+        llamadas = self._contar_construcciones(0.2)
+        solicitud = {"operacion": "clasificar", "nombre": "grilla", "linkage": "average"}
+
+        tareas = [asyncio.ensure_future(self.servicio.atender(dict(solicitud))) for _ in range(5)]
+        inicio = time.perf_counter()
+        listado = await self.servicio.atender({"operacion": "listar"})
+        self.assertLess(time.perf_counter() - inicio, 0.15)
+        self.assertEqual(listado, {"grilla": [30, 4]})
+
+        resultados = await asyncio.gather(*tareas)
+        self.assertEqual(len(llamadas), 1)
+        self.assertTrue(all(resultado == resultados[0] for resultado in resultados))
+
+        await self.servicio.atender(dict(solicitud))
+        await self.servicio.atender({"operacion": "subarbol", "nombre": "grilla", "linkage": "average"})
+        self.assertEqual(len(llamadas), 1)
+
+    async def test_registrar_de_nuevo_descarta_arboles(self):
+        llamadas = self._contar_construcciones()
+        await self.servicio.atender({"operacion": "clasificar", "nombre": "grilla"})
+        await self.servicio.atender({"operacion": "registrar", "nombre": "grilla", "datos": self.datos[:10], "relacion": {"tipo": "evaluativa", "max_value": 4}})
+        resumen = await self.servicio.atender({"operacion": "clasificar", "nombre": "grilla"})
+
+        self.assertEqual(len(llamadas), 2)
+        self.assertEqual(resumen["hojas"], 10)
+
+        await self.servicio.atender({"operacion": "eliminar", "nombre": "grilla"})
+        with self.assertRaises(Exception):
+            await self.servicio.atender({"operacion": "clasificar", "nombre": "grilla"})
+
+    async def test_registrar_durante_una_construccion(self):
+        llamadas = self._contar_construcciones(0.3)
+        viejo = asyncio.ensure_future(self.servicio.atender({"operacion": "clasificar", "nombre": "grilla"}))
+        await asyncio.sleep(0.05)
+        await self.servicio.atender({"operacion": "registrar", "nombre": "grilla", "datos": self.datos[:10], "relacion": {"tipo": "evaluativa", "max_value": 4}})
+        nuevo = await self.servicio.atender({"operacion": "clasificar", "nombre": "grilla"})
+
+        self.assertEqual((await viejo)["hojas"], 30)
+        self.assertEqual(nuevo["hojas"], 10)
+        self.assertEqual(len(llamadas), 2)
+        self.assertEqual(len(self.servicio.arboles[("grilla", "elementos", "single")].indices), 10)
+
+    async def test_socket_unix(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "servicio.sock")
+            await self.servicio.iniciar(ruta)
+
+            def consultar() -> tuple:
+                cliente = Cliente(ruta)
+                try:
+                    cortes = cliente.enviar("cortar", nombre="grilla", altura=2)
+                    try:
+                        cliente.enviar("cortar", nombre="otra", altura=2)
+                        error = None
+                    except Exception as excepcion:
+                        error = str(excepcion)
+                    return cortes, error, threading.get_ident()
+                finally:
+                    cliente.cerrar()
+
+            cortes, error, hilo = await asyncio.to_thread(consultar)
+
+        self.assertNotEqual(hilo, threading.get_ident())
+        self.assertEqual(len(cortes["grupos"]), 30)
+        self.assertIn("otra", error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relacion import Evaluativa
+from emparillado import Emparillador
+from distancias import matriz_l1
+from enlace import arbol_expansion_minima, tabla_desde_arbol_minimo
+from vecinos import grafo_vecinos, tabla_aproximada, calidad_aproximada
+
+
+class TestVecinos(unittest.TestCase):
+
+    def setUp(self):
+
+        generador = np.random.default_rng(11)
+        centros = generador.integers(0, 6, size=(8, 12))
+        self.valores = np.clip(centros[generador.integers(0, 8, 400)] + generador.integers(-1, 2, size=(400, 12)), 0, 5).astype(np.uint8)
+
+    def tearDown(self):
+        pass
+
+    def _tabla_exacta(self, valores: np.ndarray):
+        return tabla_desde_arbol_minimo(valores.shape[0], *arbol_expansion_minima(matriz_l1(valores)))
+
+    def test_distancias_del_grafo(self):
+        origen, destino, peso = grafo_vecinos(self.valores, vecinos=5)
+        matriz = matriz_l1(self.valores)
+
+        self.assertTrue(np.array_equal(peso, matriz[origen, destino]))
+        self.assertTrue(np.all(origen < destino))
+        self.assertEqual(len(set(zip(origen.tolist(), destino.tolist()))), len(origen))
+
+    def test_cota_superior_de_alturas(self):
+        exacta = self._tabla_exacta(self.valores)
+        aproximada = tabla_aproximada(self.valores, vecinos=5)
+
+        self.assertEqual(len(aproximada.altura), len(self.valores) - 1)
+        self.assertTrue(np.all(aproximada.altura >= exacta.altura))
+
+        calidad = calidad_aproximada(self.valores, aproximada, muestra=100)
+        self.assertEqual(calidad["muestra"], 100)
+        self.assertGreater(calidad["exactas"], 0.8)
+        self.assertGreaterEqual(calidad["exceso_medio"], 0)
+
+    def test_grafo_completo_es_exacto(self):
+        valores = self.valores[:30]
+        aproximada = tabla_aproximada(valores, vecinos=29)
+        self.assertTrue(np.array_equal(aproximada.altura, self._tabla_exacta(valores).altura))
+
+    def test_componentes_desconectadas(self):
+        valores = np.concatenate([np.zeros((10, 3)), np.full((10, 3), 50)]).astype(np.int64)
+        tabla = tabla_aproximada(valores, vecinos=1, proyecciones=1)
+
+        self.assertEqual(tabla.tamano[-1], 20)
+        self.assertEqual(tabla.altura[-1], 150)
+
+    def test_emparillador_aproximado(self):
+        datos = pd.DataFrame(self.valores)
+        emparillador = Emparillador(datos, Evaluativa(max_value=5))
+
+        aproximado = emparillador.clasificar_elementos(aproximado=True, vecinos=8)
+        exacto = emparillador.clasificar_elementos()
+
+        self.assertEqual(sorted(aproximado.nodo.elementos), list(range(400)))
+        self.assertIsNone(exacto.calidad)
+        self.assertEqual(set(aproximado.calidad), {"muestra", "exactas", "exceso_medio", "exceso_maximo"})
+        self.assertIs(emparillador.clasificar_elementos(aproximado=True, vecinos=8).tabla, aproximado.tabla)
+
+
+if __name__ == '__main__':
+    unittest.main()
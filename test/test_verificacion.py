@@ -0,0 +1,172 @@
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emparillado import Emparillador
+from enlace import TablaEnlace
+from nodo import Nodo
+from progreso import ObservadorNulo
+from relacion import Dicotomica, Clasificatoria, Evaluativa
+from verificacion import diferencias_arboles, diferencias_mezclas, forma_arbol, matriz_referencia
+
+
+class TestVerificacion(unittest.TestCase):
+
+    def setUp(self):
+        self.generador = np.random.default_rng(24)
+
+    def tearDown(self):
+        pass
+
+    def _grilla_aleatoria(self, relacion: str) -> pd.DataFrame:
+        filas = int(self.generador.integers(2, 26))
+        columnas = int(self.generador.integers(1, 7))
+        if relacion == "dicotomica":
+            return pd.DataFrame(np.where(self.generador.integers(0, 2, size=(filas, columnas)) == 1, "si", "no"))
+        if relacion == "clasificatoria":
+            return pd.DataFrame(self.generador.integers(0, int(self.generador.integers(2, 30)), size=(filas, columnas)))
+        return pd.DataFrame(self.generador.normal(size=(filas, columnas)) * float(self.generador.integers(1, 10)))
+
+    def _relaciones(self) -> list:
+        return [
+            ("dicotomica", lambda: Dicotomica()),
+            ("clasificatoria", lambda: Clasificatoria(generar_ranking=True)),
+            ("evaluativa", lambda: Evaluativa(max_value=int(self.generador.integers(2, 8)))),
+        ]
+
+    def test_corpus_enlace_simple(self):
+        for nombre, relacion in self._relaciones():
+            for _ in range(15):
+                datos = self._grilla_aleatoria(nombre)
+                tipo_relacion = relacion()
+                emparillador = Emparillador(datos, tipo_relacion, observador=ObservadorNulo(), engine="verificar")
+                emparillador.clasificar_elementos()
+                emparillador.clasificar_caracteristicas()
+
+                self.assertTrue(np.array_equal(emparillador._matriz_diferencias_elementos(), matriz_referencia(emparillador.grilla)))
+                suma_inversion = int(emparillador.grilla.max()) + int(emparillador.grilla.min())
+                self.assertTrue(np.array_equal(emparillador._matriz_diferencias_caracteristicas(), matriz_referencia(emparillador.grilla.T, suma_inversion)))
+
+    def test_corpus_sin_empates(self):
+        for linkage in ["single", "complete", "average"]:
+            for _ in range(10):
+                n = int(self.generador.integers(2, 20))
+                datos = pd.DataFrame({"a": self.generador.permutation(2 ** np.arange(n)), "b": 1})
+                relacion = Evaluativa(max_value=2 ** (n - 1))
+                rapido = Emparillador(datos, relacion, observador=ObservadorNulo()).clasificar_elementos(linkage=linkage)
+                esperado = Emparillador(datos, relacion, observador=ObservadorNulo(), engine="referencia").clasificar_elementos(linkage=linkage)
+
+                self.assertEqual(diferencias_arboles(esperado.nodo, rapido.nodo), [], f"{linkage} {n}")
+
+    def test_corpus_otros_enlaces(self):
+        for linkage in ["complete", "average"]:
+            for _ in range(10):
+                datos = pd.DataFrame(self.generador.random(size=(int(self.generador.integers(2, 20)), 3)))
+                emparillador = Emparillador(datos, Evaluativa(max_value=100000), observador=ObservadorNulo(), engine="verificar")
+                emparillador.clasificar_elementos(linkage=linkage)
+                emparillador.clasificar_caracteristicas(linkage=linkage)
+
+    def test_corpus_otros_enlaces_con_empates(self):
+        for linkage in ["complete", "average"]:
+            for _ in range(40):
+                datos = pd.DataFrame(self.generador.integers(0, 5, size=(int(self.generador.integers(4, 26)), 4)))
+                emparillador = Emparillador(datos, Evaluativa(max_value=4), observador=ObservadorNulo(), engine="verificar")
+                arbol = emparillador.clasificar_elementos(linkage=linkage)
+                emparillador.clasificar_caracteristicas(linkage=linkage)
+
+                self.assertEqual(diferencias_mezclas(matriz_referencia(emparillador.grilla), arbol.tabla, linkage), [])
+
+    def test_mezclas_con_empates(self):
+        matriz = np.array([[0, 1, 2], [1, 0, 1], [2, 1, 0]], dtype=float)
+        invalido = TablaEnlace(3, [0, 1], [2, 3], [2, 1], [2, 3])
+
+        for linkage, altura in [("complete", 2), ("average", 1.5)]:
+            primero = TablaEnlace(3, [0, 2], [1, 3], [1, altura], [2, 3])
+            segundo = TablaEnlace(3, [1, 0], [2, 3], [1, altura], [2, 3])
+            self.assertEqual(diferencias_mezclas(matriz, primero, linkage), [])
+            self.assertEqual(diferencias_mezclas(matriz, segundo, linkage), [])
+            self.assertEqual(len(diferencias_mezclas(matriz, invalido, linkage)), 1)
+        with self.assertRaises(Exception):
+            diferencias_mezclas(matriz, invalido, "weighted")
+
+    def test_verificar_por_muestra(self):
+        datos = pd.DataFrame(self.generador.integers(0, 5, size=(120, 4)))
+        emparillador = Emparillador(datos, Evaluativa(max_value=4), observador=ObservadorNulo(), engine="verificar", muestra_verificacion=30)
+        elementos, caracteristicas = emparillador.clasificar_todo()
+
+        self.assertEqual(sorted(elementos.nodo.elementos), list(range(120)))
+        self.assertIsNotNone(elementos.tabla)
+        self.assertEqual(len(caracteristicas.nodo.elementos), 4)
+
+    def test_detecta_diferencias(self):
+        datos = pd.DataFrame(self.generador.integers(0, 5, size=(12, 3)))
+        emparillador = Emparillador(datos, Evaluativa(max_value=4), observador=ObservadorNulo(), engine="verificar")
+        original = Emparillador._generar_tabla
+
+        def alterada(self, matriz, linkage="single"):
+            tabla = original(self, matriz, linkage)
+            return TablaEnlace(tabla.n, tabla.izquierdo, tabla.derecho, tabla.altura + 1, tabla.tamano)
+
+        with mock.patch.object(Emparillador, "_generar_tabla", alterada):
+            with self.assertRaises(Exception):
+                emparillador.clasificar_elementos()
+
+    def test_detecta_colapso_distinto(self):
+        datos = pd.DataFrame(self.generador.integers(0, 3, size=(12, 2)))
+        emparillador = Emparillador(datos, Evaluativa(max_value=2), observador=ObservadorNulo(), engine="verificar")
+
+        def binarios(self, nodo):
+            return [] if nodo < self.n else [int(self.izquierdo[nodo - self.n]), int(self.derecho[nodo - self.n])]
+
+        with mock.patch.object(TablaEnlace, "hijos", binarios):
+            with self.assertRaises(Exception):
+                emparillador.clasificar_elementos(linkage="complete")
+
+    def test_weighted_sin_referencia(self):
+        datos = pd.DataFrame(self.generador.integers(0, 5, size=(12, 3)))
+        for engine in ["referencia", "verificar"]:
+            emparillador = Emparillador(datos, Evaluativa(max_value=4), observador=ObservadorNulo(), engine=engine)
+            with mock.patch.object(Emparillador, "_distancias") as distancias:
+                with self.assertRaisesRegex(Exception, "weighted"):
+                    emparillador.clasificar_elementos(linkage="weighted")
+            distancias.assert_not_called()
+        self.assertIsNotNone(Emparillador(datos, Evaluativa(max_value=4), observador=ObservadorNulo()).clasificar_elementos(linkage="weighted").tabla)
+
+    def test_diferencias_de_forma(self):
+        a = Nodo([0, 1, 2], 2, [Nodo([0, 1], 1, [Nodo([0], 0), Nodo([1], 0)]), Nodo([2], 0)])
+        b = Nodo([0, 1, 2], 2, [Nodo([0], 0), Nodo([1, 2], 1, [Nodo([1], 0), Nodo([2], 0)])])
+        c = Nodo([0, 1, 2], 2, [Nodo([0], 0), Nodo([1], 0), Nodo([2], 0)])
+
+        self.assertEqual(diferencias_arboles(a, a), [])
+        self.assertEqual(len(diferencias_arboles(a, b)), 2)
+        self.assertEqual(len(diferencias_arboles(a, c)), 2)
+        self.assertEqual(forma_arbol(c), {frozenset([0, 1, 2]): (2.0, 3)})
+
+    def _reducir(self, datos: pd.DataFrame) -> Nodo:
+        emparillador = Emparillador(datos, Evaluativa(max_value=4), observador=ObservadorNulo())
+        matriz = matriz_referencia(emparillador.grilla)
+        arbol = [Nodo([i], 0, []) for i in range(matriz.shape[0])]
+        while len(arbol) > 1:
+            arbol = emparillador._reducir_arbol(arbol, matriz)
+        return arbol[0]
+
+    def test_motor_referencia(self):
+        datos = pd.DataFrame(self.generador.integers(0, 5, size=(10, 3)))
+        arbol = Emparillador(datos, Evaluativa(max_value=4), observador=ObservadorNulo(), engine="referencia").clasificar_elementos()
+
+        self.assertIsNotNone(arbol.tabla)
+        self.assertEqual(diferencias_arboles(self._reducir(datos), arbol.nodo), [])
+        self.assertEqual(sorted(arbol.nodo.elementos), list(range(10)))
+        with self.assertRaises(Exception):
+            Emparillador(datos, Evaluativa(max_value=4), engine="turbo")
+        with self.assertRaises(Exception):
+            Emparillador(datos, Evaluativa(max_value=4), observador=ObservadorNulo(), engine="referencia").clasificar_elementos(linkage="weighted")
+
+
+if __name__ == '__main__':
+    unittest.main()
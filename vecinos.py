@@ -0,0 +1,152 @@
+from typing import Callable, Optional
+import numpy as np
+
+from distancias import ELEMENTOS_POR_BLOQUE, distancias_l1, tipo_acumulador
+from enlace import TablaEnlace, _buscar, arbol_expansion_minima, kruskal, tabla_desde_arbol_minimo
+
+
+VECINOS = 10
+PROYECCIONES = 8
+REFINAMIENTOS = 1
+MUESTRA = 200
+
+
+def tipo_diferencias(tipo: np.dtype) -> np.dtype:
+    if np.issubdtype(tipo, np.integer) and tipo.itemsize < 4:
+        return np.dtype(np.int32) if tipo.itemsize == 2 else np.dtype(np.int16)
+    return tipo_acumulador(tipo)
+
+
+def _distancias_candidatos(valores: np.ndarray, candidatos: np.ndarray) -> np.ndarray:
+    n, m = valores.shape
+    tipo = tipo_diferencias(valores.dtype)
+    acumulador = tipo_acumulador(valores.dtype)
+    pesos = np.full(candidatos.shape, np.inf)
+    paso = max(1, ELEMENTOS_POR_BLOQUE // max(candidatos.shape[1] * m, 1))
+
+    for inicio in range(0, n, paso):
+        fin = min(inicio + paso, n)
+        bloque = candidatos[inicio:fin]
+        validos = bloque >= 0
+        filas = valores[inicio:fin].astype(tipo)[:, None, :]
+        diferencias = np.abs(valores[np.where(validos, bloque, 0)].astype(tipo) - filas).sum(axis=2, dtype=acumulador)
+        pesos[inicio:fin][validos] = diferencias[validos]
+
+    return pesos
+
+
+def _mejores(indices: np.ndarray, pesos: np.ndarray, vecinos: int) -> tuple[np.ndarray, np.ndarray]:
+    orden = np.argsort(indices, axis=1, kind="stable")
+    indices = np.take_along_axis(indices, orden, axis=1)
+    pesos = np.take_along_axis(pesos, orden, axis=1)
+    pesos[:, 1:][indices[:, 1:] == indices[:, :-1]] = np.inf
+
+    orden = np.argsort(pesos, axis=1, kind="stable")[:, :vecinos]
+    return np.take_along_axis(indices, orden, axis=1), np.take_along_axis(pesos, orden, axis=1)
+
+
+def grafo_vecinos(valores: np.ndarray, vecinos: int = VECINOS, proyecciones: int = PROYECCIONES, ventana: Optional[int] = None, refinamientos: int = REFINAMIENTOS, semilla: int = 0, avance: Optional[Callable[[int], None]] = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    if vecinos < 1 or proyecciones < 1:
+        raise Exception("La cantidad de vecinos y de proyecciones debe ser al menos 1")
+
+    n, m = valores.shape
+    ventana = vecinos if ventana is None else ventana
+    generador = np.random.default_rng(semilla)
+    desplazamientos = np.concatenate([-np.arange(1, ventana + 1), np.arange(1, ventana + 1)])
+
+    indices = np.full((n, vecinos), -1, dtype=np.int64)
+    pesos = np.full((n, vecinos), np.inf)
+    posicion = np.empty(n, dtype=np.int64)
+
+    for _ in range(proyecciones):
+        orden = np.lexsort(valores[:, generador.permutation(m)].T)
+        posicion[orden] = np.arange(n)
+
+        vecindario = posicion[:, None] + desplazamientos
+        validos = (vecindario >= 0) & (vecindario < n)
+        candidatos = np.where(validos, orden[np.clip(vecindario, 0, n - 1)], -1)
+
+        indices, pesos = _mejores(np.concatenate([indices, candidatos], axis=1), np.concatenate([pesos, _distancias_candidatos(valores, candidatos)], axis=1), vecinos)
+        if avance is not None:
+            avance(1)
+
+    for _ in range(refinamientos):
+        candidatos = indices[np.maximum(indices, 0)].reshape(n, -1)
+        candidatos[np.repeat(indices < 0, vecinos, axis=1) | (candidatos == np.arange(n)[:, None])] = -1
+        indices, pesos = _mejores(np.concatenate([indices, candidatos], axis=1), np.concatenate([pesos, _distancias_candidatos(valores, candidatos)], axis=1), vecinos)
+        if avance is not None:
+            avance(1)
+
+    origen = np.repeat(np.arange(n, dtype=np.int64), vecinos)
+    destino = indices.ravel()
+    peso = pesos.ravel()
+    validas = np.isfinite(peso)
+    origen, destino, peso = origen[validas], destino[validas], peso[validas]
+
+    a = np.minimum(origen, destino)
+    b = np.maximum(origen, destino)
+    _, unicas = np.unique(a * n + b, return_index=True)
+    return a[unicas], b[unicas], peso[unicas]
+
+
+def componentes(n: int, origen: np.ndarray, destino: np.ndarray) -> np.ndarray:
+    raiz = list(range(n))
+    for a, b in zip(origen.tolist(), destino.tolist()):
+        a = _buscar(raiz, a)
+        b = _buscar(raiz, b)
+        if a != b:
+            raiz[b] = a
+    return np.array([_buscar(raiz, i) for i in range(n)], dtype=np.int64)
+
+
+def arbol_minimo_aproximado(valores: np.ndarray, vecinos: int = VECINOS, proyecciones: int = PROYECCIONES, semilla: int = 0, avance: Optional[Callable[[int], None]] = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    n = valores.shape[0]
+    if n < 2:
+        vacio = np.empty(0, dtype=np.int64)
+        return vacio, vacio, np.empty(0)
+
+    origen, destino, peso = kruskal(n, *grafo_vecinos(valores, vecinos, proyecciones, semilla=semilla, avance=avance))
+
+    if len(peso) < n - 1:
+        representantes = np.unique(componentes(n, origen, destino))
+        puentes = arbol_expansion_minima(distancias_l1(valores[representantes]))
+        origen = np.concatenate([origen, representantes[puentes[0]]])
+        destino = np.concatenate([destino, representantes[puentes[1]]])
+        peso = np.concatenate([peso, puentes[2]])
+
+    return origen, destino, peso
+
+
+def tabla_aproximada(valores: np.ndarray, vecinos: int = VECINOS, proyecciones: int = PROYECCIONES, semilla: int = 0, avance: Optional[Callable[[int], None]] = None) -> TablaEnlace:
+    return tabla_desde_arbol_minimo(valores.shape[0], *arbol_minimo_aproximado(valores, vecinos, proyecciones, semilla, avance))
+
+
+def calidad_aproximada(valores: np.ndarray, tabla: TablaEnlace, muestra: int = MUESTRA, semilla: int = 0) -> dict:
+
+    n = valores.shape[0]
+    if n < 2:
+        return {"muestra": 0, "exactas": 1.0, "exceso_medio": 0.0, "exceso_maximo": 0.0}
+
+    altura_hoja = np.empty(n)
+    hojas_izquierdas = tabla.izquierdo < n
+    hojas_derechas = tabla.derecho < n
+    altura_hoja[tabla.izquierdo[hojas_izquierdas]] = tabla.altura[hojas_izquierdas]
+    altura_hoja[tabla.derecho[hojas_derechas]] = tabla.altura[hojas_derechas]
+
+    elegidos = np.random.default_rng(semilla).choice(n, size=min(muestra, n), replace=False)
+    grilla = valores.astype(tipo_acumulador(valores.dtype), copy=False)
+    cercano = np.empty(len(elegidos))
+    for k, i in enumerate(elegidos.tolist()):
+        fila = np.abs(grilla - grilla[i]).sum(axis=1, dtype=np.float64)
+        fila[i] = np.inf
+        cercano[k] = fila.min()
+
+    exceso = altura_hoja[elegidos] - cercano
+    return {
+        "muestra": int(len(elegidos)),
+        "exactas": float(np.mean(exceso <= 0)),
+        "exceso_medio": float(exceso.mean()),
+        "exceso_maximo": float(exceso.max()),
+    }
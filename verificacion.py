@@ -0,0 +1,162 @@
+from typing import Optional
+import numpy as np
+
+from nodo import Nodo
+from enlace import TablaEnlace
+
+
+MOTORES = ("rapido", "referencia", "verificar")
+ENLACES_REFERENCIA = ("single", "complete", "average")
+MUESTRA_VERIFICACION = 40
+TOLERANCIA = 1e-9
+MAXIMO_DIFERENCIAS = 5
+
+
+def validar_motor(engine: str) -> str:
+    if engine not in MOTORES:
+        raise Exception(f"Motor desconocido: {engine}. Opciones: {', '.join(MOTORES)}")
+    return engine
+
+
+def validar_enlace_motor(engine: str, linkage: str) -> None:
+    if engine != "rapido" and linkage not in ENLACES_REFERENCIA:
+        raise Exception(f"El motor {engine} no implementa el enlace {linkage}. Opciones: {', '.join(ENLACES_REFERENCIA)}")
+
+
+def matriz_referencia(valores: np.ndarray, suma_inversion: Optional[float] = None) -> np.ndarray:
+    valores = valores.astype(np.float64)
+    n = valores.shape[0]
+    matriz = np.zeros((n, n))
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            matriz[i][j] = np.sum(np.abs(valores[i] - valores[j]))
+            if suma_inversion is not None:
+                matriz[i][j] = min(matriz[i][j], np.sum(np.abs(suma_inversion - valores[i] - valores[j])))
+            matriz[j][i] = matriz[i][j]
+
+    return matriz
+
+
+def muestra_indices(n: int, muestra: int, semilla: int = 0) -> np.ndarray:
+    if n <= muestra:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(semilla).choice(n, size=muestra, replace=False))
+
+
+def forma_arbol(raiz: Nodo) -> dict:
+    forma = {}
+    pendientes = [raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        if len(nodo.hijos) > 0:
+            forma[frozenset(nodo.elementos)] = (float(nodo.valor), len(nodo.hijos))
+            pendientes.extend(nodo.hijos)
+    return forma
+
+
+def tabla_desde_nodo(raiz: Nodo, n: int) -> TablaEnlace:
+    izquierdo = []
+    derecho = []
+    altura = []
+    tamano = []
+    ids = {}
+    pendientes = [(raiz, False)]
+
+    while pendientes:
+        nodo, listo = pendientes.pop()
+        if len(nodo.hijos) == 0:
+            ids[id(nodo)] = nodo.elementos[0]
+        elif not listo:
+            pendientes.append((nodo, True))
+            pendientes.extend((hijo, False) for hijo in reversed(nodo.hijos))
+        else:
+            actual = ids[id(nodo.hijos[0])]
+            acumulado = len(nodo.hijos[0].elementos)
+            for hijo in nodo.hijos[1:]:
+                acumulado += len(hijo.elementos)
+                izquierdo.append(actual)
+                derecho.append(ids[id(hijo)])
+                altura.append(float(nodo.valor))
+                tamano.append(acumulado)
+                actual = n + len(izquierdo) - 1
+            ids[id(nodo)] = actual
+
+    return TablaEnlace(n, izquierdo, derecho, altura, tamano)
+
+
+def diferencias_arboles(esperado: Nodo, obtenido: Nodo, tolerancia: float = TOLERANCIA) -> list[str]:
+    referencia = forma_arbol(esperado)
+    rapido = forma_arbol(obtenido)
+    diferencias = []
+
+    for grupo in sorted(referencia.keys() - rapido.keys(), key=len):
+        diferencias.append(f"El grupo {sorted(grupo)} de la referencia no aparece en el motor rapido")
+    for grupo in sorted(rapido.keys() - referencia.keys(), key=len):
+        diferencias.append(f"El grupo {sorted(grupo)} del motor rapido no aparece en la referencia")
+    for grupo in sorted(referencia.keys() & rapido.keys(), key=len):
+        (altura_referencia, hijos_referencia), (altura_rapido, hijos_rapido) = referencia[grupo], rapido[grupo]
+        if not np.isclose(altura_referencia, altura_rapido, rtol=tolerancia, atol=tolerancia):
+            diferencias.append(f"El grupo {sorted(grupo)} tiene altura {altura_rapido} en vez de {altura_referencia}")
+        elif hijos_referencia != hijos_rapido:
+            diferencias.append(f"El grupo {sorted(grupo)} tiene {hijos_rapido} hijos en vez de {hijos_referencia}")
+
+    return diferencias
+
+
+def enlace_referencia(matriz: np.ndarray, grupo_a: list[int], grupo_b: list[int], linkage: str = "single") -> float:
+    if linkage not in ENLACES_REFERENCIA:
+        raise Exception(f"El motor de referencia no implementa el enlace {linkage}")
+    distancias = matriz[np.ix_(grupo_a, grupo_b)]
+    if linkage == "complete":
+        return float(distancias.max())
+    if linkage == "average":
+        return float(distancias.mean())
+    return float(distancias.min())
+
+
+def arbol_desde_mezclas(tabla: TablaEnlace) -> Nodo:
+    n = tabla.n
+    nodos = [Nodo([i], 0, []) for i in range(n)]
+
+    for fila in range(n - 1):
+        altura = float(tabla.altura[fila])
+        hijos = []
+        for nodo in (nodos[int(tabla.izquierdo[fila])], nodos[int(tabla.derecho[fila])]):
+            hijos.extend(nodo.hijos if len(nodo.hijos) > 0 and nodo.valor == altura else [nodo])
+        nodos.append(Nodo([elemento for hijo in hijos for elemento in hijo.elementos], altura, hijos))
+
+    return nodos[-1]
+
+
+def diferencias_mezclas(matriz: np.ndarray, tabla: TablaEnlace, linkage: str = "single", tolerancia: float = TOLERANCIA) -> list[str]:
+    if linkage not in ENLACES_REFERENCIA:
+        raise Exception(f"El motor de referencia no implementa el enlace {linkage}")
+
+    n = tabla.n
+    grupos = {i: [i] for i in range(n)}
+    enlaces = {(i, j): float(matriz[i][j]) for i in range(n) for j in range(i + 1, n)}
+    diferencias = []
+
+    for fila in range(n - 1):
+        izquierdo, derecho, altura = int(tabla.izquierdo[fila]), int(tabla.derecho[fila]), float(tabla.altura[fila])
+        if izquierdo not in grupos or derecho not in grupos:
+            diferencias.append(f"La fila {fila} une un grupo que ya fue unido")
+            break
+
+        minimo = min(enlaces.values())
+        unida = enlaces[(min(izquierdo, derecho), max(izquierdo, derecho))]
+        grupo = sorted(grupos[izquierdo] + grupos[derecho])
+        if not np.isclose(altura, unida, rtol=tolerancia, atol=tolerancia):
+            diferencias.append(f"El grupo {grupo} tiene altura {altura} en vez de {unida}")
+        elif unida > minimo and not np.isclose(unida, minimo, rtol=tolerancia, atol=tolerancia):
+            diferencias.append(f"El grupo {grupo} se une a altura {unida} habiendo un par a {minimo}")
+
+        nuevo = n + fila
+        grupos[nuevo] = grupos.pop(izquierdo) + grupos.pop(derecho)
+        enlaces = {par: valor for par, valor in enlaces.items() if izquierdo not in par and derecho not in par}
+        for otro in grupos:
+            if otro != nuevo:
+                enlaces[(otro, nuevo)] = enlace_referencia(matriz, grupos[otro], grupos[nuevo], linkage)
+
+    return diferencias